@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
 import json
@@ -9,12 +10,14 @@ import logging
 import mimetypes
 import os
 import re
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+import threading
 from dataclasses import dataclass
-from io import BytesIO
 from typing import Any, Protocol
 
 from app.config.settings import OCISettings
+from app.services.cache import TieredCache, cache_dir, digest
+from app.services.image_prep import PreparedImage, perceptual_distance, prepare_image, tile_image
+from app.services.vision_executor import get_vision_executor
 
 
 logger = logging.getLogger(__name__)
@@ -77,6 +80,38 @@ class OCIClientProtocol(Protocol):
     def multimodal_completion(self, prompt: str, image_base64: str, mime_type: str, **kwargs: Any) -> str: ...
 
 
+# Analyses of previously seen diagrams, shared process-wide.  Keyed on the
+# upload's SHA-256, the diagram role, the model and the full prompt text, so
+# editing DIAGRAM_ANALYSIS_PROMPT starts a fresh generation of entries.  Only
+# medium/high-confidence analyses are stored; a low-confidence diagram is
+# re-analysed every time.  VISION_CACHE_ENABLED=false disables it.
+_analysis_cache_instance: TieredCache | None = None
+_analysis_cache_lock = threading.Lock()
+
+
+def _analysis_cache() -> TieredCache | None:
+    global _analysis_cache_instance
+    if os.getenv("VISION_CACHE_ENABLED", "true").casefold() == "false":
+        return None
+    with _analysis_cache_lock:
+        if _analysis_cache_instance is None:
+            disk = os.getenv("VISION_CACHE_DISK", "true").casefold() != "false"
+            _analysis_cache_instance = TieredCache(
+                "vision_analyses",
+                max_entries=int(os.getenv("VISION_CACHE_MAX_ENTRIES", "256")),
+                ttl_seconds=float(os.getenv("VISION_CACHE_TTL_SECONDS", str(30 * 24 * 3600))),
+                db_path=cache_dir() / "vision_analyses.sqlite3" if disk else None,
+                max_disk_bytes=int(os.getenv("VISION_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+            )
+        return _analysis_cache_instance
+
+
+def vision_cache_stats() -> dict[str, Any] | None:
+    """Hit/miss counters of the analysis cache (``None`` when disabled)."""
+    cache = _analysis_cache()
+    return cache.stats() if cache is not None else None
+
+
 @dataclass(frozen=True)
 class _ImageMetadata:
     width: int
@@ -85,6 +120,18 @@ class _ImageMetadata:
     mime_type: str
 
 
+@dataclass(frozen=True)
+class _PreparedImage:
+    """An upload decoded and encoded once, reused across retry attempts."""
+
+    file_name: str
+    diagram_role: str
+    size_bytes: int
+    metadata: _ImageMetadata
+    image_base64: str
+    prompt: str
+
+
 class ArchitectureVisionAgent:
     """Extracts architecture evidence from uploaded diagrams using OCI multimodal LLM."""
 
@@ -103,6 +150,13 @@ class ArchitectureVisionAgent:
         timeout_seconds: float | None = None,
         low_confidence_retries: int = 1,
         image_concurrency: int | None = None,
+        use_cache: bool = True,
+        tiled: bool | None = None,
+        tile_size: int | None = None,
+        tile_overlap: float | None = None,
+        tile_min_dimension: int | None = None,
+        max_tiles: int = 9,
+        dedup_distance: int | None = None,
     ) -> None:
         settings = OCISettings.from_env()
         self.llm_client = llm_client
@@ -114,24 +168,55 @@ class ArchitectureVisionAgent:
             if image_concurrency is not None
             else int(os.getenv("VISION_IMAGE_CONCURRENCY", "2"))
         )
+        # False skips the analysis cache in both directions (no lookup, no store).
+        self.use_cache = use_cache
+        # Tiled mode: diagrams longer than tile_min_dimension on a side are
+        # also analysed as overlapping full-resolution tiles (see aanalyze).
+        self.tiled = (
+            tiled if tiled is not None else os.getenv("VISION_TILED_ANALYSIS", "false").casefold() == "true"
+        )
+        self.tile_size = tile_size or int(os.getenv("VISION_TILE_SIZE", "1536"))
+        self.tile_overlap = (
+            tile_overlap if tile_overlap is not None else float(os.getenv("VISION_TILE_OVERLAP", "0.15"))
+        )
+        self.tile_min_dimension = tile_min_dimension or int(os.getenv("VISION_TILE_MIN_DIMENSION", "4096"))
+        self.max_tiles = max(1, max_tiles)
+        # analyze_many analyses one image per group of uploads whose perceptual
+        # hashes differ by at most this many bits (of 64); negative disables.
+        self.dedup_distance = (
+            dedup_distance if dedup_distance is not None else int(os.getenv("VISION_DEDUP_MAX_DISTANCE", "5"))
+        )
 
     def analyze_many(
         self, files: list[tuple[str, bytes]], diagram_role: str
     ) -> dict[str, Any]:
-        """Analyze multiple images for the same diagram role and return merged result."""
+        """Analyze multiple images for the same diagram role and return merged result.
+
+        Runs :meth:`aanalyze_many` on a private event loop, so the images
+        share the process-wide vision executor instead of a pool per call.
+        Must not be called from a running event loop.
+        """
         if not files:
-            return self._error_result(
-                diagram_role=diagram_role,
-                file_name="none",
-                fmt="unknown",
-                size_bytes=0,
-                width=0,
-                height=0,
-                error_code="no_files",
-                error_message="No image files provided.",
-            )
+            return self._no_files_result(diagram_role)
         if len(files) == 1:
             return self.analyze(files[0][0], files[0][1], diagram_role)
+        return asyncio.run(self.aanalyze_many(files, diagram_role))
+
+    async def aanalyze_many(
+        self, files: list[tuple[str, bytes]], diagram_role: str
+    ) -> dict[str, Any]:
+        """Async :meth:`analyze_many` — images are analyzed as concurrent coroutines."""
+        if not files:
+            return self._no_files_result(diagram_role)
+        if len(files) == 1:
+            return await self.aanalyze(files[0][0], files[0][1], diagram_role)
+
+        duplicates: list[dict[str, Any]] = []
+        if self.dedup_distance >= 0:
+            files, duplicates = await asyncio.to_thread(self._collapse_duplicates, files, diagram_role)
+            if len(files) == 1:
+                result = await self.aanalyze(files[0][0], files[0][1], diagram_role)
+                return self._merge_results(files, [result], diagram_role, duplicates)
 
         logger.info(
             "architecture_vision.analyze_many_start role=%s count=%d concurrency=%d",
@@ -139,31 +224,123 @@ class ArchitectureVisionAgent:
             len(files),
             self.image_concurrency,
         )
-        with ThreadPoolExecutor(max_workers=self.image_concurrency) as pool:
-            futures = [pool.submit(self.analyze, fn, content, diagram_role) for fn, content in files]
-            results: list[dict[str, Any]] = []
-            for (fn, content), fut in zip(files, futures):
+        sem = asyncio.Semaphore(max(1, self.image_concurrency))
+
+        async def _one(fn: str, content: bytes) -> dict[str, Any]:
+            async with sem:
                 try:
-                    results.append(fut.result())
+                    return await self.aanalyze(fn, content, diagram_role)
                 except Exception:
                     logger.exception(
                         "architecture_vision.analyze_many_image_failed role=%s file=%s",
                         diagram_role,
                         fn,
                     )
-                    results.append(
-                        self._error_result(
-                            diagram_role=diagram_role,
-                            file_name=fn,
-                            fmt="unknown",
-                            size_bytes=len(content),
-                            width=0,
-                            height=0,
-                            error_code="thread_error",
-                            error_message="Image analysis thread raised an exception.",
-                        )
-                    )
+                    return self._thread_error_result(diagram_role, fn, content)
 
+        results = list(await asyncio.gather(*[_one(fn, content) for fn, content in files]))
+        return self._merge_results(files, results, diagram_role, duplicates)
+
+    def _collapse_duplicates(
+        self, files: list[tuple[str, bytes]], diagram_role: str
+    ) -> tuple[list[tuple[str, bytes]], list[dict[str, Any]]]:
+        """Keep one upload per group of near-identical images.
+
+        Uploads are grouped greedily by perceptual-hash distance (at most
+        ``dedup_distance`` bits) and similar aspect ratio; each group is
+        represented by its largest image.  Returns the kept uploads and a
+        ``source_images`` entry for every dropped one, naming the upload it
+        duplicates.  Undecodable uploads are always kept.
+        """
+        prepared = [prepare_image(content, fn) for fn, content in files]
+        groups: list[list[int]] = []
+        for i, image in enumerate(prepared):
+            match = next(
+                (
+                    group for group in groups
+                    if image is not None
+                    and (head := prepared[group[0]]) is not None
+                    and self._near_duplicate(image, head)
+                ),
+                None,
+            )
+            if match is None:
+                groups.append([i])
+            else:
+                match.append(i)
+
+        kept: list[tuple[str, bytes]] = []
+        duplicates: list[dict[str, Any]] = []
+        for group in groups:
+            rep = max(group, key=lambda i: prepared[i].source_width * prepared[i].source_height if prepared[i] else 0)
+            kept.append(files[rep])
+            for i in group:
+                if i == rep:
+                    continue
+                image, rep_image = prepared[i], prepared[rep]
+                assert image is not None and rep_image is not None
+                duplicates.append({
+                    "file_name": files[i][0],
+                    "format": image.source_fmt,
+                    "size_bytes": len(files[i][1]),
+                    "image_resolution": {"width": image.source_width, "height": image.source_height},
+                    "duplicate_of": files[rep][0],
+                    "hash_distance": perceptual_distance(image, rep_image),
+                })
+        if duplicates:
+            logger.info(
+                "architecture_vision.duplicates_collapsed role=%s uploads=%d analyzed=%d",
+                diagram_role,
+                len(files),
+                len(kept),
+            )
+        return kept, duplicates
+
+    def _near_duplicate(self, a: PreparedImage, b: PreparedImage) -> bool:
+        ratio_a = a.source_width / max(1, a.source_height)
+        ratio_b = b.source_width / max(1, b.source_height)
+        # Re-exports and slight crops keep the shape; different diagrams with
+        # similar coarse layouts usually do not.
+        if abs(ratio_a - ratio_b) > 0.15 * max(ratio_a, ratio_b):
+            return False
+        return perceptual_distance(a, b) <= self.dedup_distance
+
+    def _no_files_result(self, diagram_role: str) -> dict[str, Any]:
+        return self._error_result(
+            diagram_role=diagram_role,
+            file_name="none",
+            fmt="unknown",
+            size_bytes=0,
+            width=0,
+            height=0,
+            error_code="no_files",
+            error_message="No image files provided.",
+        )
+
+    def _thread_error_result(self, diagram_role: str, file_name: str, content: bytes) -> dict[str, Any]:
+        return self._error_result(
+            diagram_role=diagram_role,
+            file_name=file_name,
+            fmt="unknown",
+            size_bytes=len(content),
+            width=0,
+            height=0,
+            error_code="thread_error",
+            error_message="Image analysis thread raised an exception.",
+        )
+
+    def _merge_results(
+        self,
+        files: list[tuple[str, bytes]],
+        results: list[dict[str, Any]],
+        diagram_role: str,
+        duplicates: list[dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        """Merge per-image results into one role-level analysis.
+
+        *duplicates* (uploads collapsed before analysis) are listed in
+        ``source_images`` after the analysed ones.
+        """
         valid = [r for r in results if "error" not in r.get("architecture_extraction", {})]
 
         if not valid:
@@ -200,7 +377,7 @@ class ArchitectureVisionAgent:
                 "confidence": r.get("analysis_confidence", {}).get("overall_confidence", "low"),
             }
             for r in results
-        ]
+        ] + list(duplicates or [])
         logger.info(
             "architecture_vision.analyze_many_done role=%s total=%d valid=%d",
             diagram_role,
@@ -222,8 +399,11 @@ class ArchitectureVisionAgent:
             items: list[str] = []
             for ext in extractions:
                 for item in ext.get("components", {}).get(key, []):
-                    if item not in seen:
-                        seen.add(item)
+                    # Overlapping tiles and re-exports repeat a label with
+                    # different case or spacing; keep its first spelling.
+                    norm = " ".join(str(item).split()).casefold()
+                    if norm not in seen:
+                        seen.add(norm)
                         items.append(item)
             merged_components[key] = items
 
@@ -265,39 +445,24 @@ class ArchitectureVisionAgent:
     def _downsample_if_needed(content: bytes, file_name: str, max_dimension: int = 4096) -> bytes | None:
         """Resize image to fit within max_dimension on its longest side, if it exceeds that size.
 
-        Returns None if the image cannot be opened or downsampled (e.g. too large for PIL).
-        Callers must treat None as an unprocessable image.
+        Uses the shared image-preparation stage, which decodes each upload once
+        (cached by content hash) for both this agent and DOCX embedding, and
+        transcodes the result to fit ``VISION_PAYLOAD_MAX_BYTES``; the bytes
+        are base64-encoded once and reused by every attempt.
+        Returns None if the image cannot be opened or downsampled.  Callers
+        must treat None as an unprocessable image.
         """
-        try:
-            from PIL import Image
-        except ModuleNotFoundError:
-            return content
+        prepared = prepare_image(content, file_name, max_dimension=max_dimension)
+        return prepared.vision.data if prepared is not None else None
 
-        # Permanently suppress the PIL bomb check for this process. Saving/restoring
-        # the global limit is racy in a multi-threaded server; we do our own size
-        # handling and can safely ignore PIL's default cap.
-        Image.MAX_IMAGE_PIXELS = None
+    def _prepare_analysis(
+        self, file_name: str, content: bytes, diagram_role: str
+    ) -> tuple[_PreparedImage | None, dict[str, Any] | None]:
+        """Decode, downsample and encode one upload.
 
-        try:
-            with Image.open(BytesIO(content)) as image:
-                w, h = image.size
-                if w <= max_dimension and h <= max_dimension:
-                    return content
-                scale = max_dimension / max(w, h)
-                new_w, new_h = int(w * scale), int(h * scale)
-                logger.warning(
-                    "architecture_vision.downsampling file=%s original=%dx%d target=%dx%d",
-                    file_name, w, h, new_w, new_h,
-                )
-                resized = image.resize((new_w, new_h), Image.LANCZOS)
-                buf = BytesIO()
-                resized.save(buf, format="PNG")
-                return buf.getvalue()
-        except Exception:
-            logger.warning("architecture_vision.downsample_failed file=%s", file_name, exc_info=True)
-            return None
-
-    def analyze(self, file_name: str, content: bytes, diagram_role: str) -> dict[str, Any]:
+        Returns ``(prepared, None)`` when the image is ready for the model, or
+        ``(None, error_result)`` when analysis cannot proceed.
+        """
         original_size = len(content)
         downsampled = self._downsample_if_needed(content, file_name)
         if downsampled is None:
@@ -306,7 +471,7 @@ class ArchitectureVisionAgent:
                 file_name,
                 original_size,
             )
-            return self._error_result(
+            return None, self._error_result(
                 diagram_role=diagram_role,
                 file_name=file_name,
                 fmt="unknown",
@@ -322,7 +487,7 @@ class ArchitectureVisionAgent:
         self._log_image_metadata(file_name=file_name, size_bytes=size_bytes, metadata=metadata)
 
         if metadata is None:
-            return self._error_result(
+            return None, self._error_result(
                 diagram_role=diagram_role,
                 file_name=file_name,
                 fmt="unknown",
@@ -335,7 +500,7 @@ class ArchitectureVisionAgent:
 
         if self.llm_client is None:
             logger.error("architecture_vision.llm_client_missing role=%s file=%s", diagram_role, file_name)
-            return self._error_result(
+            return None, self._error_result(
                 diagram_role=diagram_role,
                 file_name=file_name,
                 fmt=metadata.fmt,
@@ -346,98 +511,333 @@ class ArchitectureVisionAgent:
                 error_message="Multimodal OCI client is not configured.",
             )
 
-        image_base64 = base64.b64encode(content).decode("utf-8")
-        prompt = self._build_prompt(diagram_role=diagram_role)
-
-        attempts = self.low_confidence_retries + 1
-        best_output: dict[str, Any] = {}
-        best_confidence = "low"
-
-        for attempt in range(1, attempts + 1):
-            logger.info("architecture_vision.llm_request role=%s file=%s attempt=%s", diagram_role, file_name, attempt)
-            try:
-                raw_response = self._call_multimodal_with_timeout(
-                    prompt=prompt,
-                    image_base64=image_base64,
-                    mime_type=metadata.mime_type,
-                    image_metadata=metadata,
-                )
-            except Exception as exc:
-                logger.exception("architecture_vision.llm_call_failed role=%s file=%s", diagram_role, file_name)
-                return self._error_result(
-                    diagram_role=diagram_role,
-                    file_name=file_name,
-                    fmt=metadata.fmt,
-                    size_bytes=size_bytes,
-                    width=metadata.width,
-                    height=metadata.height,
-                    error_code="llm_call_failed",
-                    error_message=str(exc),
-                )
+        return _PreparedImage(
+            file_name=file_name,
+            diagram_role=diagram_role,
+            size_bytes=size_bytes,
+            metadata=metadata,
+            image_base64=base64.b64encode(content).decode("utf-8"),
+            prompt=self._build_prompt(diagram_role=diagram_role),
+        ), None
+
+    def _call_failed_result(self, prepared: _PreparedImage, exc: Exception) -> dict[str, Any]:
+        logger.error(
+            "architecture_vision.llm_call_failed role=%s file=%s",
+            prepared.diagram_role,
+            prepared.file_name,
+            exc_info=exc,
+        )
+        return self._error_result(
+            diagram_role=prepared.diagram_role,
+            file_name=prepared.file_name,
+            fmt=prepared.metadata.fmt,
+            size_bytes=prepared.size_bytes,
+            width=prepared.metadata.width,
+            height=prepared.metadata.height,
+            error_code="llm_call_failed",
+            error_message=str(exc),
+        )
 
-            structured_output = self._safe_parse_json(raw_response)
-            if not structured_output:
-                logger.error(
-                    "architecture_vision.invalid_json role=%s file=%s attempt=%s",
-                    diagram_role,
-                    file_name,
-                    attempt,
-                )
-                best_output = {
-                    "confidence_assessment": {
-                        "overall_confidence": "low",
-                        "reason": "Invalid JSON returned by multimodal model.",
-                    }
+    def _record_attempt(
+        self,
+        prepared: _PreparedImage,
+        raw_response: str,
+        attempt: int,
+        attempts: int,
+        best: dict[str, Any],
+    ) -> bool:
+        """Fold one model response into *best*; return True when no retry is needed."""
+        diagram_role, file_name = prepared.diagram_role, prepared.file_name
+        structured_output = self._safe_parse_json(raw_response)
+        if not structured_output:
+            logger.error(
+                "architecture_vision.invalid_json role=%s file=%s attempt=%s",
+                diagram_role,
+                file_name,
+                attempt,
+            )
+            best["output"] = {
+                "confidence_assessment": {
+                    "overall_confidence": "low",
+                    "reason": "Invalid JSON returned by multimodal model.",
                 }
-                best_confidence = "low"
-                if attempt < attempts:
-                    logger.warning(
-                        "architecture_vision.retry_after_invalid_json role=%s file=%s next_attempt=%s",
-                        diagram_role,
-                        file_name,
-                        attempt + 1,
-                    )
-                    continue
-                break
-
-            missing = sorted(self.EXPECTED_KEYS - set(structured_output.keys()))
-            if missing:
+            }
+            if attempt < attempts:
                 logger.warning(
-                    "architecture_vision.missing_expected_keys role=%s file=%s missing=%s",
+                    "architecture_vision.retry_after_invalid_json role=%s file=%s next_attempt=%s",
                     diagram_role,
                     file_name,
-                    ",".join(missing),
+                    attempt + 1,
                 )
+                return False
+            return True
 
-            confidence_assessment = structured_output.get("confidence_assessment", {})
-            overall_confidence = str(confidence_assessment.get("overall_confidence", "low")).lower()
-            if overall_confidence not in {"low", "medium", "high"}:
-                overall_confidence = "low"
-
-            best_output = structured_output
-            best_confidence = overall_confidence
-            logger.info(
-                "architecture_vision.llm_response role=%s file=%s attempt=%s confidence=%s",
+        missing = sorted(self.EXPECTED_KEYS - set(structured_output.keys()))
+        if missing:
+            logger.warning(
+                "architecture_vision.missing_expected_keys role=%s file=%s missing=%s",
                 diagram_role,
                 file_name,
-                attempt,
-                overall_confidence,
+                ",".join(missing),
             )
-            if overall_confidence != "low":
-                break
 
+        confidence_assessment = structured_output.get("confidence_assessment", {})
+        overall_confidence = str(confidence_assessment.get("overall_confidence", "low")).lower()
+        if overall_confidence not in {"low", "medium", "high"}:
+            overall_confidence = "low"
+
+        best["output"] = structured_output
+        logger.info(
+            "architecture_vision.llm_response role=%s file=%s attempt=%s confidence=%s",
+            diagram_role,
+            file_name,
+            attempt,
+            overall_confidence,
+        )
+        return overall_confidence != "low"
+
+    @staticmethod
+    def _analysis_result(prepared: _PreparedImage, best_output: dict[str, Any]) -> dict[str, Any]:
         return {
-            "diagram_role": diagram_role,
-            "file_name": file_name,
-            "format": metadata.fmt,
-            "size_bytes": size_bytes,
-            "image_resolution": {"width": metadata.width, "height": metadata.height},
+            "diagram_role": prepared.diagram_role,
+            "file_name": prepared.file_name,
+            "format": prepared.metadata.fmt,
+            "size_bytes": prepared.size_bytes,
+            "image_resolution": {"width": prepared.metadata.width, "height": prepared.metadata.height},
             "architecture_extraction": best_output,
             "analysis_confidence": best_output.get("confidence_assessment", {}),
         }
 
-    def _build_prompt(self, diagram_role: str) -> str:
-        return f"{DIAGRAM_ANALYSIS_PROMPT}\n\ndiagram_role={diagram_role}"
+    def _analysis_key(self, content: bytes, diagram_role: str) -> str | None:
+        """Cache key of an analysis of *content*; ``None`` when caching is off."""
+        if not self.use_cache or _analysis_cache() is None:
+            return None
+        tiling = [self.tile_size, self.tile_overlap, self.tile_min_dimension, self.max_tiles] if self.tiled else None
+        return digest(
+            hashlib.sha256(content).hexdigest(), diagram_role, self.model_name, self._build_prompt(diagram_role), tiling
+        )
+
+    def _cached_analysis(
+        self, file_name: str, content: bytes, diagram_role: str
+    ) -> tuple[str | None, dict[str, Any] | None]:
+        """Return ``(cache_key, cached_result)``; both ``None`` when caching is off."""
+        key = self._analysis_key(content, diagram_role)
+        cache = _analysis_cache()
+        if key is None or cache is None:
+            return None, None
+        return key, self._replay(key, cache.get(key), file_name, diagram_role)
+
+    async def _acached_analysis(
+        self, file_name: str, content: bytes, diagram_role: str
+    ) -> tuple[str | None, dict[str, Any] | None]:
+        """Async :meth:`_cached_analysis`; the disk tier is read off the event loop."""
+        key = self._analysis_key(content, diagram_role)
+        cache = _analysis_cache()
+        if key is None or cache is None:
+            return None, None
+        return key, self._replay(key, await cache.aget(key), file_name, diagram_role)
+
+    @staticmethod
+    def _replay(
+        key: str, cached: dict[str, Any] | None, file_name: str, diagram_role: str
+    ) -> dict[str, Any] | None:
+        if cached is None:
+            return None
+        logger.info("architecture_vision.cache_hit role=%s file=%s key=%s", diagram_role, file_name, key[:12])
+        # The same bytes may arrive under another file name.
+        return {"diagram_role": diagram_role, "file_name": file_name, **cached}
+
+    @staticmethod
+    def _storable_analysis(result: dict[str, Any]) -> dict[str, Any] | None:
+        """The cacheable part of *result*, or ``None`` for failed or low-confidence analyses."""
+        confidence = str(result.get("analysis_confidence", {}).get("overall_confidence", "low")).lower()
+        if "error" in result.get("architecture_extraction", {}) or confidence not in {"medium", "high"}:
+            return None
+        return {k: v for k, v in result.items() if k not in ("diagram_role", "file_name")}
+
+    @classmethod
+    def _store_analysis(cls, key: str | None, result: dict[str, Any]) -> None:
+        cache = _analysis_cache()
+        payload = cls._storable_analysis(result)
+        if key is not None and cache is not None and payload is not None:
+            cache.put(key, payload)
+
+    @classmethod
+    async def _astore_analysis(cls, key: str | None, result: dict[str, Any]) -> None:
+        cache = _analysis_cache()
+        payload = cls._storable_analysis(result)
+        if key is not None and cache is not None and payload is not None:
+            await cache.aput(key, payload)
+
+    def analyze(self, file_name: str, content: bytes, diagram_role: str) -> dict[str, Any]:
+        """Blocking :meth:`aanalyze`; safe to call from a running event loop.
+
+        Model calls go through the shared vision executor, so in tiled mode
+        the whole diagram and its tiles are analysed one after another.
+        """
+        cache_key, cached = self._cached_analysis(file_name, content, diagram_role)
+        if cached is not None:
+            return cached
+        prepared, error = self._prepare_analysis(file_name, content, diagram_role)
+        if prepared is None:
+            return error or {}
+
+        tiles = self._prepare_tiles(file_name, content, diagram_role) if self.tiled else []
+        try:
+            if tiles:
+                outputs: list[Any] = []
+                for item, attempts in [(prepared, self.low_confidence_retries + 1), *[(tile, 1) for tile in tiles]]:
+                    try:
+                        outputs.append(self._run_attempts(item, attempts))
+                    except Exception as exc:
+                        outputs.append(exc)
+                overview, *tile_outputs = outputs
+                result = self._tiled_result(prepared, overview, tile_outputs)
+            else:
+                result = self._analysis_result(
+                    prepared, self._run_attempts(prepared, self.low_confidence_retries + 1)
+                )
+        except Exception as exc:
+            return self._call_failed_result(prepared, exc)
+        self._store_analysis(cache_key, result)
+        return result
+
+    async def aanalyze(self, file_name: str, content: bytes, diagram_role: str) -> dict[str, Any]:
+        """Async :meth:`analyze`.
+
+        Image decoding stays on a worker thread (CPU-bound); the model call is
+        awaited directly when the client offers ``amultimodal_completion``.
+
+        In tiled mode a diagram longer than ``tile_min_dimension`` on a side
+        is additionally cut into overlapping full-resolution tiles (see
+        :func:`~app.services.image_prep.tile_image`).  The downsampled whole
+        diagram and every tile are analysed concurrently — one attempt per
+        tile — and merged: component lists are unioned across tiles, while
+        the summary and deployment topology come from the whole-diagram view.
+        """
+        cache_key, cached = await self._acached_analysis(file_name, content, diagram_role)
+        if cached is not None:
+            return cached
+        prepared, error = await asyncio.to_thread(self._prepare_analysis, file_name, content, diagram_role)
+        if prepared is None:
+            return error or {}
+
+        tiles = await asyncio.to_thread(self._prepare_tiles, file_name, content, diagram_role) if self.tiled else []
+        try:
+            if tiles:
+                overview, *tile_outputs = await asyncio.gather(
+                    self._arun_attempts(prepared, self.low_confidence_retries + 1),
+                    *[self._arun_attempts(tile, 1) for tile in tiles],
+                    return_exceptions=True,
+                )
+                result = self._tiled_result(prepared, overview, tile_outputs)
+            else:
+                result = self._analysis_result(
+                    prepared, await self._arun_attempts(prepared, self.low_confidence_retries + 1)
+                )
+        except Exception as exc:
+            return self._call_failed_result(prepared, exc)
+        await self._astore_analysis(cache_key, result)
+        return result
+
+    def _run_attempts(self, prepared: _PreparedImage, attempts: int) -> dict[str, Any]:
+        """Call the model up to *attempts* times on *prepared*; return the best parsed output."""
+        best: dict[str, Any] = {"output": {}}
+        for attempt in range(1, attempts + 1):
+            logger.info(
+                "architecture_vision.llm_request role=%s file=%s attempt=%s",
+                prepared.diagram_role, prepared.file_name, attempt,
+            )
+            raw_response = self._call_multimodal_with_timeout(
+                prompt=prepared.prompt,
+                image_base64=prepared.image_base64,
+                mime_type=prepared.metadata.mime_type,
+                image_metadata=prepared.metadata,
+            )
+            if self._record_attempt(prepared, raw_response, attempt, attempts, best):
+                break
+        return best["output"]
+
+    async def _arun_attempts(self, prepared: _PreparedImage, attempts: int) -> dict[str, Any]:
+        """Async :meth:`_run_attempts`."""
+        best: dict[str, Any] = {"output": {}}
+        for attempt in range(1, attempts + 1):
+            logger.info(
+                "architecture_vision.llm_request role=%s file=%s attempt=%s",
+                prepared.diagram_role, prepared.file_name, attempt,
+            )
+            raw_response = await self._acall_multimodal_with_timeout(
+                prompt=prepared.prompt,
+                image_base64=prepared.image_base64,
+                mime_type=prepared.metadata.mime_type,
+                image_metadata=prepared.metadata,
+            )
+            if self._record_attempt(prepared, raw_response, attempt, attempts, best):
+                break
+        return best["output"]
+
+    def _tiled_result(
+        self, prepared: _PreparedImage, overview: dict[str, Any] | BaseException, tile_outputs: list[Any]
+    ) -> dict[str, Any]:
+        """Analysis result merged from the whole-diagram and tile outputs.
+
+        Outputs may be the exception their calls raised; the overview's is
+        re-raised when no tile was read either.
+        """
+        read = [o for o in tile_outputs if isinstance(o, dict) and o.get("components")]
+        if isinstance(overview, BaseException):
+            if not read:
+                raise overview
+            logger.warning(
+                "architecture_vision.tiled_overview_failed role=%s file=%s", prepared.diagram_role, prepared.file_name
+            )
+            overview = None
+        logger.info(
+            "architecture_vision.tiled_done role=%s file=%s tiles=%d read=%d",
+            prepared.diagram_role, prepared.file_name, len(tile_outputs), len(read),
+        )
+        result = self._analysis_result(prepared, self._merge_tiles(overview, read))
+        result["tiles"] = len(tile_outputs)
+        return result
+
+    def _prepare_tiles(self, file_name: str, content: bytes, diagram_role: str) -> list[_PreparedImage]:
+        """Tiles of *content* ready for the model; empty when the diagram is small enough."""
+        source = prepare_image(content, file_name)
+        if source is None or max(source.source_width, source.source_height) <= self.tile_min_dimension:
+            return []
+        variants = tile_image(content, file_name, self.tile_size, self.tile_overlap, self.max_tiles)
+        return [
+            _PreparedImage(
+                file_name=f"{file_name}#tile{index}",
+                diagram_role=diagram_role,
+                size_bytes=len(variant.data),
+                metadata=_ImageMetadata(variant.width, variant.height, variant.fmt, variant.mime_type),
+                image_base64=base64.b64encode(variant.data).decode("utf-8"),
+                prompt=self._build_prompt(diagram_role, tile=(index, len(variants))),
+            )
+            for index, variant in enumerate(variants, start=1)
+        ]
+
+    def _merge_tiles(self, overview: dict[str, Any] | None, tiles: list[dict[str, Any]]) -> dict[str, Any]:
+        """Union tile components into the whole-diagram extraction."""
+        extractions = ([overview] if overview else []) + tiles
+        merged = self._merge_extractions(extractions)
+        if overview:
+            # A tile only sees part of the diagram; describe the whole from the overview.
+            for key in ("diagram_summary", "deployment_topology"):
+                if overview.get(key):
+                    merged[key] = overview[key]
+        return merged
+
+    def _build_prompt(self, diagram_role: str, tile: tuple[int, int] | None = None) -> str:
+        prompt = f"{DIAGRAM_ANALYSIS_PROMPT}\n\ndiagram_role={diagram_role}"
+        if tile is not None:
+            prompt += (
+                f"\ntile={tile[0]}/{tile[1]}: this image is one overlapping region of a larger diagram. "
+                "Report only what is visible in this region; read small labels (CIDRs, subnet and service "
+                "names) exactly."
+            )
+        return prompt
 
     def _call_multimodal_with_timeout(
         self,
@@ -446,54 +846,71 @@ class ArchitectureVisionAgent:
         mime_type: str,
         image_metadata: _ImageMetadata,
     ) -> str:
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(self._call_multimodal, prompt, image_base64, mime_type, image_metadata)
-            try:
-                return future.result(timeout=self.timeout_seconds)
-            except FuturesTimeoutError as exc:
-                logger.error("architecture_vision.llm_timeout timeout_seconds=%s", self.timeout_seconds)
-                raise TimeoutError(f"Multimodal request timed out after {self.timeout_seconds} seconds") from exc
+        try:
+            return get_vision_executor().call(
+                self._call_multimodal, prompt, image_base64, mime_type, image_metadata,
+                timeout=self.timeout_seconds,
+            )
+        except TimeoutError:
+            logger.error("architecture_vision.llm_timeout timeout_seconds=%s", self.timeout_seconds)
+            raise
 
-    def _call_multimodal(self, prompt: str, image_base64: str, mime_type: str, image_metadata: _ImageMetadata) -> str:
+    async def _acall_multimodal_with_timeout(
+        self,
+        prompt: str,
+        image_base64: str,
+        mime_type: str,
+        image_metadata: _ImageMetadata,
+    ) -> str:
         assert self.llm_client is not None
-        max_tokens = 8000 
+        acompletion = getattr(self.llm_client, "amultimodal_completion", None)
+        executor = get_vision_executor()
+        try:
+            if acompletion is None:
+                # Blocking clients run on the shared vision executor, which
+                # frees the worker of a call that outlives the timeout.
+                return await executor.acall(
+                    self._call_multimodal, prompt, image_base64, mime_type, image_metadata,
+                    timeout=self.timeout_seconds,
+                )
+            # Native async calls need no thread, but are counted by the executor too.
+            call = acompletion(prompt=prompt, image_base64=image_base64, mime_type=mime_type, **self._call_kwargs())
+            return await executor.await_call(call, timeout=self.timeout_seconds)
+        except TimeoutError:
+            logger.error("architecture_vision.llm_timeout timeout_seconds=%s", self.timeout_seconds)
+            raise
+
+    def _call_kwargs(self) -> dict[str, Any]:
+        max_tokens = 8000
         call_kwargs: dict[str, Any] = {
             "max_tokens": max_tokens,
             "temperature": 0,
         }
         if self.model_name:
             call_kwargs["model_name"] = self.model_name
+        return call_kwargs
+
+    def _call_multimodal(self, prompt: str, image_base64: str, mime_type: str, image_metadata: _ImageMetadata) -> str:
+        assert self.llm_client is not None
+        call_kwargs = self._call_kwargs()
         try:
             return self.llm_client.multimodal_completion(prompt=prompt, image_base64=image_base64, mime_type=mime_type, **call_kwargs)
         except TypeError:
             return self.llm_client.multimodal_completion(prompt=prompt, image_base64=image_base64, mime_type=mime_type)
 
     def _read_image_metadata(self, content: bytes, file_name: str) -> _ImageMetadata | None:
-        try:
-            from PIL import Image, UnidentifiedImageError
-        except ModuleNotFoundError:
-            logger.error("architecture_vision.pillow_missing file=%s", file_name)
-            return None
-
-        try:
-            with Image.open(BytesIO(content)) as image:
-                width, height = image.size
-                fmt = (image.format or "unknown").lower()
-        except Image.DecompressionBombError:
-            logger.error(
-                "architecture_vision.decompression_bomb_after_downsample file=%s size_bytes=%s "
-                "message=Image still exceeds PIL pixel limit after downsample attempt.",
-                file_name,
-                len(content),
-            )
-            return None
-        except (UnidentifiedImageError, OSError, ValueError):
-            logger.exception("architecture_vision.image_unreadable file=%s", file_name)
+        # *content* is the vision variant from _downsample_if_needed, so this
+        # is a cache hit on the same prepared image rather than a second decode.
+        prepared = prepare_image(content, file_name)
+        if prepared is None:
+            logger.error("architecture_vision.image_unreadable file=%s", file_name)
             return None
 
-        guessed_mime = Image.MIME.get(fmt.upper()) if fmt != "unknown" else None
-        mime_type = guessed_mime or mimetypes.guess_type(file_name)[0] or "application/octet-stream"
-        return _ImageMetadata(width=width, height=height, fmt=fmt, mime_type=mime_type)
+        variant = prepared.vision
+        mime_type = variant.mime_type
+        if mime_type == "application/octet-stream":
+            mime_type = mimetypes.guess_type(file_name)[0] or mime_type
+        return _ImageMetadata(width=variant.width, height=variant.height, fmt=variant.fmt, mime_type=mime_type)
 
     def _log_image_metadata(self, file_name: str, size_bytes: int, metadata: _ImageMetadata | None) -> None:
         if metadata is None:
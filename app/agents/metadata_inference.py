@@ -7,7 +7,7 @@ import logging
 import re
 from typing import Any
 
-from app.services.llm import call_llm
+from app.services.llm import acall_llm, call_llm
 
 logger = logging.getLogger(__name__)
 
@@ -70,12 +70,8 @@ Architecture analysis (if available):
 class MetadataInferenceAgent:
     """Infers structured customer and project metadata from free-form project context."""
 
-    def infer(self, context: dict[str, Any]) -> dict[str, Any]:
-        """Return a structured metadata dict inferred from the project context.
-
-        Never raises — returns an empty dict on any failure so the pipeline
-        degrades gracefully when inference is unavailable.
-        """
+    @staticmethod
+    def _build_user_prompt(context: dict[str, Any]) -> str:
         architecture_analysis = context.get("architecture_analysis") or {}
         architecture_json = json.dumps(architecture_analysis, ensure_ascii=False, indent=2)
 
@@ -83,29 +79,47 @@ class MetadataInferenceAgent:
         context_clean = {k: v for k, v in context.items() if k != "architecture_analysis"}
         context_json = json.dumps(context_clean, ensure_ascii=False, indent=2)
 
-        user_prompt = _USER_TEMPLATE.format(
+        return _USER_TEMPLATE.format(
             context_json=context_json,
             architecture_json=architecture_json,
         )
 
+    def _parse(self, raw: str) -> dict[str, Any]:
+        raw = self._strip_fences(raw.strip())
+        result = json.loads(raw)
+        if not isinstance(result, dict):
+            raise ValueError(f"Expected dict, got {type(result)}")
+        # Normalise oci_bom to always be a list of dicts
+        bom = result.get("oci_bom")
+        if not isinstance(bom, list):
+            result["oci_bom"] = []
+        else:
+            result["oci_bom"] = [r for r in bom if isinstance(r, dict)]
+        logger.info(
+            "metadata_inference.inferred keys=%s bom_entries=%d",
+            list(result.keys()),
+            len(result["oci_bom"]),
+        )
+        return result
+
+    def infer(self, context: dict[str, Any]) -> dict[str, Any]:
+        """Return a structured metadata dict inferred from the project context.
+
+        Never raises — returns an empty dict on any failure so the pipeline
+        degrades gracefully when inference is unavailable.
+        """
+        try:
+            raw = call_llm(system_prompt=_SYSTEM_PROMPT, user_prompt=self._build_user_prompt(context))
+            return self._parse(raw)
+        except Exception:
+            logger.exception("metadata_inference.infer_failed — returning empty metadata")
+            return {}
+
+    async def ainfer(self, context: dict[str, Any]) -> dict[str, Any]:
+        """Async :meth:`infer`; same never-raises contract."""
         try:
-            raw = call_llm(system_prompt=_SYSTEM_PROMPT, user_prompt=user_prompt).strip()
-            raw = self._strip_fences(raw)
-            result = json.loads(raw)
-            if not isinstance(result, dict):
-                raise ValueError(f"Expected dict, got {type(result)}")
-            # Normalise oci_bom to always be a list of dicts
-            bom = result.get("oci_bom")
-            if not isinstance(bom, list):
-                result["oci_bom"] = []
-            else:
-                result["oci_bom"] = [r for r in bom if isinstance(r, dict)]
-            logger.info(
-                "metadata_inference.inferred keys=%s bom_entries=%d",
-                list(result.keys()),
-                len(result["oci_bom"]),
-            )
-            return result
+            raw = await acall_llm(system_prompt=_SYSTEM_PROMPT, user_prompt=self._build_user_prompt(context))
+            return self._parse(raw)
         except Exception:
             logger.exception("metadata_inference.infer_failed — returning empty metadata")
             return {}
@@ -2,19 +2,25 @@
 
 from __future__ import annotations
 
-from app.services.llm import call_llm
+from app.services.llm import acall_llm, call_llm
 
 
 class QAAgent:
     """Reviews and lightly refines complete SoW drafts."""
 
+    _SYSTEM_PROMPT = (
+        "You are a QA reviewer for enterprise Statements of Work. Perform a light review only: "
+        "check internal consistency (database types, kubernetes versions, sizing), remove duplicate "
+        "phrasing, and maintain professional tone. Do not rewrite entire sections unless required "
+        "to resolve inconsistencies. Return only the revised document text."
+    )
+
     def review_document(self, draft: str) -> str:
         """Apply a lightweight enterprise consistency pass."""
-        system_prompt = (
-            "You are a QA reviewer for enterprise Statements of Work. Perform a light review only: "
-            "check internal consistency (database types, kubernetes versions, sizing), remove duplicate "
-            "phrasing, and maintain professional tone. Do not rewrite entire sections unless required "
-            "to resolve inconsistencies. Return only the revised document text."
-        )
         user_prompt = f"Review this Statement of Work draft and apply minimal edits:\n\n{draft}"
-        return call_llm(system_prompt=system_prompt, user_prompt=user_prompt).strip()
+        return call_llm(system_prompt=self._SYSTEM_PROMPT, user_prompt=user_prompt).strip()
+
+    async def areview_document(self, draft: str) -> str:
+        """Async :meth:`review_document`."""
+        user_prompt = f"Review this Statement of Work draft and apply minimal edits:\n\n{draft}"
+        return (await acall_llm(system_prompt=self._SYSTEM_PROMPT, user_prompt=user_prompt)).strip()
@@ -8,7 +8,7 @@ import re
 from pathlib import Path
 from typing import Any
 
-from app.services.llm import call_llm
+from app.services.llm import acall_llm, call_llm
 from app.services.rag_service import SectionChunk
 
 logger = logging.getLogger(__name__)
@@ -211,23 +211,15 @@ class WriterAgent:
 
         return guardrails
 
-    def write_section(
+    def _render_prompts(
         self,
         section_name: str,
         context: dict[str, Any],
-        rag_context: list[SectionChunk] | None = None,
-        disallowed_services: list[str] | None = None,
-        diagram_components: dict | None = None,
-    ) -> str:
-        """Create a section body in professional consulting style.
-
-        Args:
-            diagram_components: Structured components dict extracted from the target
-                architecture diagram analysis (ArchitectureVisionAgent output). When
-                provided for the ARCHITECTURE COMPONENTS section the LLM is instructed
-                to use only the real services identified in the diagram rather than
-                generating generic descriptions.
-        """
+        rag_context: list[SectionChunk] | None,
+        disallowed_services: list[str] | None,
+        diagram_components: dict | None,
+    ) -> tuple[str, str, bool]:
+        """Render (system_prompt, user_prompt, json_output) for one section."""
         examples = "\n\n".join(
             f"Reference Example {idx}:\n{chunk.text}"
             for idx, chunk in enumerate(rag_context or [], start=1)
@@ -266,9 +258,10 @@ class WriterAgent:
             len(user_prompt),
             json_output,
         )
+        return system_prompt, user_prompt, json_output
 
-        raw = call_llm(system_prompt=system_prompt, user_prompt=user_prompt).strip()
-
+    @staticmethod
+    def _postprocess(section_name: str, raw: str, json_output: bool) -> str:
         logger.info(
             "writer.llm_output section=%s len=%d preview=%r",
             section_name,
@@ -285,3 +278,47 @@ class WriterAgent:
             logger.debug("writer.json_output section=%s len=%d", section_name, len(raw))
 
         return raw
+
+    def write_section(
+        self,
+        section_name: str,
+        context: dict[str, Any],
+        rag_context: list[SectionChunk] | None = None,
+        disallowed_services: list[str] | None = None,
+        diagram_components: dict | None = None,
+        use_cache: bool = True,
+    ) -> str:
+        """Create a section body in professional consulting style.
+
+        Args:
+            diagram_components: Structured components dict extracted from the target
+                architecture diagram analysis (ArchitectureVisionAgent output). When
+                provided for the ARCHITECTURE COMPONENTS section the LLM is instructed
+                to use only the real services identified in the diagram rather than
+                generating generic descriptions.
+            use_cache: Replay a cached response for a byte-identical prompt
+                instead of calling the model (see ``app.services.llm``).
+        """
+        system_prompt, user_prompt, json_output = self._render_prompts(
+            section_name, context, rag_context, disallowed_services, diagram_components
+        )
+        raw = call_llm(system_prompt=system_prompt, user_prompt=user_prompt, use_cache=use_cache).strip()
+        return self._postprocess(section_name, raw, json_output)
+
+    async def awrite_section(
+        self,
+        section_name: str,
+        context: dict[str, Any],
+        rag_context: list[SectionChunk] | None = None,
+        disallowed_services: list[str] | None = None,
+        diagram_components: dict | None = None,
+        use_cache: bool = True,
+    ) -> str:
+        """Async :meth:`write_section` used by the orchestration pipeline."""
+        system_prompt, user_prompt, json_output = self._render_prompts(
+            section_name, context, rag_context, disallowed_services, diagram_components
+        )
+        raw = (
+            await acall_llm(system_prompt=system_prompt, user_prompt=user_prompt, use_cache=use_cache)
+        ).strip()
+        return self._postprocess(section_name, raw, json_output)
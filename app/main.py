@@ -3,28 +3,58 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import logging
 import json
 import os
 import re
+import threading
 import time
+import zipfile
+from io import BytesIO
 from pathlib import Path
-from typing import Any
+from uuid import uuid4
+from typing import Any, AsyncIterator, Callable, TypeVar
 
 from fastapi import FastAPI, HTTPException, Request, Form, File, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 
-from app.agents.architecture_vision import ArchitectureVisionAgent
+from app.agents.architecture_vision import ArchitectureVisionAgent, vision_cache_stats
 from app.agents.metadata_inference import MetadataInferenceAgent
 from app.agents.qa import QAAgent
 from app.agents.structure_controller import StructureController
 from app.agents.writer import WriterAgent
-from app.services.doc_builder import DocumentBuilder
+from app.services.artifact_store import Artifact, ArtifactStore, artifact_store_stats, get_artifact_store
+from app.services.doc_builder import IncrementalBuildError, template_cache_stats
+from app.services.job_store import (
+    JOB_FAILED,
+    JOB_SUCCEEDED,
+    JobCheckpoint,
+    JobQueueFull,
+    JobRecord,
+    JobRunner,
+    JobStore,
+    default_db_path,
+)
+from app.services.image_prep import docx_variants, image_cache_stats
+from app.services.llm import llm_cache_stats
+from app.services.oci_clients import get_registry
 from app.services.oci_multimodal import OCIClient
-from app.services.rag_service import SectionAwareRAGService, SectionChunk
+from app.services.rag_service import SectionAwareRAGService, SectionChunk, rag_cache_stats
+from app.services.rate_limiter import limiter_stats
+from app.services.render_pool import (
+    RenderJob,
+    RenderQueueFull,
+    RenderResult,
+    get_render_pool,
+    render_pool_stats,
+    shutdown_render_pool,
+)
+from app.services.session_pool import session_pool_stats, stop_session_pools
+from app.services.vision_executor import vision_executor_stats
 
 logging.basicConfig(
     level=logging.INFO,
@@ -97,12 +127,13 @@ async def _log_startup_version() -> None:
         len(_CUSTOMER_PREFIX_SUFFIXES),
         "agreement between " in _CUSTOMER_PREFIX_SUFFIXES,
     )
-    logger.info(
-        "startup.config rag_concurrency=%d vision_image_concurrency=%d writer_concurrency=%d",
-        _RAG_CONCURRENCY,
-        int(os.getenv("VISION_IMAGE_CONCURRENCY", "2")),
-        _WRITER_CONCURRENCY,
-    )
+    for limiter in limiter_stats():
+        logger.info(
+            "startup.rate_limit name=%s initial=%d max=%d",
+            limiter["name"],
+            limiter["limit"],
+            limiter["max_limit"],
+        )
 
 KNOWN_SERVICES = {
     "oke",
@@ -117,18 +148,6 @@ KNOWN_SERVICES = {
     "waf",
 }
 
-# Maximum number of concurrent OCI RAG calls during parallel fan-out.
-# Keeps concurrency below OCI rate-limit thresholds while still delivering
-# a significant speedup over fully sequential retrieval.
-_RAG_CONCURRENCY = int(os.getenv("RAG_CONCURRENCY", "4"))
-
-# Maximum number of concurrent LLM section-writing calls.
-# OCI Generative AI has per-compartment RPS limits; 4 concurrent calls
-# is a safe default that stays well within typical quotas while cutting
-# wall-clock writer time by ~75% vs fully sequential execution.
-_WRITER_CONCURRENCY = int(os.getenv("WRITER_CONCURRENCY", "4"))
-
-
 class SowInput(BaseModel):
     """Input payload for SoW generation."""
 
@@ -139,6 +158,9 @@ class SowInput(BaseModel):
     duration: str = Field(..., min_length=1)
     industry: str | None = None
     services: list[str] = Field(default_factory=list)
+    # Request option, not project context: set False to bypass the LLM
+    # response cache and force fresh drafts.  Excluded from the context dict.
+    use_cache: bool = True
 
 
 class SowOutput(BaseModel):
@@ -148,6 +170,62 @@ class SowOutput(BaseModel):
     markdown_file: str
 
 
+# Upper bound on the documents one /generate-sow/bulk request may ask for.
+_BULK_MAX_VARIANTS = int(os.getenv("BULK_MAX_VARIANTS", "12"))
+_BULK_RENDER_WAIT_SECONDS = float(os.getenv("BULK_RENDER_WAIT_SECONDS", "60"))
+
+
+class SowVariant(BaseModel):
+    """One document of a bulk request: what it changes on the shared project."""
+
+    # File name stem inside the returned zip (e.g. "emea-with-dr").
+    name: str = Field(..., min_length=1, max_length=80)
+    # Section names left out of this variant, e.g. "DISASTER RECOVERY".
+    excluded_sections: list[str] = Field(default_factory=list)
+    include_architect_review: bool = False
+    # None keeps the project's services list.
+    services: list[str] | None = None
+
+
+class BulkSowInput(BaseModel):
+    """Input payload for bulk SoW generation: one project, several variants."""
+
+    project: SowInput
+    variants: list[SowVariant] = Field(..., min_length=1, max_length=_BULK_MAX_VARIANTS)
+
+
+class SectionUpdateInput(BaseModel):
+    """Changed sections for an incremental rebuild of a generated DOCX."""
+
+    # Canonical section name (e.g. "HIGH AVAILABILITY") -> new content; an
+    # empty string removes the section's generated text.
+    sections: dict[str, str] = Field(..., min_length=1)
+    # Names substituted into template text the rebuild restores; default to
+    # the ones of the job that produced the document.
+    client: str = ""
+    project_name: str = ""
+
+
+class SectionUpdateOutput(BaseModel):
+    """Output payload for an incremental rebuild."""
+
+    file: str
+    base_file: str
+
+
+# Pipeline progress hook: called with an event name ("phase" / "section")
+# and a JSON-serialisable payload.
+ProgressCallback = Callable[[str, dict[str, Any]], None]
+
+_PayloadT = TypeVar("_PayloadT", bound=BaseModel)
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Seconds of silence after which the SSE stream sends a keep-alive comment so
+# reverse proxies do not close long-running generation requests.
+_SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+
 def _build_multimodal_client() -> OCIClient | None:
     try:
         return OCIClient()
@@ -164,18 +242,20 @@ def _assemble_document(sections: list[tuple[str, str]]) -> str:
     return "\n".join(chunks).strip()
 
 
-def _resolve_generated_file(file_name: str) -> Path:
-    """Resolve generated output file under app root and prevent path traversal."""
-    if not file_name or "/" in file_name or "\\" in file_name:
+def _artifact_store() -> ArtifactStore:
+    """Process-wide store for generated outputs."""
+    return get_artifact_store(Path(__file__).resolve().parent)
+
+
+def _resolve_generated_file(file_name: str) -> Artifact:
+    """Look up a generated output in the artifact store; rejects path-like names."""
+    if not file_name or "/" in file_name or "\\" in file_name or file_name.startswith("."):
         raise HTTPException(status_code=400, detail="Invalid file name")
 
-    app_root = Path(__file__).resolve().parent
-    file_path = (app_root / file_name).resolve()
-    if file_path.parent != app_root:
-        raise HTTPException(status_code=400, detail="Invalid file location")
-    if not file_path.exists() or not file_path.is_file():
+    artifact = _artifact_store().get(file_name)
+    if artifact is None:
         raise HTTPException(status_code=404, detail="File not found")
-    return file_path
+    return artifact
 
 
 def _mentioned_services(text: str) -> set[str]:
@@ -247,14 +327,42 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.get("/files/{file_name}")
-def download_generated_file(file_name: str) -> FileResponse:
-    """Download a generated SoW output file."""
-    file_path = _resolve_generated_file(file_name)
-    media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    if file_path.suffix.lower() == ".md":
-        media_type = "text/markdown"
-    return FileResponse(path=str(file_path), filename=file_path.name, media_type=media_type)
+@app.get("/metrics")
+def metrics() -> dict[str, Any]:
+    """Process-wide OCI rate limits, queue depth, pooled clients and sessions, and cache counters."""
+    return {
+        "rate_limits": limiter_stats(),
+        "oci_clients": get_registry().stats(),
+        "llm_cache": llm_cache_stats(),
+        "rag_cache": rag_cache_stats(),
+        "agent_sessions": session_pool_stats(),
+        "docx_template": template_cache_stats(),
+        "docx_render": render_pool_stats(),
+        "artifacts": artifact_store_stats(),
+        "image_prep": image_cache_stats(),
+        "vision_cache": vision_cache_stats(),
+        "vision_executor": vision_executor_stats(),
+    }
+
+
+@app.get("/files/{file_name}", response_model=None)
+def download_generated_file(file_name: str, request: Request) -> FileResponse | Response:
+    """Download a generated SoW output file.
+
+    Responses carry the artifact's content ETag: a matching ``If-None-Match``
+    gets ``304``, and ``Range`` / ``If-Range`` requests are answered with
+    partial content.
+    """
+    artifact = _resolve_generated_file(file_name)
+    if_none_match = request.headers.get("if-none-match", "")
+    if artifact.etag in {tag.strip() for tag in if_none_match.split(",")} or if_none_match.strip() == "*":
+        return Response(status_code=304, headers={"ETag": artifact.etag})
+    return FileResponse(
+        path=str(artifact.path),
+        filename=artifact.name,
+        media_type=artifact.media_type,
+        headers={"etag": artifact.etag, "Cache-Control": "private, max-age=0, must-revalidate"},
+    )
 
 
 def _diagram_analysis_notes(section: str, context: dict[str, Any]) -> str:
@@ -306,12 +414,112 @@ def _build_excluded_sections(
     return frozenset(excluded)
 
 
+async def _read_uploads(upload_files: list[UploadFile] | None) -> list[tuple[str, bytes]]:
+    """Read uploaded diagram files into ``(filename, bytes)`` pairs.
+
+    Files without a filename (empty form fields) are skipped.  Reading up
+    front lets the pipeline outlive the request handler — FastAPI closes
+    uploads as soon as the endpoint returns, before a streamed body is sent.
+    """
+    file_data: list[tuple[str, bytes]] = []
+    for uf in upload_files or []:
+        if not uf.filename:
+            continue
+        file_bytes = await uf.read()
+        await uf.seek(0)
+        file_data.append((uf.filename, file_bytes))
+    return file_data
+
+
+async def _retrieve_rag_map(
+    context: dict[str, Any],
+    dynamic_sections: list[str],
+    strict_rag_indexing: bool,
+    emit: ProgressCallback,
+    use_cache: bool = True,
+) -> dict[str, list[SectionChunk]]:
+    """Fetch RAG context for every dynamic section (pipeline phase 2).
+
+    Retrievals come from the process-wide RAG cache when the same semantic
+    query was already answered for the current knowledge-base version.
+    """
+    rag_service = SectionAwareRAGService.from_env()
+    logger.info("workflow.rag_start strict=%s", strict_rag_indexing)
+    if strict_rag_indexing:
+        indexed_count = rag_service.refresh_from_env()
+        logger.info("workflow.rag_count indexed_count=%s", indexed_count)
+        if indexed_count == 0:
+            raise ValueError("CRITICAL: No documents indexed - cannot generate with RAG")
+        diagnostic_ok = rag_service.diagnose_vector_store()
+        if not diagnostic_ok:
+            raise ValueError("CRITICAL: Vector store empty after indexing")
+    else:
+        logger.info("workflow.rag_skip_diagnostic strict=false skipping count and diagnostic")
+
+    # Phase 2: Fan-out RAG retrieval for all dynamic sections in parallel.
+    # OCI KB calls are awaited over the async transport, so no worker thread is
+    # held per call.  Concurrency is capped by the process-wide agent_runtime
+    # limiter, shared with every other in-flight request.  Sections that fall
+    # back to another section's results (e.g. FUTURE STATE ARCHITECTURE) join
+    # that section's in-flight search inside the RAG service (single-flight),
+    # so no pre-warm or retry pass is needed.
+    _t0_rag = time.monotonic()
+    logger.info("workflow.rag_parallel_start sections=%d", len(dynamic_sections))
+    emit("phase", {"phase": "rag", "status": "started", "sections": len(dynamic_sections)})
+
+    async def _fetch_rag(sec: str) -> tuple[str, list]:
+        return sec, await rag_service.aretrieve_section_context(
+            section=sec,
+            project_data=context,
+            use_cache=use_cache,
+        )
+
+    rag_map: dict[str, list] = dict(
+        await asyncio.gather(*[_fetch_rag(s) for s in dynamic_sections])
+    )
+
+    logger.info(
+        "workflow.rag_parallel_complete elapsed=%.1fs sections=%d",
+        time.monotonic() - _t0_rag,
+        len(dynamic_sections),
+    )
+    emit(
+        "phase",
+        {
+            "phase": "rag",
+            "status": "complete",
+            "elapsed_s": round(time.monotonic() - _t0_rag, 1),
+            "empty_sections": sorted(s for s in dynamic_sections if not rag_map[s]),
+        },
+    )
+    return rag_map
+
+
+def _chunk_to_json(chunk: Any) -> dict[str, Any]:
+    if isinstance(chunk, SectionChunk):
+        return dataclasses.asdict(chunk)
+    return {"section": "", "text": str(chunk)}
+
+
+def _chunk_from_json(data: dict[str, Any]) -> SectionChunk:
+    return SectionChunk(
+        section=data.get("section", ""),
+        text=data.get("text", ""),
+        client=data.get("client", ""),
+        industry=data.get("industry", ""),
+        services=tuple(data.get("services") or ()),
+    )
+
+
 async def _run_sow_pipeline(
     context: dict[str, Any],
-    current_architecture_images: list[UploadFile],
-    target_architecture_images: list[UploadFile],
+    current_architecture_images: list[tuple[str, bytes]],
+    target_architecture_images: list[tuple[str, bytes]],
     project_root: Path,
     excluded_sections: frozenset[str] = frozenset(),
+    progress: ProgressCallback | None = None,
+    checkpoint: JobCheckpoint | None = None,
+    use_cache: bool = True,
 ) -> tuple[list[tuple[str, str]], str, dict[str, list[tuple[str, bytes]]]]:
     """Core SoW generation pipeline shared by all generation endpoints.
 
@@ -319,11 +527,24 @@ async def _run_sow_pipeline(
         context: Project context dict (client, project_name, cloud, scope, …).
             **Mutated in-place** to add ``architecture_analysis`` and
             ``inferred_metadata`` keys during execution.
-        current_architecture_images: Uploaded current-state diagram files.
-        target_architecture_images: Uploaded target-state diagram files.
+        current_architecture_images: Current-state diagrams as
+            ``(filename, bytes)`` pairs (see :func:`_read_uploads`).
+        target_architecture_images: Target-state diagrams, same shape.
         project_root: Absolute path to the ``app/`` directory.
         excluded_sections: Section names (uppercased) to skip entirely —
             no LLM call is made and they are omitted from the output list.
+        progress: Optional ``(event, data)`` callback invoked as each phase
+            starts/completes and as each section becomes available.  Section
+            events are emitted in canonical order, so a section finished early
+            is held back until every section before it is done.
+        checkpoint: Optional per-job checkpoint store.  Each finished phase
+            output (``vision``, ``metadata``, ``rag_map``, ``section:<NAME>``,
+            ``reviewed``) is saved to it, and phases that already have a
+            checkpoint are skipped — this is how background jobs resume.
+        use_cache: Replay cached LLM responses for byte-identical section
+            prompts, cached RAG retrievals for identical queries and cached
+            analyses of previously seen diagrams; ``False`` forces fresh
+            diagram analysis and retrievals and redrafts every section.
 
     Returns:
         A 3-tuple of:
@@ -333,41 +554,39 @@ async def _run_sow_pipeline(
         * ``diagram_image_bytes`` – mapping from ``"current"`` / ``"target"``
           to a list of ``(filename, bytes)`` tuples for DOCX image embedding.
     """
+    emit: ProgressCallback = progress or (lambda _event, _data: None)
     writer = WriterAgent()
     qa = QAAgent()
-    architecture_vision = ArchitectureVisionAgent(llm_client=_build_multimodal_client())
+    architecture_vision = ArchitectureVisionAgent(llm_client=_build_multimodal_client(), use_cache=use_cache)
 
     architecture_analysis: dict[str, Any] = {}
-    diagram_image_bytes: dict[str, list[tuple[str, bytes]]] = {}
-    _vision_inputs: list[tuple] = []
-    current_valid = [f for f in (current_architecture_images or []) if f.filename]
-    target_valid = [f for f in (target_architecture_images or []) if f.filename]
-    if current_valid:
-        _vision_inputs.append((current_valid, "current"))
-    if target_valid:
-        _vision_inputs.append((target_valid, "target"))
-
-    if _vision_inputs:
+    _vision_inputs: list[tuple[list[tuple[str, bytes]], str]] = []
+    if current_architecture_images:
+        _vision_inputs.append((current_architecture_images, "current"))
+    if target_architecture_images:
+        _vision_inputs.append((target_architecture_images, "target"))
+    # Always retain all image bytes for DOCX placeholder embedding, even when
+    # vision analysis fails.
+    diagram_image_bytes: dict[str, list[tuple[str, bytes]]] = {
+        role: files for files, role in _vision_inputs
+    }
+
+    _saved_vision = checkpoint.get("vision") if checkpoint else None
+    if _saved_vision is not None:
+        logger.info("workflow.vision_resumed roles=%s", sorted(_saved_vision))
+        architecture_analysis = _saved_vision
+    elif _vision_inputs:
         _t0_vision = time.monotonic()
         logger.info("workflow.vision_parallel_start diagrams=%d", len(_vision_inputs))
+        emit("phase", {"phase": "vision", "status": "started", "diagrams": len(_vision_inputs)})
 
         async def _run_vision(
-            upload_files: list, role: str
-        ) -> tuple[str, dict[str, Any], list[tuple[str, bytes]]]:
-            file_data: list[tuple[str, bytes]] = []
-            for uf in upload_files:
-                file_bytes = await uf.read()
-                await uf.seek(0)
-                file_data.append((uf.filename or f"image_{len(file_data)}.png", file_bytes))
-            result = await asyncio.to_thread(
-                architecture_vision.analyze_many,
-                file_data,
-                role,
-            )
-            return role, result, file_data
+            file_data: list[tuple[str, bytes]], role: str
+        ) -> tuple[str, dict[str, Any]]:
+            return role, await architecture_vision.aanalyze_many(file_data, role)
 
         vision_results = await asyncio.gather(
-            *[_run_vision(ufs, role) for ufs, role in _vision_inputs]
+            *[_run_vision(files, role) for files, role in _vision_inputs]
         )
         logger.info(
             "workflow.vision_parallel_complete elapsed=%.1fs diagrams=%d",
@@ -375,7 +594,7 @@ async def _run_sow_pipeline(
             len(_vision_inputs),
         )
 
-        for role, result, file_data in vision_results:
+        for role, result in vision_results:
             arch_error = result.get("architecture_extraction", {}).get("error")
             if arch_error:
                 logger.warning(
@@ -385,10 +604,17 @@ async def _run_sow_pipeline(
                 )
             else:
                 architecture_analysis[role] = result
-            # Always retain all image bytes for DOCX placeholder embedding,
-            # even when vision analysis fails.
-            if file_data:
-                diagram_image_bytes[role] = file_data
+        if checkpoint:
+            checkpoint.put("vision", architecture_analysis)
+        emit(
+            "phase",
+            {
+                "phase": "vision",
+                "status": "complete",
+                "elapsed_s": round(time.monotonic() - _t0_vision, 1),
+                "analyzed": sorted(architecture_analysis),
+            },
+        )
 
     if architecture_analysis:
         context["architecture_analysis"] = architecture_analysis
@@ -396,107 +622,53 @@ async def _run_sow_pipeline(
     # ── Metadata inference ──────────────────────────────────────────────
     # LLM call to extract structured customer/project/architecture metadata
     # used to fill Company Profile, App Details, DB Tier, App Tier, and BOM
-    # tables in the DOCX.  Runs synchronously (fast, single LLM call).
+    # tables in the DOCX.  A single awaited LLM call.
     logger.info("Swarm flow step: MetadataInferenceAgent")
-    _t0_meta = time.monotonic()
-    metadata_inference = MetadataInferenceAgent()
-    inferred_metadata = await asyncio.to_thread(metadata_inference.infer, context)
-    logger.info(
-        "workflow.metadata_inference_complete elapsed=%.1fs keys=%s bom=%d",
-        time.monotonic() - _t0_meta,
-        list(inferred_metadata.keys()),
-        len(inferred_metadata.get("oci_bom") or []),
-    )
+    inferred_metadata = checkpoint.get("metadata") if checkpoint else None
+    if inferred_metadata is None:
+        emit("phase", {"phase": "metadata", "status": "started"})
+        _t0_meta = time.monotonic()
+        metadata_inference = MetadataInferenceAgent()
+        inferred_metadata = await metadata_inference.ainfer(context)
+        logger.info(
+            "workflow.metadata_inference_complete elapsed=%.1fs keys=%s bom=%d",
+            time.monotonic() - _t0_meta,
+            list(inferred_metadata.keys()),
+            len(inferred_metadata.get("oci_bom") or []),
+        )
+        if checkpoint:
+            checkpoint.put("metadata", inferred_metadata)
+        emit(
+            "phase",
+            {
+                "phase": "metadata",
+                "status": "complete",
+                "elapsed_s": round(time.monotonic() - _t0_meta, 1),
+            },
+        )
     context["inferred_metadata"] = inferred_metadata
 
     logger.info("Swarm flow step: ArchitectureContextBuilder")
 
     structure = StructureController(template_root=project_root / "templates")
-    rag_service = SectionAwareRAGService.from_env()
-
     strict_rag_indexing = os.getenv("RAG_STRICT_INDEXING", "false").casefold() == "true"
-    logger.info("workflow.rag_start strict=%s", strict_rag_indexing)
-    if strict_rag_indexing:
-        indexed_count = rag_service.refresh_from_env()
-        logger.info("workflow.rag_count indexed_count=%s", indexed_count)
-        if indexed_count == 0:
-            raise ValueError("CRITICAL: No documents indexed - cannot generate with RAG")
-        diagnostic_ok = rag_service.diagnose_vector_store()
-        if not diagnostic_ok:
-            raise ValueError("CRITICAL: Vector store empty after indexing")
-    else:
-        rag_service.clear_cache()
-        logger.info("workflow.rag_cache_cleared strict=false skipping count and diagnostic")
-
-    # Phase 2: Fan-out RAG retrieval for all dynamic sections in parallel.
-    # OCI KB calls are blocking I/O; asyncio.to_thread runs each in the default
-    # thread-pool executor so the event loop stays responsive.  A semaphore caps
-    # concurrency at RAG_CONCURRENCY (default 4) to stay within OCI rate limits.
     dynamic_sections = [s for s in structure.sections() if not structure.is_static(s)]
-    _t0_rag = time.monotonic()
-    logger.info(
-        "workflow.rag_parallel_start sections=%d concurrency=%d",
-        len(dynamic_sections),
-        _RAG_CONCURRENCY,
-    )
 
-    _rag_sem = asyncio.Semaphore(_RAG_CONCURRENCY)
-
-    async def _fetch_rag(sec: str) -> tuple[str, list]:
-        async with _rag_sem:
-            return sec, await asyncio.to_thread(
-                rag_service.retrieve_section_context,
-                section=sec,
-                project_data=context,
+    _saved_rag = checkpoint.get("rag_map") if checkpoint else None
+    if _saved_rag is not None:
+        logger.info("workflow.rag_resumed sections=%d", len(_saved_rag))
+        rag_map = {
+            sec: [_chunk_from_json(chunk) for chunk in chunks]
+            for sec, chunks in _saved_rag.items()
+        }
+    else:
+        rag_map = await _retrieve_rag_map(context, dynamic_sections, strict_rag_indexing, emit, use_cache)
+        if checkpoint:
+            checkpoint.put(
+                "rag_map",
+                {sec: [_chunk_to_json(chunk) for chunk in chunks] for sec, chunks in rag_map.items()},
             )
 
-    # Pre-warm phase: fetch the two most-common fallback targets before the main
-    # parallel gather.  FUTURE STATE ARCHITECTURE is a fallback for 7 sections;
-    # CURRENT STATE ARCHITECTURE for 5.  Pre-warming them ensures every section
-    # that fails its direct lookup finds a warm cache entry instead of issuing a
-    # redundant serial OCI KB query for the same fallback target.
-    # The second call in the main gather below hits the cache immediately (free).
-    _PREWARM = [
-        s for s in ("FUTURE STATE ARCHITECTURE", "CURRENT STATE ARCHITECTURE")
-        if s in set(dynamic_sections)
-    ]
-    if _PREWARM:
-        logger.info("workflow.rag_prewarm_start sections=%s", _PREWARM)
-        await asyncio.gather(*[_fetch_rag(s) for s in _PREWARM])
-        logger.info("workflow.rag_prewarm_complete")
-
-    rag_map: dict[str, list] = dict(
-        await asyncio.gather(*[_fetch_rag(s) for s in dynamic_sections])
-    )
-
-    # Phase 2 (warm-cache retry): sections that returned zero chunks in Phase 1
-    # may have lost a race where their fallback target (e.g. FUTURE STATE
-    # ARCHITECTURE) was still being fetched concurrently.  Now that all primaries
-    # are cached, re-run only the empty sections; the cache shortcut in
-    # _retrieve_by_section will fire for any fallback target already in cache.
-    _empty_sections = [s for s in dynamic_sections if not rag_map[s]]
-    if _empty_sections:
-        logger.info(
-            "workflow.rag_phase2_start sections=%d — retrying zero-result with warm cache",
-            len(_empty_sections),
-        )
-        _phase2 = dict(
-            await asyncio.gather(*[_fetch_rag(s) for s in _empty_sections])
-        )
-        rag_map.update(_phase2)
-        _still_empty = [s for s in _empty_sections if not rag_map[s]]
-        logger.info(
-            "workflow.rag_phase2_complete sections=%d still_empty=%d",
-            len(_empty_sections),
-            len(_still_empty),
-        )
-
-    logger.info(
-        "workflow.rag_parallel_complete elapsed=%.1fs sections=%d",
-        time.monotonic() - _t0_rag,
-        len(dynamic_sections),
-    )
-
     # Extract target diagram components once; passed to WriterAgent for the
     # ARCHITECTURE COMPONENTS section so the LLM uses only real services.
     _target_arch = (
@@ -538,19 +710,23 @@ async def _run_sow_pipeline(
             _current_diagram_components = {"deployment_topology": _current_topology}
 
     # Phase 2: Fan-out section writing for all sections in parallel.
-    # Each LLM call is a blocking OCI HTTP request; asyncio.to_thread wraps it
-    # so the event loop stays responsive.  A semaphore caps concurrency at
-    # WRITER_CONCURRENCY (default 4) to stay within OCI RPS limits.
+    # Each LLM call is awaited over the async OCI transport, so the event loop
+    # multiplexes in-flight requests without a thread each.  Concurrency is
+    # capped by the process-wide inference limiter (see rate_limiter), which
+    # adapts to OCI throttling across all concurrent SoW requests.
     logger.info("Swarm flow step: StructureController")
 
-    _writer_sem = asyncio.Semaphore(_WRITER_CONCURRENCY)
-
     async def _write_one(section: str) -> tuple[str, str]:
         """Write or inject a single SoW section, returning (name, content)."""
         if structure.is_static(section):
             logger.info("Swarm flow step: section=%s static template injection", section)
             return section, structure.inject_template(section)
 
+        _saved_section = await checkpoint.aget(f"section:{section}") if checkpoint else None
+        if _saved_section is not None:
+            logger.info("Swarm flow step: section=%s resumed from checkpoint", section)
+            return section, _saved_section
+
         rag_ctx = rag_map[section]
         logger.info(
             "Swarm flow step: section=%s retrieve_by_section returned %d chunks",
@@ -598,15 +774,14 @@ async def _run_sow_pipeline(
                 )
 
         disallowed = _disallowed_services(context)
-        async with _writer_sem:
-            section_content = await asyncio.to_thread(
-                writer.write_section,
-                section_name=section,
-                context=context,
-                rag_context=rag_ctx,
-                disallowed_services=disallowed,
-                diagram_components=_section_diagram_components,
-            )
+        section_content = await writer.awrite_section(
+            section_name=section,
+            context=context,
+            rag_context=rag_ctx,
+            disallowed_services=disallowed,
+            diagram_components=_section_diagram_components,
+            use_cache=use_cache,
+        )
 
         if disallowed:
             mentioned = _mentioned_services(section_content)
@@ -624,21 +799,52 @@ async def _run_sow_pipeline(
         if diag_notes:
             logger.debug("section=%s diagram_analysis_notes=%s", section, diag_notes)
 
+        if checkpoint:
+            checkpoint.put(f"section:{section}", section_content)
         return section, section_content
 
     _t0_writer = time.monotonic()
-    logger.info(
-        "workflow.writer_parallel_start sections=%d concurrency=%d",
-        len(structure.sections()),
-        _WRITER_CONCURRENCY,
-    )
+    logger.info("workflow.writer_parallel_start sections=%d", len(structure.sections()))
     _active_sections = [s for s in structure.sections() if s not in excluded_sections]
-    _write_results = await asyncio.gather(*[_write_one(s) for s in _active_sections])
+    emit("phase", {"phase": "writing", "status": "started", "sections": len(_active_sections)})
+
+    # Sections finish out of order; stream them in canonical order by holding
+    # each finished section until every section before it has been emitted.
+    _finished: dict[str, str] = {}
+    _next_index = 0
+
+    async def _write_and_emit(section: str) -> tuple[str, str]:
+        nonlocal _next_index
+        result = await _write_one(section)
+        _finished[section] = result[1]
+        while _next_index < len(_active_sections) and _active_sections[_next_index] in _finished:
+            name = _active_sections[_next_index]
+            emit(
+                "section",
+                {
+                    "index": _next_index,
+                    "total": len(_active_sections),
+                    "section": name,
+                    "content": _finished[name],
+                },
+            )
+            _next_index += 1
+        return result
+
+    _write_results = await asyncio.gather(*[_write_and_emit(s) for s in _active_sections])
     logger.info(
         "workflow.writer_parallel_complete elapsed=%.1fs sections=%d",
         time.monotonic() - _t0_writer,
         len(structure.sections()),
     )
+    emit(
+        "phase",
+        {
+            "phase": "writing",
+            "status": "complete",
+            "elapsed_s": round(time.monotonic() - _t0_writer, 1),
+        },
+    )
 
     # Reassemble in canonical section order.  asyncio.gather preserves
     # submission order so the dict rebuild is equivalent, but being explicit
@@ -653,11 +859,246 @@ async def _run_sow_pipeline(
 
     assembled = _assemble_document(drafted_sections)
     logger.info("Swarm flow step: QAAgent (light validation)")
-    reviewed = qa.review_document(assembled)
+    reviewed = checkpoint.get("reviewed") if checkpoint else None
+    if reviewed is None:
+        emit("phase", {"phase": "qa", "status": "started"})
+        reviewed = await qa.areview_document(assembled)
+        if checkpoint:
+            checkpoint.put("reviewed", reviewed)
+        emit("phase", {"phase": "qa", "status": "complete"})
 
     return drafted_sections, reviewed, diagram_image_bytes
 
 
+async def _parse_sow_request(
+    request: Request, project_data: str | None, model: type[_PayloadT] = SowInput
+) -> _PayloadT:
+    """Read the SoW payload from a JSON body or the ``project_data`` form field."""
+    content_type = (request.headers.get("content-type") or "").lower()
+    if "application/json" in content_type:
+        body = await request.json()
+        return model(**body)
+    payload_raw = project_data
+    if (payload_raw is None or not payload_raw.strip()) and hasattr(request, "form"):
+        form = await request.form()
+        payload_raw = str(form.get("project_data") or "")
+    if not payload_raw:
+        raise HTTPException(status_code=400, detail="project_data is required")
+    return model(**json.loads(payload_raw))
+
+
+def _form_flag(value: str | None, default: bool) -> bool:
+    """Parse a ``true``/``false`` style form field, falling back to *default*."""
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in ("true", "1", "yes", "on")
+
+
+def _legacy_form_context(customer: str, application: str, scope: str, impdetails: str) -> dict[str, Any]:
+    """Build a SoW context dict from the legacy ``/generate-markdown/`` form fields."""
+    full_scope = scope.strip()
+    if impdetails.strip():
+        full_scope = f"{full_scope}\n\nImplementation Details:\n{impdetails.strip()}".strip()
+    if not full_scope:
+        full_scope = "To be defined."
+
+    return {
+        "client": customer,
+        "project_name": application,
+        "cloud": "OCI",
+        "scope": full_scope,
+        "duration": "PENDING TO REVIEW",
+        "industry": None,
+        "services": [],
+    }
+
+
+def _template_path(project_root: Path) -> Path:
+    return project_root / "templates" / "sow_template.docx"
+
+
+async def _build_outputs(
+    context: dict[str, Any],
+    drafted_sections: list[tuple[str, str]],
+    reviewed: str,
+    diagram_image_bytes: dict[str, list[tuple[str, bytes]]],
+    project_root: Path,
+    include_review: bool,
+    excluded_sections: frozenset[str],
+    in_memory: bool = False,
+    job_id: str | None = None,
+) -> RenderResult:
+    """Render the DOCX and Markdown outputs on the render pool.
+
+    Diagrams are embedded as their page-width DOCX variants (see
+    :mod:`app.services.image_prep`), normally already prepared while the
+    vision agent analysed them.  The files are written to the artifact
+    store's staging directory and then indexed (owned by *job_id*, when
+    given).  With *in_memory* only the DOCX is built and its bytes are
+    returned instead of file names; nothing is written to disk.
+    """
+    store = _artifact_store()
+    job = RenderJob(
+        template_path=str(_template_path(project_root)),
+        output_dir=str(store.staging_dir),
+        sections=drafted_sections,
+        markdown=reviewed,
+        customer_name=context.get("client", "") or "",
+        project_name=context.get("project_name", "") or "",
+        diagram_images=await asyncio.to_thread(docx_variants, diagram_image_bytes or {}),
+        project_context=context,
+        include_architect_review=include_review,
+        excluded_sections=excluded_sections,
+        in_memory=in_memory,
+    )
+    result = await get_render_pool(_template_path(project_root)).render(job)
+    for name in (result.file_name, result.markdown_name):
+        if name:
+            await asyncio.to_thread(store.add, store.staging_dir / name, job_id)
+    return result
+
+
+def _wants_docx(request: Request) -> bool:
+    """True when the client asked for the DOCX itself rather than file names."""
+    return DOCX_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+@app.post("/files/{file_name}/sections", response_model=SectionUpdateOutput)
+async def update_generated_sections(
+    file_name: str, payload: SectionUpdateInput, request: Request
+) -> SectionUpdateOutput | Response:
+    """Rebuild a generated DOCX with some sections replaced.
+
+    Only the changed sections are re-rendered into a copy of *file_name*
+    (see :meth:`DocumentBuilder.rebuild`); the result is stored as a new
+    artifact owned by the same job, and *file_name* is kept.  As with
+    ``/generate-sow``, an ``Accept`` of the DOCX media type returns the
+    document itself.  Documents built before section markers existed answer
+    ``409`` and must be regenerated.
+    """
+    artifact = _resolve_generated_file(file_name)
+    if artifact.media_type != DOCX_MEDIA_TYPE:
+        raise HTTPException(status_code=400, detail="Only DOCX outputs can be updated")
+
+    client, project_name = payload.client, payload.project_name
+    if artifact.job_id and not (client and project_name):
+        record = await asyncio.to_thread(_job_runner().store.get, artifact.job_id)
+        context = record.params.get("context", {}) if record is not None else {}
+        client = client or context.get("client", "") or ""
+        project_name = project_name or context.get("project_name", "") or ""
+
+    project_root = Path(__file__).resolve().parent
+    store = _artifact_store()
+    in_memory = _wants_docx(request)
+    job = RenderJob(
+        template_path=str(_template_path(project_root)),
+        output_dir=str(store.staging_dir),
+        sections=[(name.upper(), content) for name, content in payload.sections.items()],
+        markdown="",
+        customer_name=client,
+        project_name=project_name,
+        in_memory=in_memory,
+        base_file=str(artifact.path),
+    )
+    try:
+        result = await get_render_pool(_template_path(project_root)).render(job)
+    except RenderQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except IncrementalBuildError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except Exception as exc:
+        logger.exception("Section update failed file=%s", file_name)
+        raise HTTPException(status_code=500, detail="Failed to update SoW sections") from exc
+
+    if in_memory:
+        return Response(
+            content=result.docx,
+            media_type=DOCX_MEDIA_TYPE,
+            headers={"Content-Disposition": f'attachment; filename="output_{uuid4().hex}.docx"'},
+        )
+    await asyncio.to_thread(store.add, store.staging_dir / result.file_name, artifact.job_id)
+    return SectionUpdateOutput(file=result.file_name, base_file=file_name)
+
+
+def _sse_event(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_sow_pipeline(
+    context: dict[str, Any],
+    current_images: list[tuple[str, bytes]],
+    target_images: list[tuple[str, bytes]],
+    project_root: Path,
+    include_review: bool,
+    excluded_sections: frozenset[str],
+    include_markdown: bool = False,
+    use_cache: bool = True,
+) -> AsyncIterator[str]:
+    """Run the pipeline in a task and relay its progress as SSE frames.
+
+    Emits ``phase`` and ``section`` events while the pipeline runs, then one
+    ``complete`` event with the output file names (and the reviewed markdown
+    body when *include_markdown* is set), or an ``error`` event on failure.
+    The pipeline task is cancelled if the client disconnects.
+    """
+    queue: asyncio.Queue[tuple[str, dict[str, Any]] | None] = asyncio.Queue()
+
+    async def _run() -> dict[str, Any]:
+        drafted_sections, reviewed, diagram_image_bytes = await _run_sow_pipeline(
+            context, current_images, target_images, project_root,
+            excluded_sections=excluded_sections,
+            progress=lambda event, data: queue.put_nowait((event, data)),
+            use_cache=use_cache,
+        )
+        logger.info("Swarm flow step: DocBuilder (stream)")
+        queue.put_nowait(("phase", {"phase": "build", "status": "started"}))
+        outputs = await _build_outputs(
+            context, drafted_sections, reviewed, diagram_image_bytes,
+            project_root, include_review, excluded_sections,
+        )
+        result: dict[str, Any] = {"file": outputs.file_name, "markdown_file": outputs.markdown_name}
+        if include_markdown:
+            result["markdown"] = reviewed
+        return result
+
+    task = asyncio.create_task(_run())
+    task.add_done_callback(lambda _task: queue.put_nowait(None))
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=_SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:
+                break
+            yield _sse_event(*item)
+
+        exc = task.exception()
+        if exc is not None:
+            logger.error("SoW generation (stream) failed", exc_info=exc)
+            yield _sse_event("error", {"detail": "Failed to generate SoW"})
+        else:
+            yield _sse_event("complete", task.result())
+    finally:
+        if not task.done():
+            logger.info("workflow.stream_client_disconnected — cancelling pipeline")
+            task.cancel()
+
+
+def _sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            # Disable response buffering in nginx-style reverse proxies.
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @app.post("/generate-sow", response_model=SowOutput)
 async def generate_sow(
     request: Request,
@@ -668,54 +1109,515 @@ async def generate_sow(
     include_ha: str | None = Form(None),
     include_backup: str | None = Form(None),
     include_dr: str | None = Form(None),
-) -> SowOutput:
-    """Generate SoW DOCX and Markdown files using deterministic section orchestration."""
+) -> SowOutput | Response:
+    """Generate SoW DOCX and Markdown files using deterministic section orchestration.
+
+    Clients that send ``Accept: application/vnd.openxmlformats-officedocument.
+    wordprocessingml.document`` receive the DOCX as the response body instead
+    of output file names; it is serialised in memory and never written to
+    disk, so no ``/files`` download (or Markdown file) follows.
+    """
 
     try:
-        content_type = (request.headers.get("content-type") or "").lower()
-        if "application/json" in content_type:
-            body = await request.json()
-            payload_model = SowInput(**body)
-        else:
-            payload_raw = project_data
-            if (payload_raw is None or not payload_raw.strip()) and hasattr(request, "form"):
-                form = await request.form()
-                payload_raw = str(form.get("project_data") or "")
-            if not payload_raw:
-                raise HTTPException(status_code=400, detail="project_data is required")
-            payload_model = SowInput(**json.loads(payload_raw))
-
-        context: dict[str, Any] = payload_model.model_dump()
+        payload_model = await _parse_sow_request(request, project_data)
+        context: dict[str, Any] = payload_model.model_dump(exclude={"use_cache"})
         project_root = Path(__file__).resolve().parent
         _include_review = (include_architect_review or "").lower() in ("true", "1", "yes", "on")
         _excluded = _build_excluded_sections(include_ha, include_backup, include_dr)
 
         drafted_sections, reviewed, diagram_image_bytes = await _run_sow_pipeline(
-            context, current_architecture_images, target_architecture_images, project_root,
+            context,
+            await _read_uploads(current_architecture_images),
+            await _read_uploads(target_architecture_images),
+            project_root,
             excluded_sections=_excluded,
+            use_cache=payload_model.use_cache,
         )
 
         logger.info("Swarm flow step: DocBuilder")
-        builder = DocumentBuilder(
-            template_path=project_root / "templates" / "sow_template.docx",
-            customer_name=context.get("client", ""),
-            project_name=context.get("project_name", ""),
+        in_memory = _wants_docx(request)
+        outputs = await _build_outputs(
+            context, drafted_sections, reviewed, diagram_image_bytes,
+            project_root, _include_review, _excluded, in_memory=in_memory,
         )
-        file_name = builder.build(
-            sections=drafted_sections,
-            output_dir=project_root,
-            diagram_images=diagram_image_bytes or None,
-            project_context=context,
-            include_architect_review=_include_review,
-            excluded_sections=_excluded,
-        )
-        markdown_name = builder.build_markdown(full_document=reviewed, output_dir=project_root)
-        return SowOutput(file=file_name, markdown_file=markdown_name)
+        if in_memory:
+            return Response(
+                content=outputs.docx,
+                media_type=DOCX_MEDIA_TYPE,
+                headers={"Content-Disposition": f'attachment; filename="output_{uuid4().hex}.docx"'},
+            )
+        return SowOutput(file=outputs.file_name, markdown_file=outputs.markdown_name)
+    except RenderQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
     except Exception as exc:
         logger.exception("SoW generation failed")
         raise HTTPException(status_code=500, detail="Failed to generate SoW") from exc
 
 
+@app.post("/generate-sow/stream")
+async def generate_sow_stream(
+    request: Request,
+    project_data: str | None = Form(None),
+    current_architecture_images: list[UploadFile] = File(default=[]),
+    target_architecture_images: list[UploadFile] = File(default=[]),
+    include_architect_review: str | None = Form(None),
+    include_ha: str | None = Form(None),
+    include_backup: str | None = Form(None),
+    include_dr: str | None = Form(None),
+) -> StreamingResponse:
+    """Streaming variant of ``/generate-sow`` using Server-Sent Events.
+
+    Accepts the same JSON or form payload.  The response is a
+    ``text/event-stream`` of ``phase`` events (vision, metadata, rag,
+    writing, qa, build — each ``started`` then ``complete``), one
+    ``section`` event per section in canonical order as soon as it and all
+    preceding sections are written, and a final ``complete`` event carrying
+    ``file`` and ``markdown_file`` (or ``error`` on failure).
+    """
+    try:
+        payload_model = await _parse_sow_request(request, project_data)
+        current_images = await _read_uploads(current_architecture_images)
+        target_images = await _read_uploads(target_architecture_images)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        logger.exception("SoW generation (stream) rejected request")
+        raise HTTPException(status_code=500, detail="Failed to generate SoW") from exc
+
+    return _sse_response(
+        _stream_sow_pipeline(
+            payload_model.model_dump(exclude={"use_cache"}),
+            current_images,
+            target_images,
+            Path(__file__).resolve().parent,
+            include_review=(include_architect_review or "").lower() in ("true", "1", "yes", "on"),
+            excluded_sections=_build_excluded_sections(include_ha, include_backup, include_dr),
+            use_cache=payload_model.use_cache,
+        )
+    )
+
+
+class _BulkCheckpoint:
+    """Pipeline checkpoint through which the variants of a bulk request share work.
+
+    The vision analysis is stored once for every variant.  Metadata (whose
+    BOM is derived from the services), RAG retrieval (whose queries include
+    them) and section drafts depend on the variant only through its services
+    list, so they are keyed by it; the QA review is keyed by services and
+    exclusions, i.e. by the assembled document it reviewed.
+
+    Section drafts are single-flight: the first variant to miss a section
+    claims it in *pending*, and variants reading it meanwhile wait for that
+    draft instead of writing their own.  :meth:`release` drops the claims a
+    variant leaves unfulfilled (it failed, or stored nothing), so a waiter
+    claims the section in its place.
+    """
+
+    _SHARED_PHASES = frozenset({"vision"})
+    _SERVICES_PHASES = frozenset({"metadata", "rag_map"})
+
+    def __init__(
+        self,
+        values: dict[tuple, Any],
+        pending: dict[tuple, asyncio.Future],
+        services: tuple[str, ...],
+        excluded: frozenset[str],
+    ) -> None:
+        self.values = values
+        self.pending = pending
+        self.services = services
+        self.excluded = excluded
+        self._claims: dict[tuple, asyncio.Future] = {}
+
+    def _key(self, name: str) -> tuple:
+        if name in self._SHARED_PHASES:
+            return (name,)
+        if name in self._SERVICES_PHASES or name.startswith("section:"):
+            return (name, self.services)
+        return (name, self.services, tuple(sorted(self.excluded)))
+
+    def get(self, name: str) -> Any | None:
+        return self.values.get(self._key(name))
+
+    async def aget(self, name: str) -> Any | None:
+        """Like :meth:`get`, but wait for another variant's claim on *name*.
+
+        Returns ``None`` after claiming *name* for this variant.
+        """
+        key = self._key(name)
+        while key not in self.values:
+            claim = self.pending.get(key)
+            if claim is None:
+                self.pending[key] = self._claims[key] = asyncio.get_running_loop().create_future()
+                return None
+            # Shielded: a cancelled waiter must not cancel the claim others await.
+            await asyncio.shield(claim)
+        return self.values[key]
+
+    def put(self, name: str, value: Any) -> None:
+        key = self._key(name)
+        self.values[key] = value
+        self._settle(key)
+
+    def release(self) -> None:
+        for key in list(self._claims):
+            self._settle(key)
+
+    def _settle(self, key: tuple) -> None:
+        claim = self._claims.pop(key, None)
+        if claim is None:
+            return
+        del self.pending[key]
+        if not claim.done():
+            claim.set_result(None)
+
+
+def _variant_file_name(name: str) -> str:
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "-", name).strip(".-")
+    return f"{stem or 'variant'}.docx"
+
+
+def _zip_documents(documents: list[tuple[str, bytes]]) -> bytes:
+    buf = BytesIO()
+    # DOCX files are already deflated zips; storing them skips a second pass.
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_STORED) as archive:
+        for file_name, content in documents:
+            archive.writestr(file_name, content)
+    return buf.getvalue()
+
+
+def _bulk_build_slots(max_pending: int) -> int:
+    """Concurrent document builds one bulk request may hold on the render pool.
+
+    Half the pool's queue, leaving the rest to other requests.
+    """
+    return max(1, max_pending // 2)
+
+
+async def _run_bulk_variants(
+    context: dict[str, Any],
+    current_images: list[tuple[str, bytes]],
+    target_images: list[tuple[str, bytes]],
+    project_root: Path,
+    variants: list[SowVariant],
+    use_cache: bool = True,
+) -> list[bytes]:
+    """Generate one in-memory DOCX per variant, sharing pipeline work between them.
+
+    Every variant runs :func:`_run_sow_pipeline` on a :class:`_BulkCheckpoint`
+    over one store.  The first variant runs alone and fills the shared
+    vision phase; then the first variant of every other services list runs
+    metadata inference, RAG retrieval and drafting for that list; then the
+    remaining variants run, finding their list's phases (and any identical
+    variant's review) stored, so each only drafts the sections no earlier
+    variant with its services list included; concurrent variants needing a
+    section the first one excluded share a single draft of it.  At most
+    :func:`_bulk_build_slots` documents are built at once, so one request
+    cannot fill the shared render queue.  Returns the DOCX bytes in
+    *variants* order.
+    """
+    values: dict[tuple, Any] = {}
+    pending: dict[tuple, asyncio.Future] = {}
+
+    def _services(variant: SowVariant) -> tuple[str, ...]:
+        if variant.services is None:
+            return tuple(context.get("services") or ())
+        return tuple(variant.services)
+
+    def _excluded(variant: SowVariant) -> frozenset[str]:
+        return frozenset(name.strip().upper() for name in variant.excluded_sections)
+
+    # Per services list, the variant excluding the fewest sections drafts first.
+    leaders: dict[tuple[str, ...], int] = {}
+    for i, variant in enumerate(variants):
+        best = leaders.get(_services(variant))
+        if best is None or len(_excluded(variant)) < len(_excluded(variants[best])):
+            leaders[_services(variant)] = i
+    first, *other_leaders = leaders.values()
+    followers = [i for i in range(len(variants)) if i not in set(leaders.values())]
+
+    results: list[bytes] = [b""] * len(variants)
+    pool = get_render_pool(_template_path(project_root))
+    builds = asyncio.Semaphore(_bulk_build_slots(pool.max_pending))
+
+    async def _generate(i: int) -> None:
+        variant = variants[i]
+        variant_context = dict(context)
+        variant_context["services"] = list(_services(variant))
+        excluded = _excluded(variant)
+        checkpoint = _BulkCheckpoint(values, pending, _services(variant), excluded)
+        try:
+            drafted_sections, reviewed, diagram_image_bytes = await _run_sow_pipeline(
+                variant_context,
+                current_images,
+                target_images,
+                project_root,
+                excluded_sections=excluded,
+                checkpoint=checkpoint,
+                use_cache=use_cache,
+            )
+        finally:
+            checkpoint.release()
+        async with builds:
+            deadline = time.monotonic() + _BULK_RENDER_WAIT_SECONDS
+            delay = 0.25
+            while True:
+                try:
+                    outputs = await _build_outputs(
+                        variant_context, drafted_sections, reviewed, diagram_image_bytes,
+                        project_root, variant.include_architect_review, excluded, in_memory=True,
+                    )
+                    break
+                except RenderQueueFull:
+                    # The queue is shared with other requests; wait for it
+                    # rather than discard the drafting already done.
+                    if time.monotonic() + delay > deadline:
+                        raise
+                    logger.info("workflow.bulk_render_wait variant=%s delay=%.2fs", variant.name, delay)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 2.0)
+        results[i] = outputs.docx
+
+    logger.info("workflow.bulk_start variants=%d service_lists=%d", len(variants), len(leaders))
+    await _generate(first)
+    await asyncio.gather(*[_generate(i) for i in other_leaders])
+    await asyncio.gather(*[_generate(i) for i in followers])
+    return results
+
+
+@app.post("/generate-sow/bulk", response_class=Response)
+async def generate_sow_bulk(
+    request: Request,
+    project_data: str | None = Form(None),
+    current_architecture_images: list[UploadFile] = File(default=[]),
+    target_architecture_images: list[UploadFile] = File(default=[]),
+) -> Response:
+    """Generate several SoW variants of one project and return them as a zip.
+
+    The payload (JSON body or ``project_data`` form field) is a
+    :class:`BulkSowInput`: the project as sent to ``/generate-sow`` plus the
+    variants, each naming its excluded sections, review flag and optionally
+    its own services list.  Diagram analysis runs once for all variants;
+    metadata inference, RAG retrieval and drafting run once per services
+    list (see :func:`_run_bulk_variants`).  The zip holds one
+    ``<variant name>.docx`` per variant; documents are built in memory and
+    nothing is stored.
+    """
+    try:
+        payload_model = await _parse_sow_request(request, project_data, BulkSowInput)
+        file_names = [_variant_file_name(v.name) for v in payload_model.variants]
+        if len(set(file_names)) != len(file_names):
+            raise HTTPException(status_code=400, detail="Variant names must be unique")
+        _t0 = time.monotonic()
+        documents = await _run_bulk_variants(
+            payload_model.project.model_dump(exclude={"use_cache"}),
+            await _read_uploads(current_architecture_images),
+            await _read_uploads(target_architecture_images),
+            Path(__file__).resolve().parent,
+            payload_model.variants,
+            use_cache=payload_model.project.use_cache,
+        )
+        archive = await asyncio.to_thread(_zip_documents, list(zip(file_names, documents)))
+        logger.info(
+            "workflow.bulk_complete elapsed=%.1fs variants=%d bytes=%d",
+            time.monotonic() - _t0,
+            len(documents),
+            len(archive),
+        )
+    except HTTPException:
+        raise
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors()) from exc
+    except RenderQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except Exception as exc:
+        logger.exception("Bulk SoW generation failed")
+        raise HTTPException(status_code=500, detail="Failed to generate SoW variants") from exc
+    return Response(
+        content=archive,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="sow_variants_{uuid4().hex}.zip"'},
+    )
+
+
+async def _execute_job(job: JobRecord, store: JobStore) -> dict[str, Any]:
+    """Run one persisted ``/jobs`` submission, resuming from its checkpoints."""
+    params = job.params
+    context: dict[str, Any] = dict(params["context"])
+    inputs = store.inputs(job.id)
+    excluded = frozenset(params.get("excluded_sections") or ())
+    project_root = Path(__file__).resolve().parent
+
+    def _progress(event: str, data: dict[str, Any]) -> None:
+        if event == "phase":
+            store.update(job.id, phase=f"{data['phase']}:{data['status']}")
+        elif event == "section":
+            store.update(job.id, sections_done=data["index"] + 1, sections_total=data["total"])
+
+    drafted_sections, reviewed, diagram_image_bytes = await _run_sow_pipeline(
+        context,
+        inputs.get("current", []),
+        inputs.get("target", []),
+        project_root,
+        excluded_sections=excluded,
+        progress=_progress,
+        checkpoint=JobCheckpoint(store, job.id),
+        use_cache=bool(params.get("use_cache", True)),
+    )
+    logger.info("Swarm flow step: DocBuilder (job %s)", job.id)
+    store.update(job.id, phase="build:started")
+    outputs = await _build_outputs(
+        context, drafted_sections, reviewed, diagram_image_bytes,
+        project_root, bool(params.get("include_review")), excluded, job_id=job.id,
+    )
+    return {"file": outputs.file_name, "markdown_file": outputs.markdown_name}
+
+
+_job_runner_instance: JobRunner | None = None
+_job_runner_lock = threading.Lock()
+
+
+def _job_runner() -> JobRunner:
+    """Return the process-wide job runner, creating its store on first use."""
+    global _job_runner_instance
+    with _job_runner_lock:
+        if _job_runner_instance is None:
+            _job_runner_instance = JobRunner(
+                JobStore(default_db_path(Path(__file__).resolve().parent)),
+                _execute_job,
+                workers=int(os.getenv("JOBS_WORKERS", "2")),
+                max_pending=int(os.getenv("JOBS_MAX_PENDING", "100")),
+                max_attempts=int(os.getenv("JOBS_MAX_ATTEMPTS", "3")),
+                ttl_seconds=float(os.getenv("JOBS_TTL_SECONDS", str(7 * 24 * 3600))),
+                sweep_seconds=float(os.getenv("JOBS_SWEEP_SECONDS", "3600")),
+            )
+        return _job_runner_instance
+
+
+@app.on_event("startup")
+async def _start_render_pool() -> None:
+    """Spawn the DOCX render workers so they parse the template before the first build."""
+    try:
+        pool = get_render_pool(_template_path(Path(__file__).resolve().parent))
+        pool.start()
+    except Exception:
+        logger.exception("render_pool.start_failed")
+        return
+    if _BULK_MAX_VARIANTS > _bulk_build_slots(pool.max_pending):
+        logger.warning(
+            "workflow.bulk_builds_limited bulk_max_variants=%d render_max_pending=%d build_slots=%d",
+            _BULK_MAX_VARIANTS,
+            pool.max_pending,
+            _bulk_build_slots(pool.max_pending),
+        )
+
+
+@app.on_event("shutdown")
+async def _stop_render_pool() -> None:
+    shutdown_render_pool()
+
+
+@app.on_event("startup")
+async def _start_artifact_store() -> None:
+    """Move outputs left in ``app/`` by older versions into the store and start eviction."""
+    try:
+        store = _artifact_store()
+        await asyncio.to_thread(store.adopt, Path(__file__).resolve().parent)
+        store.start_sweeper()
+    except Exception:
+        logger.exception("artifact_store.start_failed")
+
+
+@app.on_event("shutdown")
+async def _stop_artifact_store() -> None:
+    _artifact_store().stop_sweeper()
+
+
+@app.on_event("startup")
+async def _start_session_pool() -> None:
+    """Pre-warm Agent Runtime sessions for RAG and start reaping idle ones."""
+    try:
+        service = await asyncio.to_thread(SectionAwareRAGService.from_env)
+        service.start_session_pool()
+    except Exception:
+        logger.exception("session_pool.start_failed")
+
+
+@app.on_event("shutdown")
+async def _stop_session_pool() -> None:
+    stop_session_pools()
+
+
+@app.on_event("startup")
+async def _resume_jobs() -> None:
+    """Re-queue jobs interrupted by the previous shutdown."""
+    try:
+        _job_runner().start()
+    except Exception:
+        logger.exception("job_runner.start_failed")
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    request: Request,
+    project_data: str | None = Form(None),
+    current_architecture_images: list[UploadFile] = File(default=[]),
+    target_architecture_images: list[UploadFile] = File(default=[]),
+    include_architect_review: str | None = Form(None),
+    include_ha: str | None = Form(None),
+    include_backup: str | None = Form(None),
+    include_dr: str | None = Form(None),
+) -> dict[str, Any]:
+    """Queue a SoW generation job; accepts the same payload as ``/generate-sow``.
+
+    Returns the job record immediately.  Poll ``GET /jobs/{job_id}`` for
+    status and progress, then ``GET /jobs/{job_id}/result`` for file names.
+    """
+    try:
+        payload_model = await _parse_sow_request(request, project_data)
+        inputs = {
+            "current": await _read_uploads(current_architecture_images),
+            "target": await _read_uploads(target_architecture_images),
+        }
+        params = {
+            "context": payload_model.model_dump(exclude={"use_cache"}),
+            "use_cache": payload_model.use_cache,
+            "include_review": (include_architect_review or "").lower() in ("true", "1", "yes", "on"),
+            "excluded_sections": sorted(_build_excluded_sections(include_ha, include_backup, include_dr)),
+        }
+        job = _job_runner().submit("sow", params, inputs)
+    except HTTPException:
+        raise
+    except JobQueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    except Exception as exc:
+        logger.exception("Job submission failed")
+        raise HTTPException(status_code=500, detail="Failed to submit SoW job") from exc
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> dict[str, Any]:
+    """Return status, current phase and section progress for a job."""
+    job = _job_runner().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/result", response_model=SowOutput)
+def get_job_result(job_id: str) -> SowOutput:
+    """Return the generated file names once a job has succeeded."""
+    job = _job_runner().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == JOB_FAILED:
+        raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+    if job.status != JOB_SUCCEEDED or not job.result:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return SowOutput(**job.result)
+
+
 @app.post("/generate-markdown/")
 async def generate_markdown(
     customer: str = Form(...),
@@ -731,6 +1633,7 @@ async def generate_markdown(
     include_ha: str | None = Form(None),
     include_backup: str | None = Form(None),
     include_dr: str | None = Form(None),
+    use_cache: str | None = Form(None),
 ) -> PlainTextResponse:
     """Frontend-facing endpoint that accepts legacy form fields and returns markdown.
 
@@ -760,51 +1663,70 @@ async def generate_markdown(
     include_architect_review : str | None
         Pass ``"true"`` / ``"1"`` / ``"yes"`` to include the Architect Review section
         in the generated document.  Defaults to excluded (customer-facing mode).
+    use_cache : str | None
+        Pass ``"false"`` to bypass the LLM response cache.  Defaults to enabled.
     """
     try:
-        # Build a SoW context dict from the legacy form fields.
-        full_scope = scope.strip()
-        if impdetails.strip():
-            full_scope = f"{full_scope}\n\nImplementation Details:\n{impdetails.strip()}".strip()
-        if not full_scope:
-            full_scope = "To be defined."
-
-        context: dict[str, Any] = {
-            "client": customer,
-            "project_name": application,
-            "cloud": "OCI",
-            "scope": full_scope,
-            "duration": "PENDING TO REVIEW",
-            "industry": None,
-            "services": [],
-        }
-
+        context = _legacy_form_context(customer, application, scope, impdetails)
         project_root = Path(__file__).resolve().parent
         _include_review = (include_architect_review or "").lower() in ("true", "1", "yes", "on")
         _excluded = _build_excluded_sections(include_ha, include_backup, include_dr)
 
         drafted_sections, reviewed, diagram_image_bytes = await _run_sow_pipeline(
-            context, current_diagram, target_diagram, project_root,
+            context,
+            await _read_uploads(current_diagram),
+            await _read_uploads(target_diagram),
+            project_root,
             excluded_sections=_excluded,
+            use_cache=_form_flag(use_cache, default=True),
         )
 
         logger.info("Swarm flow step: DocBuilder (markdown endpoint)")
-        builder = DocumentBuilder(
-            template_path=project_root / "templates" / "sow_template.docx",
-            customer_name=customer,
-            project_name=application,
+        await _build_outputs(
+            context, drafted_sections, reviewed, diagram_image_bytes,
+            project_root, _include_review, _excluded,
         )
-        builder.build(
-            sections=drafted_sections,
-            output_dir=project_root,
-            diagram_images=diagram_image_bytes or None,
-            project_context=context,
-            include_architect_review=_include_review,
-            excluded_sections=_excluded,
-        )
-        builder.build_markdown(full_document=reviewed, output_dir=project_root)
 
         return PlainTextResponse(content=reviewed)
+    except RenderQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
     except Exception as exc:
         logger.exception("SoW generation (markdown endpoint) failed")
         raise HTTPException(status_code=500, detail="Failed to generate SoW") from exc
+
+
+@app.post("/generate-markdown/stream")
+async def generate_markdown_stream(
+    customer: str = Form(...),
+    application: str = Form(...),
+    scope: str = Form(default=""),
+    impdetails: str = Form(default=""),
+    llm_provider: str = Form(default=""),
+    vision_provider: str = Form(default=""),
+    file: UploadFile | None = File(default=None),
+    current_diagram: list[UploadFile] = File(default=[]),
+    target_diagram: list[UploadFile] = File(default=[]),
+    include_architect_review: str | None = Form(None),
+    include_ha: str | None = Form(None),
+    include_backup: str | None = Form(None),
+    include_dr: str | None = Form(None),
+    use_cache: str | None = Form(None),
+) -> StreamingResponse:
+    """Streaming variant of ``/generate-markdown/`` using Server-Sent Events.
+
+    Takes the same legacy form fields and emits the same events as
+    ``/generate-sow/stream``; the final ``complete`` event additionally
+    carries the reviewed markdown body under ``markdown``.
+    """
+    return _sse_response(
+        _stream_sow_pipeline(
+            _legacy_form_context(customer, application, scope, impdetails),
+            await _read_uploads(current_diagram),
+            await _read_uploads(target_diagram),
+            Path(__file__).resolve().parent,
+            include_review=(include_architect_review or "").lower() in ("true", "1", "yes", "on"),
+            excluded_sections=_build_excluded_sections(include_ha, include_backup, include_dr),
+            include_markdown=True,
+            use_cache=_form_flag(use_cache, default=True),
+        )
+    )
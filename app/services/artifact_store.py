@@ -0,0 +1,302 @@
+"""Retention-managed storage for generated DOCX / Markdown outputs.
+
+Generated files used to be written straight into the ``app/`` package
+directory and were never deleted.  :class:`ArtifactStore` keeps them in a
+dedicated directory instead:
+
+* files are sharded as ``<root>/<YYYY-MM-DD>/<ab>/output_<uuid>.<ext>`` (UTC
+  creation date, then the first two hex digits of the uuid), so no single
+  directory grows without bound;
+* a SQLite index records each artifact's shard path, size, content ETag,
+  media type, owning job and creation time — downloads resolve a name with
+  one primary-key lookup instead of a directory probe;
+* :meth:`ArtifactStore.evict` drops artifacts older than ``ttl_seconds`` and
+  then the oldest ones until the total stays under ``max_bytes``; a daemon
+  thread runs it every ``sweep_seconds``.
+
+Render workers write into :attr:`ArtifactStore.staging_dir` (same
+filesystem); :meth:`ArtifactStore.add` moves the finished file into its
+shard and indexes it, so the index only has a single writer process.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_MEDIA_TYPES = {
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".md": "text/markdown",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT NOT NULL,
+    media_type TEXT NOT NULL,
+    job_id TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_created_at ON artifacts (created_at);
+"""
+
+
+@dataclass
+class Artifact:
+    """One row of the ``artifacts`` index."""
+
+    name: str
+    path: Path
+    size: int
+    etag: str
+    media_type: str
+    job_id: str | None
+    created_at: float
+
+
+class ArtifactStore:
+    """Sharded output directory with a SQLite index and TTL / size eviction."""
+
+    def __init__(
+        self,
+        root: Path,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_bytes: int = 2 * 1024**3,
+        sweep_seconds: float = 300.0,
+    ) -> None:
+        self.root = Path(root)
+        self.staging_dir = self.root / "staging"
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sweep_seconds = sweep_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper: threading.Thread | None = None
+        self._evicted = 0
+        self._evicted_bytes = 0
+        self._sweeps = 0
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.root / "index.sqlite3", timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ── add / lookup ─────────────────────────────────────────────────────
+
+    def _shard(self, name: str, created_at: float) -> Path:
+        stem = Path(name).stem
+        prefix = stem.rsplit("_", 1)[-1][:2] or "__"
+        day = time.strftime("%Y-%m-%d", time.gmtime(created_at))
+        return Path(day) / prefix
+
+    def add(self, source: Path, job_id: str | None = None, created_at: float | None = None) -> Artifact:
+        """Move *source* into its shard and index it under its file name."""
+        source = Path(source)
+        created_at = time.time() if created_at is None else created_at
+        rel_path = self._shard(source.name, created_at) / source.name
+        target = self.root / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        with source.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+        os.replace(source, target)
+        artifact = Artifact(
+            name=source.name,
+            path=target,
+            size=target.stat().st_size,
+            etag=f'"{digest.hexdigest()[:32]}"',
+            media_type=_MEDIA_TYPES.get(target.suffix.lower(), "application/octet-stream"),
+            job_id=job_id,
+            created_at=created_at,
+        )
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (name, path, size, etag, media_type, job_id, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    artifact.name,
+                    rel_path.as_posix(),
+                    artifact.size,
+                    artifact.etag,
+                    artifact.media_type,
+                    job_id,
+                    created_at,
+                ),
+            )
+        logger.debug("artifact_store.added name=%s size=%d job_id=%s", artifact.name, artifact.size, job_id)
+        return artifact
+
+    def get(self, name: str) -> Artifact | None:
+        """Indexed artifact called *name*, or ``None`` (rows whose file vanished are dropped)."""
+        row = self._conn().execute(
+            "SELECT name, path, size, etag, media_type, job_id, created_at FROM artifacts WHERE name = ?",
+            (name,),
+        ).fetchone()
+        if row is None:
+            return None
+        artifact = Artifact(
+            name=row[0],
+            path=self.root / row[1],
+            size=row[2],
+            etag=row[3],
+            media_type=row[4],
+            job_id=row[5],
+            created_at=row[6],
+        )
+        if not artifact.path.is_file():
+            with self._conn() as conn:
+                conn.execute("DELETE FROM artifacts WHERE name = ?", (name,))
+            return None
+        return artifact
+
+    def adopt(self, directory: Path, pattern: str = "output_*") -> int:
+        """Move loose outputs from *directory* (e.g. the old ``app/`` location) into the store."""
+        adopted = 0
+        for path in Path(directory).glob(pattern):
+            if not path.is_file() or path.suffix.lower() not in _MEDIA_TYPES:
+                continue
+            try:
+                self.add(path, created_at=path.stat().st_mtime)
+                adopted += 1
+            except OSError:
+                logger.warning("artifact_store.adopt_failed path=%s", path, exc_info=True)
+        if adopted:
+            logger.info("artifact_store.adopted count=%d from=%s", adopted, directory)
+        return adopted
+
+    # ── eviction ─────────────────────────────────────────────────────────
+
+    def evict(self, now: float | None = None) -> int:
+        """Delete expired artifacts, then the oldest ones while over ``max_bytes``."""
+        now = time.time() if now is None else now
+        conn = self._conn()
+        victims = conn.execute(
+            "SELECT name, path, size FROM artifacts WHERE created_at < ? ORDER BY created_at",
+            (now - self.ttl_seconds,),
+        ).fetchall()
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+        total -= sum(size for _name, _path, size in victims)
+        if total > self.max_bytes:
+            expired = {name for name, _path, _size in victims}
+            for name, rel_path, size in conn.execute(
+                "SELECT name, path, size FROM artifacts ORDER BY created_at"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                if name in expired:
+                    continue
+                victims.append((name, rel_path, size))
+                total -= size
+
+        for name, rel_path, _size in victims:
+            path = self.root / rel_path
+            path.unlink(missing_ok=True)
+            for parent in (path.parent, path.parent.parent):
+                try:
+                    parent.rmdir()  # only succeeds once the shard is empty
+                except OSError:
+                    break
+        if victims:
+            with conn:
+                conn.executemany("DELETE FROM artifacts WHERE name = ?", [(name,) for name, _p, _s in victims])
+        self._clear_staging(now)
+
+        freed = sum(size for _name, _path, size in victims)
+        with self._lock:
+            self._sweeps += 1
+            self._evicted += len(victims)
+            self._evicted_bytes += freed
+        if victims:
+            logger.info("artifact_store.evicted count=%d bytes=%d", len(victims), freed)
+        return len(victims)
+
+    def _clear_staging(self, now: float) -> None:
+        """Drop staging files a crashed build left behind."""
+        for path in self.staging_dir.iterdir():
+            try:
+                if now - path.stat().st_mtime > self.ttl_seconds:
+                    path.unlink()
+            except OSError:
+                continue
+
+    def start_sweeper(self) -> None:
+        """Run :meth:`evict` every ``sweep_seconds`` on a daemon thread (idempotent)."""
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._stop.clear()
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="artifact-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        while True:
+            try:
+                self.evict()
+            except Exception:
+                logger.exception("artifact_store.sweep_failed")
+            if self._stop.wait(self.sweep_seconds):
+                return
+
+    def stop_sweeper(self) -> None:
+        with self._lock:
+            sweeper, self._sweeper = self._sweeper, None
+        if sweeper is not None:
+            self._stop.set()
+            sweeper.join(timeout=5)
+
+    def stats(self) -> dict[str, Any]:
+        count, total = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+        with self._lock:
+            return {
+                "count": count,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "sweeps": self._sweeps,
+                "evicted": self._evicted,
+                "evicted_bytes": self._evicted_bytes,
+            }
+
+
+_store: ArtifactStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store(project_root: Path) -> ArtifactStore:
+    """Process-wide store under ``ARTIFACTS_DIR`` (default ``<project_root>/artifacts``)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore(
+                Path(os.getenv("ARTIFACTS_DIR") or project_root / "artifacts"),
+                ttl_seconds=float(os.getenv("ARTIFACT_TTL_SECONDS", str(7 * 24 * 3600))),
+                max_bytes=int(os.getenv("ARTIFACT_MAX_BYTES", str(2 * 1024**3))),
+                sweep_seconds=float(os.getenv("ARTIFACT_SWEEP_SECONDS", "300")),
+            )
+        return _store
+
+
+def artifact_store_stats() -> dict[str, Any] | None:
+    with _store_lock:
+        store = _store
+    return store.stats() if store is not None else None
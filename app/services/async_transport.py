@@ -0,0 +1,194 @@
+"""Async HTTP transport for OCI Generative AI and Agent Runtime calls.
+
+The OCI Python SDK is blocking, so the pipeline used to park every LLM and
+RAG call on a worker thread via ``asyncio.to_thread``.  These wrappers send
+the same REST calls over ``httpx.AsyncClient`` instead, so one event loop
+can hold hundreds of in-flight requests without a thread per call.
+
+Each wrapper borrows a pooled SDK client from :mod:`app.services.oci_clients`
+for everything except the socket I/O: its signer (API key or instance
+principal), endpoint, and model (de)serialisation.  Request bodies and
+response objects are therefore identical to the SDK's, and callers such as
+``_extract_text`` work unchanged on either path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any
+from urllib.parse import quote
+
+import httpx
+import oci
+from oci._vendor import requests as oci_requests
+from oci.response import Response
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on sockets held by one event loop across all OCI hosts.
+_MAX_CONNECTIONS = int(os.getenv("OCI_ASYNC_MAX_CONNECTIONS", "256"))
+_MAX_KEEPALIVE = int(os.getenv("OCI_ASYNC_MAX_KEEPALIVE", "64"))
+
+# httpx connection pools are bound to the event loop that created them, so
+# keep one AsyncClient per loop.  Weak keys let closed loops be collected.
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_http_clients_lock = threading.Lock()
+
+
+def _http_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _http_clients_lock:
+        client = _http_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=_MAX_CONNECTIONS,
+                    max_keepalive_connections=_MAX_KEEPALIVE,
+                ),
+            )
+            _http_clients[loop] = client
+        return client
+
+
+class _AsyncOCITransport:
+    """Signs and sends OCI REST calls on behalf of a pooled SDK client."""
+
+    def __init__(self, sdk_client: Any) -> None:
+        self._base = sdk_client.base_client
+
+    async def _call(
+        self,
+        method: str,
+        resource_path: str,
+        *,
+        path_params: dict[str, str] | None = None,
+        body: Any = None,
+        response_type: str | None = None,
+        operation: str = "",
+    ) -> Response:
+        base = self._base
+        for name, value in (path_params or {}).items():
+            resource_path = resource_path.replace("{" + name + "}", quote(str(value), safe=""))
+        url = base.endpoint + resource_path
+        data = json.dumps(base.sanitize_for_serialization(body)) if body is not None else None
+        timeout_connect, timeout_read = base.timeout
+
+        for attempt in (1, 2):
+            headers = self._sign(method, url, data)
+            t0 = time.perf_counter()
+            response = await _http_client().request(
+                method,
+                url,
+                headers=headers,
+                content=data.encode("utf-8") if data is not None else None,
+                timeout=httpx.Timeout(timeout_read, connect=timeout_connect),
+            )
+            logger.info(
+                "async_transport.call operation=%s status=%s latency_ms=%.0f",
+                operation,
+                response.status_code,
+                (time.perf_counter() - t0) * 1000,
+            )
+            # Mirror the SDK: refresh an expired principal token once on 401.
+            if (
+                response.status_code == 401
+                and attempt == 1
+                and base.is_instance_principal_or_resource_principal_signer()
+            ):
+                await asyncio.to_thread(base.signer.refresh_security_token)
+                continue
+            break
+
+        if not 200 <= response.status_code <= 299:
+            raise self._service_error(response, method, url)
+
+        payload = base.deserialize_response_data(response.content, response_type) if response_type else None
+        return Response(response.status_code, dict(response.headers), payload, None)
+
+    def _sign(self, method: str, url: str, data: str | None) -> dict[str, str]:
+        """Produce OCI signature headers using the SDK client's signer."""
+        base = self._base
+        prepared = oci_requests.Request(
+            method,
+            url,
+            headers={
+                "accept": "application/json",
+                "content-type": "application/json",
+                "opc-request-id": base.build_request_id(),
+                "user-agent": base.user_agent,
+            },
+            data=data,
+        ).prepare()
+        base.signer(prepared)
+        return dict(prepared.headers)
+
+    @staticmethod
+    def _service_error(response: httpx.Response, method: str, url: str) -> oci.exceptions.ServiceError:
+        code, message = "Unknown", response.text
+        try:
+            payload = response.json()
+            code = payload.get("code", code)
+            message = payload.get("message", message)
+        except ValueError:
+            pass
+        return oci.exceptions.ServiceError(
+            response.status_code,
+            code,
+            dict(response.headers),
+            message,
+            request_endpoint=f"{method} {url}",
+        )
+
+
+class AsyncGenerativeAiInferenceClient(_AsyncOCITransport):
+    """Async counterpart of ``GenerativeAiInferenceClient.chat``."""
+
+    async def chat(self, chat_details: Any) -> Response:
+        return await self._call(
+            "POST",
+            "/actions/chat",
+            body=chat_details,
+            response_type="ChatResult",
+            operation="inference.chat",
+        )
+
+
+class AsyncGenerativeAiAgentRuntimeClient(_AsyncOCITransport):
+    """Async counterpart of the Agent Runtime session and chat operations."""
+
+    async def create_session(self, agent_endpoint_id: str, create_session_details: Any) -> Response:
+        return await self._call(
+            "POST",
+            "/agentEndpoints/{agentEndpointId}/sessions",
+            path_params={"agentEndpointId": agent_endpoint_id},
+            body=create_session_details,
+            response_type="Session",
+            operation="agent_runtime.create_session",
+        )
+
+    async def delete_session(self, agent_endpoint_id: str, session_id: str) -> Response:
+        return await self._call(
+            "DELETE",
+            "/agentEndpoints/{agentEndpointId}/sessions/{sessionId}",
+            path_params={"agentEndpointId": agent_endpoint_id, "sessionId": session_id},
+            operation="agent_runtime.delete_session",
+        )
+
+    async def chat(self, agent_endpoint_id: str, chat_details: Any) -> Response:
+        return await self._call(
+            "POST",
+            "/agentEndpoints/{agentEndpointId}/actions/chat",
+            path_params={"agentEndpointId": agent_endpoint_id},
+            body=chat_details,
+            response_type="ChatResult",
+            operation="agent_runtime.chat",
+        )
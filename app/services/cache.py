@@ -0,0 +1,266 @@
+"""Two-tier (memory LRU + SQLite) cache for expensive OCI results.
+
+Used for responses that are costly to recompute and safe to replay — LLM
+section drafts today.  Keys are caller-supplied strings (normally a SHA-256
+digest, see :func:`digest`); values must be JSON-serialisable.
+
+* **Memory tier** — an ``OrderedDict`` LRU bounded by entry count.
+* **Disk tier** — optional SQLite file bounded by total payload bytes; once
+  the budget is exceeded the least-recently-used rows are evicted down to 90%
+  of it.  Entries survive restarts and are promoted to memory on a hit.
+
+Both tiers honour the same TTL.  All methods are thread-safe; async callers
+use :meth:`TieredCache.aget` / :meth:`TieredCache.aput`, which keep SQLite
+I/O off the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+# Disk eviction drains to this fraction of the byte budget, in batches.
+_DISK_LOW_WATER = 0.9
+_EVICT_BATCH = 64
+
+
+def cache_dir() -> Path:
+    """Directory for on-disk cache tiers (``SOW_CACHE_DIR``, default ``app/.cache``)."""
+    return Path(os.getenv("SOW_CACHE_DIR") or Path(__file__).resolve().parents[1] / ".cache")
+
+
+def digest(*parts: Any) -> str:
+    """Stable SHA-256 hex digest of JSON-serialisable *parts*."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    """LRU memory cache backed by an optional size-bounded SQLite file."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int = 512,
+        ttl_seconds: float | None = None,
+        db_path: Path | None = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        # ``_lock`` guards the memory tier and counters only, so event-loop
+        # callers never wait behind SQLite; ``_disk_lock`` serialises the
+        # connection.
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._hits_memory = 0
+        self._hits_disk = 0
+        self._misses = 0
+        self._evictions = 0
+        self._conn: sqlite3.Connection | None = None
+        self._disk_bytes = 0
+        # Memory hits are not written through; their recency is flushed to the
+        # disk tier on the next put so its LRU order stays meaningful.
+        self._touched: dict[str, float] = {}
+        if db_path is not None:
+            self._open(Path(db_path))
+
+    def _open(self, db_path: Path) -> None:
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_created ON entries (created_at)")
+            conn.commit()
+            (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        except sqlite3.Error:
+            logger.exception("cache.disk_unavailable name=%s path=%s — memory tier only", self.name, db_path)
+            return
+        self._conn = conn
+        self._disk_bytes = int(total)
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key: str, default: Any = None, *, disk: bool = True) -> Any:
+        """Look *key* up in memory, then (unless ``disk=False``) on disk."""
+        value = self._memory_get(key)
+        if value is _MISSING and disk and self._conn is not None:
+            value = self._disk_get(key)
+        return self._count_miss(default) if value is _MISSING else value
+
+    async def aget(self, key: str, default: Any = None, *, disk: bool = True) -> Any:
+        """:meth:`get` for event-loop callers: the disk tier is read on a worker thread."""
+        value = self._memory_get(key)
+        if value is _MISSING and disk and self._conn is not None:
+            value = await asyncio.to_thread(self._disk_get, key)
+        return self._count_miss(default) if value is _MISSING else value
+
+    def _count_miss(self, default: Any) -> Any:
+        with self._lock:
+            self._misses += 1
+        return default
+
+    def _memory_get(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return _MISSING
+            if self._expired(entry[0], now):
+                del self._memory[key]
+                return _MISSING
+            self._memory.move_to_end(key)
+            self._hits_memory += 1
+            if self._conn is not None:
+                self._touched[key] = now
+            return entry[1]
+
+    def _disk_get(self, key: str) -> Any:
+        assert self._conn is not None
+        now = time.time()
+        with self._disk_lock:
+            row = self._conn.execute(
+                "SELECT value, size, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            raw, size, created_at = row
+            if self._expired(created_at, now):
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self._disk_bytes -= size
+                return _MISSING
+        value = json.loads(raw)
+        with self._lock:
+            self._memory_put(key, created_at, value)
+            self._touched[key] = now
+            self._hits_disk += 1
+        return value
+
+    def put(self, key: str, value: Any, *, disk: bool = True) -> None:
+        """Store *value* in memory and, unless ``disk=False``, on disk."""
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, now, value)
+        if disk and self._conn is not None:
+            self._disk_put(key, value, now)
+
+    async def aput(self, key: str, value: Any, *, disk: bool = True) -> None:
+        """:meth:`put` for event-loop callers: the disk tier is written on a worker thread."""
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, now, value)
+        if disk and self._conn is not None:
+            await asyncio.to_thread(self._disk_put, key, value, now)
+
+    def _memory_put(self, key: str, created_at: float, value: Any) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_put(self, key: str, value: Any, now: float) -> None:
+        assert self._conn is not None
+        raw = json.dumps(value, ensure_ascii=False)
+        size = len(raw.encode("utf-8"))
+        if size > self.max_disk_bytes:
+            return
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        with self._disk_lock:
+            if touched:
+                self._conn.executemany(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                    [(ts, touched_key) for touched_key, ts in touched.items()],
+                )
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, raw, size, now, now),
+            )
+            self._disk_bytes += size - (old[0] if old else 0)
+            self._evict_disk_locked()
+            self._conn.commit()
+
+    def _evict_disk_locked(self) -> None:
+        """Once over budget, drop expired rows, then LRU rows down to the low-water mark.
+
+        Draining below the budget (rather than to it) means the next puts do
+        not each trigger another eviction pass.
+        """
+        assert self._conn is not None
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        if self.ttl_seconds is not None:
+            cutoff = time.time() - self.ttl_seconds
+            (expired,) = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries WHERE created_at < ?", (cutoff,)
+            ).fetchone()
+            self._conn.execute("DELETE FROM entries WHERE created_at < ?", (cutoff,))
+            self._disk_bytes -= int(expired)
+        low_water = int(self.max_disk_bytes * _DISK_LOW_WATER)
+        while self._disk_bytes > low_water:
+            rows = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT ?", (_EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                break
+            doomed: list[tuple[str]] = []
+            for key, size in rows:
+                if self._disk_bytes <= low_water:
+                    break
+                doomed.append((key,))
+                self._disk_bytes -= size
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+            self._evictions += len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+        if self._conn is not None:
+            with self._disk_lock:
+                self._conn.execute("DELETE FROM entries")
+                self._conn.commit()
+                self._disk_bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            hits = self._hits_memory + self._hits_disk
+            lookups = hits + self._misses
+            return {
+                "name": self.name,
+                "hits": hits,
+                "hits_memory": self._hits_memory,
+                "hits_disk": self._hits_disk,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes if self._conn is not None else None,
+                "disk_evictions": self._evictions,
+            }
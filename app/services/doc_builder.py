@@ -2,18 +2,27 @@
 
 from __future__ import annotations
 
+import copy
 import datetime
+import functools
+import hashlib
 import json as _json
 import logging
 import re
+import threading
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
+from typing import Any, Callable
 from uuid import uuid4
 
 from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.opc.part import XmlPart
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
 from docx.shared import Inches, RGBColor
+from docx.text.paragraph import Paragraph
 
 from app.services.doc_style_constants import (
     BODY_COLOR,
@@ -268,6 +277,9 @@ _BODY_TEXT_FIXES: tuple[tuple[str, str], ...] = (
 # NOTE: "Initial understanding of the scope", "Desired Outcome, as jointly agreed",
 # and "Any change in the objectives and scope" have been deliberately removed so
 # the template's colored scope-box headers survive injection.
+_CODE_FENCE_OPEN_RE = re.compile(r"^```(?:json)?\s*\n?")
+_CODE_FENCE_CLOSE_RE = re.compile(r"\n?```\s*$")
+
 _PLACEHOLDER_RE = re.compile(
     r"<add information here>"
     r"|<Information to be filled in[^>]*>"
@@ -315,6 +327,22 @@ _CUSTOMER_PREFIX_SUFFIXES = (
     "The ",
 )
 
+# Precompiled matchers for the template rewrite passes (_substitute_names /
+# _normalize_template_artifacts), which touch every run of the document.
+_TEXT_FIXES = _HEADING_TEXT_FIXES + _BODY_TEXT_FIXES
+_TEXT_FIX_RE = re.compile("|".join(re.escape(old) for old, _ in _TEXT_FIXES))
+_W_P = qn("w:p")
+_W_R = qn("w:r")
+_W_T = qn("w:t")
+_W_SDT = qn("w:sdt")
+_W_FLD_SIMPLE = qn("w:fldSimple")
+_W_HYPERLINK = qn("w:hyperlink")
+_W_BOOKMARK_START = qn("w:bookmarkStart")
+_W_BOOKMARK_END = qn("w:bookmarkEnd")
+_W_ID = qn("w:id")
+_W_NAME = qn("w:name")
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
 
 def _build_para_elem(
     text: str, bold: bool = False, list_style: bool = False
@@ -575,6 +603,536 @@ def _build_indented_para_elem(text: str, left_twips: int = 0) -> object:
     return new_para
 
 
+# ──────────────────────────────────────────────────────────────────────────────
+# Parsed template cache
+# ──────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class _CachedTemplate:
+    fingerprint: tuple[int, int]
+    sha256: str
+    document: Any
+
+
+class _TemplateCache:
+    """Parse each DOCX template once and hand out deep clones.
+
+    Opening the template costs a zip inflate plus an lxml parse of every XML
+    part (document, styles, numbering, ...) on each build.  The cache keeps
+    one pristine, already-normalised ``Document`` per template path and clones
+    its package part by part — ``deepcopy`` of each lxml tree, shared bytes
+    for binary parts — which is several times cheaper than re-parsing.
+
+    Entries are checked against the file's (mtime, size) on every ``get``;
+    when that changes the content hash decides whether to re-parse, so a
+    touched-but-identical template keeps its cached tree.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[Path, _CachedTemplate] = {}
+        self._hits = 0
+        self._loads = 0
+
+    def get(self, path: Path, prepare: Callable[[Any], None]) -> Any:
+        """Return a private clone of *path*, parsing (and ``prepare``-ing) it on first use."""
+        path = path.resolve()
+        st = path.stat()
+        fingerprint = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry.fingerprint != fingerprint:
+                raw = path.read_bytes()
+                sha256 = hashlib.sha256(raw).hexdigest()
+                if entry is not None and entry.sha256 == sha256:
+                    entry.fingerprint = fingerprint
+                else:
+                    document = Document(BytesIO(raw))
+                    prepare(document)
+                    entry = _CachedTemplate(fingerprint=fingerprint, sha256=sha256, document=document)
+                    self._entries[path] = entry
+                    self._loads += 1
+                    logger.info("doc_builder.template_parsed path=%s sha256=%s", path.name, sha256[:12])
+            else:
+                self._hits += 1
+            # lxml trees are not safe to read from several threads at once, so
+            # clone under the lock (a few ms).
+            return _clone_document(entry.document)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"templates": len(self._entries), "hits": self._hits, "loads": self._loads}
+
+
+def _clone_document(document: Any) -> Any:
+    """Deep-clone a python-docx ``Document`` without re-parsing its XML.
+
+    Mirrors ``docx.opc.package.Unmarshaller``: rebuild every part (lxml
+    elements deep-copied, binary blobs shared — they are immutable), then
+    re-link the same relationships under the same rIds.
+    """
+    src = document.part.package
+    dst = type(src)()
+    parts: dict[str, Any] = {}
+    for part in src.iter_parts():
+        if isinstance(part, XmlPart):
+            clone = type(part)(part.partname, part.content_type, copy.deepcopy(part.element), dst)
+        else:
+            clone = type(part).load(part.partname, part.content_type, part.blob, dst)
+        parts[part.partname] = clone
+    sources = [(src, dst)] + [(part, parts[part.partname]) for part in src.iter_parts()]
+    for source, clone in sources:
+        for rel in source.rels.values():
+            target = rel.target_ref if rel.is_external else parts[rel.target_part.partname]
+            clone.load_rel(rel.reltype, target, rel.rId, rel.is_external)
+    for clone in parts.values():
+        clone.after_unmarshal()
+    dst.after_unmarshal()
+    return dst.main_document_part.document
+
+
+_template_cache = _TemplateCache()
+
+
+def template_cache_stats() -> dict[str, Any]:
+    """Hit/load counters of the parsed-template cache."""
+    return _template_cache.stats()
+
+
+def clear_template_cache() -> None:
+    """Drop every cached template; the next build re-parses from disk."""
+    _template_cache.clear()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Heading index
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _style_is_heading(style) -> bool:
+    """True for Heading styles and custom styles derived from one."""
+    while style is not None:
+        if style.name.startswith("Heading"):
+            return True
+        style = getattr(style, "base_style", None)
+    return False
+
+
+def _style_heading_level(style) -> int | None:
+    style_name = style.name
+    if style_name.startswith("Heading"):
+        try:
+            return int(style_name.split()[-1])
+        except (ValueError, IndexError):
+            return 1
+    return None
+
+
+@dataclass(eq=False)
+class _Heading:
+    element: Any
+    text: str
+    # None for custom styles that only *derive* from a Heading style.
+    level: int | None
+
+
+class _HeadingIndex:
+    """Body-level headings of one document, in document order.
+
+    Every section lookup used to re-list ``doc.paragraphs`` and resolve each
+    paragraph's style (``Paragraph.style`` walks the style part, and scans it
+    for the default style when a paragraph has none), which made injecting
+    ~25 sections quadratic in document size.  The index classifies each
+    paragraph style id once, scans the body once, memoises keyword lookups,
+    and is patched in place by the injection paths: after a section's
+    content changes only the span up to the next heading is rescanned.
+    """
+
+    _W_P = qn("w:p")
+
+    def __init__(self, doc: Document) -> None:
+        self._doc = doc
+        self._styles: dict[str | None, tuple[bool, int | None]] = {}
+        self._lookups: dict[tuple[str, bool], _Heading | None] = {}
+        self._entries: list[_Heading] = self._scan(doc.element.body.iterchildren(self._W_P))
+
+    @classmethod
+    def for_document(cls, doc: Document) -> _HeadingIndex:
+        """The document's index, built on first use (a document belongs to one build)."""
+        index = getattr(doc, "_heading_index", None)
+        if index is None:
+            index = cls(doc)
+            doc._heading_index = index
+        return index
+
+    # ── classification ───────────────────────────────────────────────────
+
+    def _classify(self, p_elem) -> tuple[bool, int | None]:
+        style_id = p_elem.style
+        cached = self._styles.get(style_id)
+        if cached is None:
+            style = self._doc.part.get_style(style_id, WD_STYLE_TYPE.PARAGRAPH)
+            cached = self._styles[style_id] = (_style_is_heading(style), _style_heading_level(style))
+        return cached
+
+    def level(self, p_elem) -> int | None:
+        """Same as :meth:`DocumentBuilder._get_heading_level` for a ``<w:p>``."""
+        return self._classify(p_elem)[1]
+
+    def _scan(self, elements) -> list[_Heading]:
+        headings = []
+        for elem in elements:
+            if elem.tag != self._W_P:
+                continue
+            is_heading, level = self._classify(elem)
+            if is_heading:
+                headings.append(_Heading(elem, elem.text.strip().lower(), level))
+        return headings
+
+    # ── lookup ───────────────────────────────────────────────────────────
+
+    def find(self, keyword: str, exact: bool = False) -> _Heading | None:
+        """First heading whose text equals (``exact``) or contains *keyword*."""
+        key = (keyword.lower(), exact)
+        if key in self._lookups:
+            return self._lookups[key]
+        if exact:
+            found = next((h for h in self._entries if h.text == key[0]), None)
+        else:
+            found = next((h for h in self._entries if key[0] in h.text), None)
+        self._lookups[key] = found
+        return found
+
+    def headings(self) -> list[_Heading]:
+        return list(self._entries)
+
+    def section_end(self, heading: _Heading, numbered_only: bool = True) -> _Heading | None:
+        """Heading that closes *heading*'s section (``None`` = end of document).
+
+        With ``numbered_only`` the section runs to the next ``Heading N`` style
+        at the same or a higher level; otherwise derived heading styles close
+        it too, counting as level 1.
+        """
+        limit = heading.level or 1
+        position = self._position(heading.element)
+        for entry in self._entries[position + 1:]:
+            if entry.level is None and numbered_only:
+                continue
+            if (entry.level or 1) <= limit:
+                return entry
+        return None
+
+    def paragraphs_between(self, start_elem, stop: _Heading | None, limit: int | None = None) -> list:
+        """Body-level paragraphs after *start_elem*, up to (excluding) *stop*."""
+        stop_elem = stop.element if stop is not None else None
+        paragraphs = []
+        elem = start_elem.getnext()
+        while elem is not None and elem is not stop_elem:
+            if elem.tag == self._W_P:
+                paragraphs.append(Paragraph(elem, self._doc._body))
+                if limit is not None and len(paragraphs) >= limit:
+                    break
+            elem = elem.getnext()
+        return paragraphs
+
+    # ── incremental updates ──────────────────────────────────────────────
+
+    def _position(self, elem) -> int | None:
+        return next((i for i, h in enumerate(self._entries) if h.element is elem), None)
+
+    def rescan(self, start_elem, stop: _Heading | None) -> None:
+        """Re-index the body from *start_elem* up to *stop* after it was edited.
+
+        *start_elem* is either an indexed heading or a newly inserted element
+        (indexed in front of *stop*).
+        """
+        stop_elem = stop.element if stop is not None else None
+        end = self._position(stop_elem) if stop_elem is not None else len(self._entries)
+        begin = self._position(start_elem)
+        if begin is None:
+            begin = end
+
+        def _span():
+            elem = start_elem
+            while elem is not None and elem is not stop_elem:
+                yield elem
+                elem = elem.getnext()
+
+        self._entries[begin:end] = self._scan(_span())
+        self._lookups.clear()
+
+    def discard_detached(self) -> None:
+        """Drop headings that were removed from the document."""
+        self._entries = [h for h in self._entries if h.element.getparent() is not None]
+        self._lookups.clear()
+
+    def rescan_span(self, start_elem, end_elem) -> None:
+        """Re-index the elements strictly between two markers after their content was replaced."""
+        self.discard_detached()
+        positions = {h.element: i for i, h in enumerate(self._entries)}
+        elem = end_elem.getnext()
+        while elem is not None and elem not in positions:
+            elem = elem.getnext()
+        at = positions[elem] if elem is not None else len(self._entries)
+        self._entries[at:at] = self._scan(_SectionMarks.contents(start_elem, end_elem))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section markers
+# ──────────────────────────────────────────────────────────────────────────────
+
+_MARK_PREFIX = "_Sow"
+# Injection path that produced a span — recorded in the bookmark name so a
+# rebuild re-renders the span the same way.
+_MARK_NORMAL = "N"      # template heading, after its intro paragraphs
+_MARK_CLEARED = "F"     # template heading, full-clear section
+_MARK_ADDED = "A"       # new heading after a sibling (_SECTION_INSERT_AFTER)
+_MARK_APPENDED = "P"    # new heading at the end of the document
+_MARK_TABLE = "T"       # after a table holding the heading
+_MARK_SCOPE = "S"       # whole SCOPE box region (filled in place)
+
+
+class IncrementalBuildError(Exception):
+    """Raised by :meth:`DocumentBuilder.rebuild` when a document cannot be patched in place."""
+
+
+class _SectionMarks:
+    """Hidden bookmarks around the content each section injected.
+
+    Every injection is wrapped in a body-level ``_Sow<mode>_<SECTION>``
+    bookmark pair (the leading underscore hides it in Word).  The marks
+    survive a save, so :meth:`DocumentBuilder.rebuild` can find exactly the
+    elements a section produced in a previously built document — even when
+    sections nest, as SCOPE does inside PROJECT OVERVIEW — and replace them
+    without touching the template or the other sections.
+    """
+
+    def __init__(self, doc: Document) -> None:
+        body = doc.element.body
+        self._starts: dict[str, Any] = {}
+        self._ends: dict[str, Any] = {}
+        max_id = 0
+        for start in body.iter(_W_BOOKMARK_START):
+            mark_id = start.get(_W_ID, "")
+            if mark_id.isdigit():
+                max_id = max(max_id, int(mark_id))
+            name = start.get(_W_NAME, "")
+            if name.startswith(_MARK_PREFIX):
+                self._starts[name[len(_MARK_PREFIX) + 2:]] = start
+        owners = {start.get(_W_ID): key for key, start in self._starts.items()}
+        for end in body.iter(_W_BOOKMARK_END):
+            key = owners.get(end.get(_W_ID))
+            if key is not None:
+                self._ends[key] = end
+        self._end_set = set(self._ends.values())
+        self._next_id = max_id + 1
+
+    @classmethod
+    def for_document(cls, doc: Document) -> _SectionMarks:
+        marks = getattr(doc, "_section_marks", None)
+        if marks is None:
+            marks = cls(doc)
+            doc._section_marks = marks
+        return marks
+
+    @staticmethod
+    def key(section_name: str) -> str:
+        # Word caps bookmark names at 40 characters.
+        return re.sub(r"[^A-Z0-9]+", "_", section_name.upper()).strip("_")[:40 - len(_MARK_PREFIX) - 2]
+
+    @staticmethod
+    def contents(start_elem, end_elem) -> list:
+        """Elements strictly between *start_elem* and *end_elem*."""
+        elements = []
+        elem = start_elem.getnext()
+        while elem is not None and elem is not end_elem:
+            elements.append(elem)
+            elem = elem.getnext()
+        return elements
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def skip_ends(self, elem):
+        """*elem*, or the last span end directly after it (keeps spans disjoint)."""
+        following = elem.getnext()
+        while following is not None and following in self._end_set:
+            elem, following = following, following.getnext()
+        return elem
+
+    def wrap(self, section_name: str, mode: str, anchor_elem, following) -> None:
+        """Mark everything inserted between *anchor_elem* and its former next sibling *following*."""
+        key = self.key(section_name)
+        mark_id = str(self._next_id)
+        self._next_id += 1
+        start = OxmlElement("w:bookmarkStart", {_W_ID: mark_id, _W_NAME: f"{_MARK_PREFIX}{mode}_{key}"})
+        end = OxmlElement("w:bookmarkEnd", {_W_ID: mark_id})
+        anchor_elem.addnext(start)
+        if following is not None:
+            following.addprevious(end)
+        else:
+            anchor_elem.getparent().append(end)
+        self._starts[key] = start
+        self._ends[key] = end
+        self._end_set.add(end)
+
+    def span(self, section_name: str) -> tuple[str, Any, Any] | None:
+        """``(mode, start, end)`` of the section's marked span, if the document has one."""
+        key = self.key(section_name)
+        start, end = self._starts.get(key), self._ends.get(key)
+        if start is None or end is None or start.getparent() is None or end.getparent() is None:
+            return None
+        return start.get(_W_NAME)[len(_MARK_PREFIX)], start, end
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section strategies
+# ──────────────────────────────────────────────────────────────────────────────
+
+# Renders one section's content after an anchor element:
+# ``renderer(builder, doc, anchor_elem, section_name, content)``.  Returning
+# ``False`` hands the content to the plain paragraph renderer instead.
+SectionRenderer = Callable[["DocumentBuilder", Any, Any, str, str], "bool | None"]
+
+
+@dataclass(frozen=True)
+class HeadingMatcher:
+    """A :data:`SECTION_HEADING_KEYWORDS` entry, parsed once.
+
+    Headings match by substring, or exactly when the raw keyword carries the
+    ``=`` prefix (see :meth:`_HeadingIndex.find`).
+    """
+
+    keyword: str
+    exact: bool = False
+
+    @classmethod
+    def parse(cls, raw_keyword: str) -> HeadingMatcher:
+        if raw_keyword.startswith("="):
+            return cls(raw_keyword[1:].lower(), exact=True)
+        return cls(raw_keyword.lower())
+
+
+@dataclass(frozen=True)
+class SectionStrategy:
+    """How one section is located in the template and rendered into it."""
+
+    name: str
+    matcher: HeadingMatcher
+    # Content renderer tried first (see SectionRenderer); None = plain paragraphs.
+    renderer: SectionRenderer | None = None
+    full_clear: bool = False
+    labeled: bool = False
+    structured: bool = False
+    hierarchical: bool = False
+    single_sentence: bool = False
+    # Fills the template's colored scope boxes in place (SCOPE).
+    scope_boxes: bool = False
+    # Sibling heading to insert after when the template has no heading of its own.
+    insert_after: HeadingMatcher | None = None
+
+
+def _render_labeled(builder: DocumentBuilder, doc, anchor_elem, section_name: str, content: str) -> None:
+    builder._inject_labeled_content(anchor_elem, content, section_name, doc=doc)
+
+
+def _render_components_table(builder: DocumentBuilder, doc, anchor_elem, section_name: str, content: str) -> bool:
+    return builder._inject_arch_components_table_after_element(anchor_elem, content, doc)
+
+
+_SECTION_STRATEGIES: dict[str, SectionStrategy] = {}
+
+
+def register_section(
+    name: str,
+    keyword: str | None = None,
+    *,
+    renderer: SectionRenderer | None = None,
+    full_clear: bool = False,
+    labeled: bool = False,
+    structured: bool = False,
+    hierarchical: bool = False,
+    single_sentence: bool = False,
+    scope_boxes: bool = False,
+    insert_after: str | None = None,
+) -> SectionStrategy:
+    """Register (or replace) how section *name* is located and rendered.
+
+    *keyword* follows the :data:`SECTION_HEADING_KEYWORDS` convention and is
+    recorded there; it defaults to the section name.  Labeled sections
+    without their own *renderer* use the label/bullet renderer.
+    """
+    upper = name.upper()
+    raw_keyword = keyword if keyword is not None else SECTION_HEADING_KEYWORDS.get(upper, upper.lower())
+    if keyword is not None:
+        SECTION_HEADING_KEYWORDS[upper] = keyword
+    if renderer is None and labeled:
+        renderer = _render_labeled
+    strategy = SectionStrategy(
+        name=upper,
+        matcher=HeadingMatcher.parse(raw_keyword),
+        renderer=renderer,
+        full_clear=full_clear,
+        labeled=labeled,
+        structured=structured,
+        hierarchical=hierarchical,
+        single_sentence=single_sentence,
+        scope_boxes=scope_boxes,
+        insert_after=HeadingMatcher(insert_after.lower()) if insert_after else None,
+    )
+    _SECTION_STRATEGIES[upper] = strategy
+    return strategy
+
+
+def section_strategy(section_name: str) -> SectionStrategy:
+    """The registered strategy for *section_name*, or plain paragraphs under a same-named heading.
+
+    Fallbacks are built per call rather than cached: section names come from
+    requests, so a cache keyed on them would grow without bound.
+    """
+    upper = section_name.upper()
+    strategy = _SECTION_STRATEGIES.get(upper)
+    if strategy is None:
+        strategy = SectionStrategy(upper, HeadingMatcher(section_name.lower()))
+    return strategy
+
+
+def section_strategies() -> list[SectionStrategy]:
+    """Registered strategies, in registration (canonical section) order."""
+    return list(_SECTION_STRATEGIES.values())
+
+
+def _register_builtin_sections() -> None:
+    names = dict.fromkeys(
+        [
+            *SECTION_HEADING_KEYWORDS,
+            *_SECTION_INSERT_AFTER,
+            *sorted(
+                _FULL_CLEAR_SECTIONS | _LABELED_FORMAT_SECTIONS | _STRUCTURED_OUTPUT_SECTIONS
+                | _HIERARCHICAL_BULLET_SECTIONS | _SINGLE_SENTENCE_SECTIONS
+            ),
+        ]
+    )
+    for name in names:
+        register_section(
+            name,
+            renderer=_render_components_table if name == "ARCHITECTURE COMPONENTS" else None,
+            full_clear=name in _FULL_CLEAR_SECTIONS,
+            labeled=name in _LABELED_FORMAT_SECTIONS,
+            structured=name in _STRUCTURED_OUTPUT_SECTIONS,
+            hierarchical=name in _HIERARCHICAL_BULLET_SECTIONS,
+            single_sentence=name in _SINGLE_SENTENCE_SECTIONS,
+            scope_boxes=name == "SCOPE",
+            insert_after=_SECTION_INSERT_AFTER.get(name),
+        )
+
+
+_register_builtin_sections()
+
+
 class DocumentBuilder:
     """Injects generated text into a DOCX template."""
 
@@ -589,8 +1147,14 @@ class DocumentBuilder:
         self.project_name = project_name.strip()
 
     def _load_or_create_template(self) -> Document:
+        """Return a private, already-normalised copy of the template.
+
+        The template is parsed and passed through
+        :meth:`_normalize_template_artifacts` once per file version (see
+        :class:`_TemplateCache`); every build gets a deep clone of that tree.
+        """
         if self.template_path.exists():
-            return Document(str(self.template_path))
+            return _template_cache.get(self.template_path, prepare=self._normalize_template_artifacts)
         logger.warning("Template not found at %s. Using generated fallback template", self.template_path)
         return Document()
 
@@ -598,14 +1162,18 @@ class DocumentBuilder:
     # Customer / project name substitution
     # ------------------------------------------------------------------
 
-    def _substitute_names(self, doc: Document) -> None:
+    def _substitute_names(self, doc: Document, roots: list | None = None) -> None:
         """Replace 'Customer1' / 'Project1' placeholders with actual names.
 
         Operates at the XML level so that ALL paragraphs are covered,
         including those inside text boxes (w:txbxContent) and table cells
-        which are not surfaced by doc.paragraphs.
+        which are not surfaced by doc.paragraphs.  *roots* limits the pass to
+        those elements (e.g. template paragraphs copied into a rebuild).
+
+        A single pass over every ``<w:p>``; each paragraph's run texts are
+        read once and the rules below run over that list, writing back only
+        the runs they change:
 
-        Three passes per paragraph:
         1. Replace literal placeholder tokens ('Customer1', 'Project1') in
            every run's <w:t> text, with an anti-duplication check against
            the following run.
@@ -628,158 +1196,14 @@ class DocumentBuilder:
         if self.project_name:
             token_map["Project1"] = self.project_name
 
-        def _process_p_element(p_elem) -> None:
-            # Build an ordered run list: direct-child <w:r> elements and
-            # <w:fldSimple> children interleaved in document order.
-            #
-            # Word templates often store Customer1 / Project1 as a DOCPROPERTY
-            # field:  <w:fldSimple w:instr="DOCPROPERTY 01_Customer">
-            #           <w:r><w:t> </w:t></w:r>   ← grandchild placeholder
-            #         </w:fldSimple>
-            # A plain findall("w:r") returns only DIRECT children and misses
-            # these grandchild runs.  When the blank placeholder sits inside a
-            # fldSimple, Pass 2's context-suffix matching never sees it and the
-            # customer name is never injected.
-            #
-            # Iterating p_elem's direct children in order and expanding
-            # fldSimple elements preserves the correct left-context (the run
-            # BEFORE the fldSimple still appears at index i-1 so suffix
-            # matching works correctly).
-            r_elems = []
-            for child in p_elem:
-                if child.tag == qn("w:r"):
-                    r_elems.append(child)
-                elif child.tag == qn("w:fldSimple"):
-                    r_elems.extend(child.findall(qn("w:r")))
-                elif child.tag == qn("w:hyperlink"):
-                    # TOC entries wrap their text runs inside <w:hyperlink>.
-                    # Including those runs here ensures Customer1 / Project1
-                    # tokens inside cached TOC text are also substituted.
-                    r_elems.extend(child.findall(qn("w:r")))
-
-            all_r_for_pass1 = r_elems  # fldSimple runs now included
-
-            if not all_r_for_pass1:
-                return
-
-            def _get_t(r) -> object | None:
-                return r.find(qn("w:t"))
-
-            def _text(r) -> str:
-                t = _get_t(r)
-                return (t.text or "") if t is not None else ""
-
-            def _set_text(r, value: str) -> None:
-                t = _get_t(r)
-                if t is not None:
-                    t.text = value
-                    t.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
-                else:
-                    new_t = OxmlElement("w:t")
-                    new_t.text = value
-                    new_t.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
-                    r.append(new_t)
-
-            # Pass 1: literal token replacement (direct runs + fldSimple field runs)
-            for idx, r in enumerate(r_elems):
-                for token, replacement in token_map.items():
-                    current = _text(r)
-                    if token in current:
-                        new_val = current.replace(token, replacement)
-                        # Anti-duplication: if next run already starts with
-                        # the replacement we just inserted, strip it there.
-                        if idx + 1 < len(r_elems):
-                            next_text = _text(r_elems[idx + 1])
-                            if next_text.startswith(replacement):
-                                _set_text(r_elems[idx + 1], next_text[len(replacement):])
-                        _set_text(r, new_val)
-            # (fldSimple runs are now part of r_elems and processed above)
-
-            if not r_elems:
-                return  # no direct-child runs → skip Pass 2/3
-
-            # Refresh run texts after pass 1
-            run_texts = [_text(r) for r in r_elems]
-            para_text = "".join(run_texts)
-
-            if not self.customer_name:
-                return
-
-            # Pass 2: fill blank/space-only runs by context suffix
-            # Only fills a blank run when the PRECEDING run ends with one of
-            # the known prefix strings — this avoids false positives on blank
-            # runs inside headings, table cells, and other non-name slots.
-            for i, r in enumerate(r_elems):
-                txt = run_texts[i]
-                if txt.strip() != "":
-                    continue  # not a blank run
-
-                if i == 0:
-                    # Special case: leading blank run in a heading whose title
-                    # (formed by joining all SUBSEQUENT runs) is a known
-                    # "customer-prefixed" heading (e.g. " Company Profile").
-                    # Fill it with the customer name only when the paragraph
-                    # text does not already contain the customer name.
-                    if not self.customer_name:
-                        continue
-                    if self.customer_name in para_text:
-                        continue  # already substituted — skip
-                    rest_text = "".join(run_texts[1:]).strip().lower()
-                    if rest_text in _CUSTOMER_HEADING_PREFIXES:
-                        # Preserve a space separator between customer name and
-                        # the heading title that follows in the next run.
-                        fill = self.customer_name
-                        if (
-                            i + 1 < len(r_elems)
-                            and not run_texts[i + 1].startswith(" ")
-                        ):
-                            fill = self.customer_name + " "
-                        _set_text(r, fill)
-                        run_texts[i] = fill
-                        logger.debug(
-                            "doc_builder.customer_name_injected_heading rest=%r", rest_text
-                        )
-                    continue  # no preceding context for suffix-based fill
-
-                # Guard: if the following run already starts with the
-                # customer name, this blank run is adjacent to the real
-                # value — do not fill to avoid duplication.
-                if i + 1 < len(r_elems) and run_texts[i + 1].startswith(self.customer_name):
-                    continue
-
-                prev_text = run_texts[i - 1]
-                for suffix in _CUSTOMER_PREFIX_SUFFIXES:
-                    if prev_text.endswith(suffix):
-                        _set_text(r, self.customer_name)
-                        run_texts[i] = self.customer_name
-                        logger.debug(
-                            "doc_builder.customer_name_injected run_idx=%d prev_suffix=%r",
-                            i, suffix,
-                        )
-                        break
-
-            # Pass 3: collapse consecutive customer-name runs
-            # (template had two adjacent placeholder runs for the same slot)
-            last_name_idx: int | None = None
-            run_texts = [_text(r) for r in r_elems]  # refresh
-            for i, r in enumerate(r_elems):
-                txt = run_texts[i]
-                if txt == self.customer_name:
-                    if last_name_idx is not None:
-                        _set_text(r, "")  # clear the duplicate
-                        logger.debug("doc_builder.customer_name_deduped run_idx=%d", i)
-                    else:
-                        last_name_idx = i
-                elif txt.strip():
-                    last_name_idx = None  # reset on non-empty, non-name text
-
         # Iterate over EVERY <w:p> in the document, including those inside
         # text boxes (w:txbxContent), headers, footers, and table cells.
-        for p_elem in doc.element.body.iter(qn("w:p")):
-            try:
-                _process_p_element(p_elem)
-            except Exception:
-                logger.debug("doc_builder.substitute_names_para_error", exc_info=True)
+        for root in (doc.element.body,) if roots is None else roots:
+            for p_elem in root.iter(_W_P):
+                try:
+                    self._substitute_names_in_paragraph(p_elem, token_map)
+                except Exception:
+                    logger.debug("doc_builder.substitute_names_para_error", exc_info=True)
 
         logger.info(
             "doc_builder.names_substituted customer=%r project=%r",
@@ -787,48 +1211,176 @@ class DocumentBuilder:
             self.project_name,
         )
 
+    def _substitute_names_in_paragraph(self, p_elem, token_map: dict[str, str]) -> None:
+        # Build an ordered run list: direct-child <w:r> elements and
+        # <w:fldSimple> children interleaved in document order.
+        #
+        # Word templates often store Customer1 / Project1 as a DOCPROPERTY
+        # field:  <w:fldSimple w:instr="DOCPROPERTY 01_Customer">
+        #           <w:r><w:t> </w:t></w:r>   ← grandchild placeholder
+        #         </w:fldSimple>
+        # A plain findall("w:r") returns only DIRECT children and misses
+        # these grandchild runs.  When the blank placeholder sits inside a
+        # fldSimple, rule 2's context-suffix matching never sees it and the
+        # customer name is never injected.
+        #
+        # Iterating p_elem's direct children in order and expanding
+        # fldSimple elements preserves the correct left-context (the run
+        # BEFORE the fldSimple still appears at index i-1 so suffix
+        # matching works correctly).  TOC entries wrap their text runs inside
+        # <w:hyperlink>; those runs are included so Customer1 / Project1
+        # tokens inside cached TOC text are also substituted.
+        r_elems = []
+        for child in p_elem:
+            tag = child.tag
+            if tag == _W_R:
+                r_elems.append(child)
+            elif tag == _W_FLD_SIMPLE or tag == _W_HYPERLINK:
+                r_elems.extend(child.iterchildren(_W_R))
+
+        if not r_elems:
+            return
+
+        t_elems = [r.find(_W_T) for r in r_elems]
+        run_texts = [(t.text or "") if t is not None else "" for t in t_elems]
+
+        def _set_text(i: int, value: str) -> None:
+            t = t_elems[i]
+            if t is None:
+                t = t_elems[i] = OxmlElement("w:t")
+                r_elems[i].append(t)
+            t.text = value
+            t.set(_XML_SPACE, "preserve")
+            run_texts[i] = value
+
+        # Rule 1: literal token replacement (direct runs + fldSimple field runs)
+        last = len(r_elems) - 1
+        for idx in range(len(r_elems)):
+            for token, replacement in token_map.items():
+                current = run_texts[idx]
+                if token in current:
+                    # Anti-duplication: if next run already starts with
+                    # the replacement we just inserted, strip it there.
+                    if idx < last and run_texts[idx + 1].startswith(replacement):
+                        _set_text(idx + 1, run_texts[idx + 1][len(replacement):])
+                    _set_text(idx, current.replace(token, replacement))
+
+        if not self.customer_name:
+            return
+        para_text = "".join(run_texts)
+
+        # Rule 2: fill blank/space-only runs by context suffix
+        # Only fills a blank run when the PRECEDING run ends with one of
+        # the known prefix strings — this avoids false positives on blank
+        # runs inside headings, table cells, and other non-name slots.
+        for i, txt in enumerate(run_texts):
+            if txt.strip() != "":
+                continue  # not a blank run
+
+            if i == 0:
+                # Rule 4: leading blank run in a heading whose title
+                # (formed by joining all SUBSEQUENT runs) is a known
+                # "customer-prefixed" heading (e.g. " Company Profile").
+                # Fill it with the customer name only when the paragraph
+                # text does not already contain the customer name.
+                if self.customer_name in para_text:
+                    continue  # already substituted — skip
+                rest_text = "".join(run_texts[1:]).strip().lower()
+                if rest_text in _CUSTOMER_HEADING_PREFIXES:
+                    # Preserve a space separator between customer name and
+                    # the heading title that follows in the next run.
+                    fill = self.customer_name
+                    if last > 0 and not run_texts[1].startswith(" "):
+                        fill = self.customer_name + " "
+                    _set_text(0, fill)
+                    logger.debug(
+                        "doc_builder.customer_name_injected_heading rest=%r", rest_text
+                    )
+                continue  # no preceding context for suffix-based fill
+
+            # Guard: if the following run already starts with the
+            # customer name, this blank run is adjacent to the real
+            # value — do not fill to avoid duplication.
+            if i < last and run_texts[i + 1].startswith(self.customer_name):
+                continue
+
+            prev_text = run_texts[i - 1]
+            if prev_text.endswith(_CUSTOMER_PREFIX_SUFFIXES):
+                _set_text(i, self.customer_name)
+                logger.debug(
+                    "doc_builder.customer_name_injected run_idx=%d prev_text=%r",
+                    i, prev_text[-40:],
+                )
+
+        # Rule 3: collapse consecutive customer-name runs
+        # (template had two adjacent placeholder runs for the same slot)
+        last_name_idx: int | None = None
+        for i, txt in enumerate(run_texts):
+            if txt == self.customer_name:
+                if last_name_idx is not None:
+                    _set_text(i, "")  # clear the duplicate
+                    logger.debug("doc_builder.customer_name_deduped run_idx=%d", i)
+                else:
+                    last_name_idx = i
+            elif txt.strip():
+                last_name_idx = None  # reset on non-empty, non-name text
+
     def _normalize_template_artifacts(self, doc: Document) -> None:
         """Fix known typos, capitalisation errors, and artefacts in the template.
 
-        Runs after :meth:`_substitute_names` on every build so that the output
-        DOCX is clean regardless of whether the source sow_template.docx has
-        been patched.  Covers:
+        Applied once when the template is parsed into the template cache, so
+        the output DOCX is clean regardless of whether the source
+        sow_template.docx has been patched.  It does not depend on the
+        customer or project name, and running it before
+        :meth:`_substitute_names` keeps those names from being "corrected".
+        Covers:
 
         * Heading capitalisation errors (``NExt STEPS``, ``CuRrently``, ``STate``)
           — applied to every ``<w:t>`` so both headings and their cached TOC
           entries are corrected in a single pass.
         * Body-text typos (``Metrci``, ``arias``, ``NB**`` notation).
         * Removal of the "Dropdown Options" form-control (SDT) on the cover page.
-        """
-        all_fixes = _HEADING_TEXT_FIXES + _BODY_TEXT_FIXES
-        body = doc.element.body
 
-        # Pass 1: simple per-<w:t> replacements
-        for t_el in body.iter(qn("w:t")):
-            if not t_el.text:
+        The tree is walked once; split-run and SDT candidates are collected
+        on the way and resolved after every ``<w:t>`` has been fixed.
+        """
+        split_r: list = []
+        sdts: list = []
+        for elem in doc.element.body.iter(_W_T, _W_SDT):
+            if elem.tag == _W_SDT:
+                sdts.append(elem)
                 continue
-            for old, new in all_fixes:
-                if old in t_el.text:
-                    t_el.text = t_el.text.replace(old, new)
-
-        # Pass 2: "CuRrently" split-run case — template stores it as three
+            text = elem.text
+            if not text:
+                continue
+            # Simple per-<w:t> replacements
+            if _TEXT_FIX_RE.search(text):
+                for old, new in _TEXT_FIXES:
+                    if old in text:
+                        text = text.replace(old, new)
+                elem.text = text
+            if text == "R":
+                split_r.append(elem)
+
+        # "CuRrently" split-run case — template stores it as three
         # consecutive runs: "Cu" | "R" | "rently …".  Detect by checking
-        # neighbours within the same paragraph.
-        for p_elem in body.iter(qn("w:p")):
-            wts = list(p_elem.iter(qn("w:t")))
-            for i, t_el in enumerate(wts):
-                if t_el.text != "R":
-                    continue
+        # neighbours within the same paragraph (every enclosing one, for
+        # paragraphs nested in text boxes).
+        for t_el in split_r:
+            for p_elem in t_el.iterancestors(_W_P):
+                wts = list(p_elem.iter(_W_T))
+                i = wts.index(t_el)
                 prev = wts[i - 1].text if i > 0 else ""
                 nxt = wts[i + 1].text if i + 1 < len(wts) else ""
                 if (prev or "").endswith("Cu") and (nxt or "").startswith("rently"):
                     t_el.text = "r"
+                    break
 
-        # Pass 3: remove "Dropdown Options" structured-document-tags (SDTs).
+        # Remove "Dropdown Options" structured-document-tags (SDTs).
         # These are form-control artefacts on the cover page that render as
         # visible text in some Word versions.
-        for sdt in list(body.iter(qn("w:sdt"))):
-            sdt_text = "".join(t.text or "" for t in sdt.iter(qn("w:t")))
+        for sdt in sdts:
+            sdt_text = "".join(t.text or "" for t in sdt.iter(_W_T))
             if "Dropdown" in sdt_text:
                 parent = sdt.getparent()
                 if parent is not None:
@@ -847,6 +1399,9 @@ class DocumentBuilder:
     ) -> str:
         """Inject sections into template headings and save DOCX.
 
+        Writes ``output_<uuid>.docx`` into *output_dir* and returns its name;
+        see :meth:`build_bytes` for the in-memory variant.
+
         Args:
             sections: List of (section_name, content) tuples in canonical order.
             output_dir: Directory where the output DOCX is written.
@@ -868,7 +1423,38 @@ class DocumentBuilder:
         output_dir.mkdir(parents=True, exist_ok=True)
         output_name = f"output_{uuid4().hex}.docx"
         output_path = output_dir / output_name
+        doc = self._assemble(
+            sections, diagram_images, project_context, include_architect_review, excluded_sections
+        )
+        doc.save(str(output_path))
+        logger.info("Saved generated SoW document: %s", output_path)
+        return output_name
 
+    def build_bytes(
+        self,
+        sections: list[tuple[str, str]],
+        diagram_images: dict[str, list[tuple[str, bytes]]] | dict[str, bytes] | None = None,
+        project_context: dict | None = None,
+        include_architect_review: bool = False,
+        excluded_sections: frozenset[str] | None = None,
+    ) -> bytes:
+        """Same document as :meth:`build`, serialised in memory instead of to disk."""
+        doc = self._assemble(
+            sections, diagram_images, project_context, include_architect_review, excluded_sections
+        )
+        buffer = BytesIO()
+        doc.save(buffer)
+        logger.info("doc_builder.serialized bytes=%d", buffer.tell())
+        return buffer.getvalue()
+
+    def _assemble(
+        self,
+        sections: list[tuple[str, str]],
+        diagram_images: dict[str, list[tuple[str, bytes]]] | dict[str, bytes] | None,
+        project_context: dict | None,
+        include_architect_review: bool,
+        excluded_sections: frozenset[str] | None,
+    ) -> Document:
         _excluded = excluded_sections or frozenset()
         if not include_architect_review:
             _excluded = _excluded | {"ARCHITECT REVIEW"}
@@ -881,7 +1467,6 @@ class DocumentBuilder:
 
         doc = self._load_or_create_template()
         self._substitute_names(doc)
-        self._normalize_template_artifacts(doc)
         self._fill_project_tables(doc, project_context=project_context)
 
         # Physically remove excluded section headings + their template body content so
@@ -894,16 +1479,7 @@ class DocumentBuilder:
             for section_name, content in sections:
                 if not content or not content.strip():
                     continue
-                injected = self._inject_section(doc, section_name, content)
-                if not injected:
-                    anchor = _SECTION_INSERT_AFTER.get(section_name.upper())
-                    if anchor:
-                        injected = self._inject_after_known_section(
-                            doc, section_name, content, after_keyword=anchor
-                        )
-                    if not injected:
-                        logger.warning("doc_builder.section_not_found section=%s — appending at end", section_name)
-                        self._append_section(doc, section_name, content)
+                self._place_section(doc, section_name, content)
         else:
             # Fallback: build from scratch
             for section_name, content in sections:
@@ -917,10 +1493,279 @@ class DocumentBuilder:
 
         self._apply_heading1_page_breaks(doc)
         self._suppress_blank_heading_page_breaks(doc)
+        return doc
+
+    def _place_section(self, doc: Document, section_name: str, content: str) -> None:
+        """Inject one section: its template heading, else after its sibling, else at the end."""
+        injected = self._inject_section(doc, section_name, content)
+        if not injected:
+            anchor = section_strategy(section_name).insert_after
+            if anchor:
+                injected = self._inject_after_known_section(
+                    doc, section_name, content, after_keyword=anchor.keyword
+                )
+            if not injected:
+                logger.warning("doc_builder.section_not_found section=%s — appending at end", section_name)
+                self._append_section(doc, section_name, content)
+
+    # ------------------------------------------------------------------
+    # Incremental rebuild
+    # ------------------------------------------------------------------
+
+    def rebuild(
+        self,
+        base_path: Path,
+        changes: list[tuple[str, str]],
+        output_dir: Path,
+    ) -> str:
+        """Apply per-section *changes* to a previously built document and save a new one.
+
+        Only the spans of the changed sections are replaced (see
+        :class:`_SectionMarks`); name substitution, table filling, the other
+        injections and the page-break passes over the rest of the document
+        are not repeated.  Writes ``output_<uuid>.docx`` into *output_dir* and
+        returns its name; *base_path* is left untouched.
+
+        Args:
+            base_path: DOCX produced by :meth:`build` (or by an earlier rebuild)
+                from the same template.
+            changes: ``(section_name, content)`` tuples; empty content removes
+                the section's generated text and keeps its heading.
+
+        Raises:
+            IncrementalBuildError: the template is missing, *base_path*
+                predates section markers, or a section excluded from it has
+                tables in its template body; regenerate it in full.
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_name = f"output_{uuid4().hex}.docx"
+        output_path = output_dir / output_name
+        doc = self._reassemble(base_path, changes)
         doc.save(str(output_path))
-        logger.info("Saved generated SoW document: %s", output_path)
+        logger.info("Saved rebuilt SoW document: %s base=%s", output_path, base_path.name)
         return output_name
 
+    def rebuild_bytes(self, base_path: Path, changes: list[tuple[str, str]]) -> bytes:
+        """Same document as :meth:`rebuild`, serialised in memory instead of to disk."""
+        doc = self._reassemble(base_path, changes)
+        buffer = BytesIO()
+        doc.save(buffer)
+        logger.info("doc_builder.serialized bytes=%d", buffer.tell())
+        return buffer.getvalue()
+
+    def _reassemble(self, base_path: Path, changes: list[tuple[str, str]]) -> Document:
+        if not self.template_path.exists():
+            raise IncrementalBuildError(f"template not found at {self.template_path}")
+        doc = Document(str(base_path))
+        marks = _SectionMarks.for_document(doc)
+        if not len(marks):
+            raise IncrementalBuildError(f"{base_path.name} has no section markers; regenerate it in full")
+        template = functools.cache(self._load_or_create_template)
+
+        changed = []
+        for section_name, content in changes:
+            content = content or ""
+            span = marks.span(section_name)
+            if span is not None:
+                self._replace_span(doc, section_name, content, span, template)
+            elif content.strip():
+                # Skipped by the original build (empty or excluded): place it
+                # exactly as a full build would.  Excluding it also deleted its
+                # template heading, which has to come back first.
+                changed += self._restore_template_heading(doc, section_name)
+                self._place_section(doc, section_name, content)
+                span = marks.span(section_name)
+            if span is None:
+                continue
+            mode, start, end = span
+            changed += [e for e in _SectionMarks.contents(start, end) if e.tag == _W_P]
+            if mode in (_MARK_ADDED, _MARK_APPENDED):
+                changed.append(start.getprevious())  # the heading the build created
+
+        paragraphs = [Paragraph(p_elem, doc._body) for p_elem in changed]
+        self._apply_heading1_page_breaks(doc, paragraphs)
+        self._suppress_blank_heading_page_breaks(doc, paragraphs)
+        logger.info(
+            "doc_builder.rebuilt base=%s sections=%d paragraphs=%d",
+            base_path.name, len(changes), len(paragraphs),
+        )
+        return doc
+
+    def _replace_span(
+        self,
+        doc: Document,
+        section_name: str,
+        content: str,
+        span: tuple[str, Any, Any],
+        template: Callable[[], Document],
+    ) -> None:
+        """Swap the marked content of one section for *content*, re-rendered the way it was built."""
+        mode, start, end = span
+        for elem in _SectionMarks.contents(start, end):
+            elem.getparent().remove(elem)
+
+        if section_name.upper() == "MILESTONE PLAN":
+            # Structured milestones were appended to the template table: drop
+            # every row beyond the template's own before they are re-added.
+            table = self._find_milestone_table(doc)
+            template_table = self._find_milestone_table(template())
+            if table is not None and template_table is not None:
+                for row in table.rows[len(template_table.rows):]:
+                    row._tr.getparent().remove(row._tr)
+
+        if mode == _MARK_SCOPE:
+            # The scope boxes are filled in place: restore the template's box
+            # paragraphs, then fill them again.
+            region = self._template_region(template(), doc, section_name)
+            insert_after = start
+            for elem in region:
+                insert_after.addnext(elem)
+                insert_after = elem
+            if content.strip():
+                section_paras = [Paragraph(e, doc._body) for e in region if e.tag == _W_P]
+                self._inject_scope_boxes(doc, start, section_paras, content)
+        elif content.strip():
+            if mode in (_MARK_NORMAL, _MARK_CLEARED):
+                content = self._truncate_single_sentence(section_name, content)
+            self._inject_content(doc, start, section_name, content, mode)
+
+        _HeadingIndex.for_document(doc).rescan_span(start, end)
+        logger.info("doc_builder.section_replaced section=%s mode=%s", section_name, mode)
+
+    def _restore_template_heading(self, doc: Document, section_name: str) -> list:
+        """Put back the template heading and body paragraphs that excluding *section_name* deleted.
+
+        The copies go in front of the first later template heading still in
+        *doc* (matched in order by text), where a full build has them, and
+        are returned.  Nothing is restored when *doc* still has the heading
+        or the template has none.
+
+        Raises:
+            IncrementalBuildError: the section's template body holds tables,
+                which the exclusion left in place, so the heading cannot be
+                restored around them.
+        """
+        matcher = section_strategy(section_name).matcher
+        index = _HeadingIndex.for_document(doc)
+        if index.find(matcher.keyword, exact=matcher.exact) is not None:
+            return []
+        template = self._load_or_create_template()
+        self._substitute_names(template)
+        template_index = _HeadingIndex(template)
+        heading = template_index.find(matcher.keyword, exact=matcher.exact)
+        if heading is None:
+            return []
+
+        end = template_index.section_end(heading, numbered_only=False)
+        end_elem = end.element if end is not None else None
+        elem = heading.element.getnext()
+        while elem is not None and elem is not end_elem:
+            if elem.tag == qn("w:tbl"):
+                raise IncrementalBuildError(
+                    f"{section_name} was excluded from the base document and its template "
+                    "section holds tables; regenerate it in full"
+                )
+            elem = elem.getnext()
+        deleted = [heading.element] + [p._element for p in template_index.paragraphs_between(heading.element, end)]
+        restored = self._enclosing_cleanup(
+            template_index, heading, [copy.deepcopy(e) for e in deleted], doc
+        )
+
+        # Align template headings with the document's, in order, to find the
+        # first later one the document still has.
+        deleted_set = set(deleted)
+        template_headings, doc_headings = template_index.headings(), index.headings()
+        own = template_headings.index(heading)
+        position, anchor = 0, None
+        for i, entry in enumerate(template_headings):
+            if entry.element in deleted_set:
+                continue
+            match = next((j for j in range(position, len(doc_headings)) if doc_headings[j].text == entry.text), None)
+            if match is None:
+                continue
+            position = match + 1
+            if i > own:
+                anchor = doc_headings[match]
+                break
+
+        body = doc.element.body
+        sect_pr = body.find(qn("w:sectPr"))
+        for elem in restored:
+            if anchor is not None:
+                anchor.element.addprevious(elem)
+            elif sect_pr is not None:
+                sect_pr.addprevious(elem)
+            else:
+                body.append(elem)
+        if restored:
+            index.rescan(restored[0], anchor)
+        logger.info(
+            "doc_builder.template_heading_restored section=%s paragraphs=%d before=%s",
+            section_name, len(restored), anchor.text if anchor is not None else "end",
+        )
+        return restored
+
+    def _template_region(self, template: Document, doc: Document, section_name: str) -> list:
+        """Copies of the template elements under a section's heading, as the build left them before injecting it.
+
+        The region runs from the heading to the section's last paragraph —
+        the span :meth:`_inject_section_body` marks for SCOPE.  Names are
+        substituted, and the placeholder clean-up that injecting an enclosing
+        section (PROJECT OVERVIEW for SCOPE) applied to its whole range is
+        repeated.
+        """
+        def _find(index: _HeadingIndex, name: str) -> _Heading | None:
+            matcher = section_strategy(name).matcher
+            return index.find(matcher.keyword, exact=matcher.exact)
+
+        index = _HeadingIndex.for_document(template)
+        heading = _find(index, section_name)
+        if heading is None:
+            return []
+        section_paras = index.paragraphs_between(heading.element, index.section_end(heading))
+        if not section_paras:
+            return []
+        region = []
+        elem = heading.element.getnext()
+        while True:
+            region.append(copy.deepcopy(elem))
+            if elem is section_paras[-1]._element:
+                break
+            elem = elem.getnext()
+
+        region = self._enclosing_cleanup(index, heading, region, doc)
+        self._substitute_names(template, roots=region)
+        return region
+
+    def _enclosing_cleanup(self, index: _HeadingIndex, heading: _Heading, region: list, doc: Document) -> list:
+        """*region* (copied from under template *heading*) as injecting its enclosing sections in *doc* left it.
+
+        A section injected with its heading kept clears placeholders (or, full
+        clear, every body paragraph) across its whole range, including nested
+        sections.
+        """
+        headings = index.headings()
+        position = next(i for i, h in enumerate(headings) if h is heading)
+        enclosing = {
+            h.element for h in headings[:position]
+            if h.level is not None and heading.level is not None and h.level < heading.level
+            and index.section_end(h) in headings[position + 1:] + [None]
+        }
+        marks = _SectionMarks.for_document(doc)
+        for strategy in section_strategies():
+            span = marks.span(strategy.name)
+            found = index.find(strategy.matcher.keyword, exact=strategy.matcher.exact) if span is not None else None
+            if found is None or found.element not in enclosing:
+                continue
+            if span[0] == _MARK_CLEARED:
+                region = [e for e in region if e.tag != _W_P or index.level(e) is not None]
+            elif span[0] == _MARK_NORMAL:
+                region = [
+                    e for e in region
+                    if e.tag != _W_P or not _PLACEHOLDER_RE.search(Paragraph(e, doc._body).text)
+                ]
+        return region
+
     def build_markdown(self, full_document: str, output_dir: Path) -> str:
         """Save generated content as markdown and return file name."""
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -970,7 +1815,7 @@ class DocumentBuilder:
             ("target", "target architecture diagram"),
         ]
 
-        all_paras = doc.paragraphs
+        index = _HeadingIndex.for_document(doc)
 
         for role, keyword in slot_map:
             raw = diagram_images.get(role)
@@ -982,13 +1827,9 @@ class DocumentBuilder:
                 continue
 
             # Find the matching heading paragraph
-            heading_idx: int | None = None
-            for i, p in enumerate(all_paras):
-                if keyword in p.text.lower() and self._is_heading_style(p):
-                    heading_idx = i
-                    break
+            heading = index.find(keyword)
 
-            if heading_idx is None:
+            if heading is None:
                 logger.warning(
                     "doc_builder.diagram_heading_not_found role=%s keyword=%r", role, keyword
                 )
@@ -996,13 +1837,11 @@ class DocumentBuilder:
 
             # Find the first placeholder drawing paragraph after the heading
             placeholder_para = None
-            search_limit = min(heading_idx + 10, len(all_paras))
-            for i in range(heading_idx + 1, search_limit):
-                p = all_paras[i]
+            for offset, p in enumerate(index.paragraphs_between(heading.element, None, limit=9), start=1):
                 if p._element.findall(f".//{_DRAWING_TAG}"):
                     placeholder_para = p
                     logger.debug(
-                        "doc_builder.diagram_placeholder_found role=%s para_idx=%d", role, i
+                        "doc_builder.diagram_placeholder_found role=%s offset=%d", role, offset
                     )
                     break
 
@@ -1011,15 +1850,8 @@ class DocumentBuilder:
                     "doc_builder.diagram_no_placeholder role=%s — inserting after heading", role
                 )
                 new_p_elem = OxmlElement("w:p")
-                all_paras[heading_idx]._element.addnext(new_p_elem)
-                placeholder_para = next(
-                    (p for p in doc.paragraphs if p._element is new_p_elem), None
-                )
-                if placeholder_para is None:
-                    logger.warning(
-                        "doc_builder.diagram_para_create_failed role=%s", role
-                    )
-                    continue
+                heading.element.addnext(new_p_elem)
+                placeholder_para = Paragraph(new_p_elem, doc._body)
 
             # ── Embed first image in the placeholder slot ──────────────
             first_name, first_bytes = images[0]
@@ -1055,11 +1887,7 @@ class DocumentBuilder:
                 try:
                     new_p_elem = OxmlElement("w:p")
                     anchor_elem.addnext(new_p_elem)
-                    img_para = next(
-                        (p for p in doc.paragraphs if p._element is new_p_elem), None
-                    )
-                    if img_para is None:
-                        continue
+                    img_para = Paragraph(new_p_elem, doc._body)
                     img_run = img_para.add_run()
                     img_run.add_picture(BytesIO(fbytes), width=Inches(5.5))
                     logger.info(
@@ -1083,20 +1911,19 @@ class DocumentBuilder:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _apply_heading1_page_breaks(doc: Document) -> None:
+    def _apply_heading1_page_breaks(doc: Document, paragraphs: list | None = None) -> None:
         """Add a pageBreakBefore property to every Heading 1 except the first.
 
         This ensures each major section starts on a fresh page without the engineer
         having to manually insert page breaks after every generation run.
+        *paragraphs* limits the pass to those paragraphs (a rebuild's new ones).
         """
-        first_h1_seen = False
-        for para in doc.paragraphs:
-            if not (para.style.name == "Heading 1" or
-                    (para.style.name.startswith("Heading") and
-                     DocumentBuilder._get_heading_level(para) == 1)):
+        index = _HeadingIndex.for_document(doc)
+        first_h1 = next((h.element for h in index.headings() if h.level == 1), None)
+        for para in doc.paragraphs if paragraphs is None else paragraphs:
+            if index.level(para._element) != 1:
                 continue
-            if not first_h1_seen:
-                first_h1_seen = True
+            if para._element is first_h1:
                 continue  # don't add a break before the very first H1
             p_elem = para._element
             pPr = p_elem.find(qn("w:pPr"))
@@ -1109,7 +1936,7 @@ class DocumentBuilder:
         logger.info("doc_builder.heading1_page_breaks_applied")
 
     @staticmethod
-    def _suppress_blank_heading_page_breaks(doc: Document) -> None:
+    def _suppress_blank_heading_page_breaks(doc: Document, paragraphs: list | None = None) -> None:
         """Remove spurious page breaks that produce blank pages.
 
         Two passes — both operate only on paragraphs whose visible text is
@@ -1130,6 +1957,8 @@ class DocumentBuilder:
         IMPORTANT: paragraphs that contain inline images have ``para.text == ""``
         but their runs hold ``<w:drawing>`` elements.  We must never touch those
         runs — only runs that are truly devoid of any visible content.
+
+        *paragraphs* limits both passes to those paragraphs (a rebuild's new ones).
         """
         # Tags that represent real content inside a run.  A run carrying any of
         # these must NOT be deleted, even if it has no plain text.
@@ -1143,10 +1972,11 @@ class DocumentBuilder:
             qn("w:tab"),      # tab character
         }
 
+        index = _HeadingIndex.for_document(doc)
         removed_pbr = 0  # pageBreakBefore on empty headings
         removed_brk = 0  # explicit page-break runs in empty paragraphs
 
-        for para in doc.paragraphs:
+        for para in doc.paragraphs if paragraphs is None else paragraphs:
             if para.text.strip():
                 continue  # paragraph has visible text — leave page breaks alone
 
@@ -1156,7 +1986,7 @@ class DocumentBuilder:
                 continue
 
             # Pass 1: pageBreakBefore on empty headings
-            if DocumentBuilder._get_heading_level(para) is not None:
+            if index.level(p_elem) is not None:
                 pPr = p_elem.find(qn("w:pPr"))
                 if pPr is not None:
                     pbr = pPr.find(qn("w:pageBreakBefore"))
@@ -1202,8 +2032,8 @@ class DocumentBuilder:
     def _inject_scope_boxes(
         self,
         doc: Document,
-        heading_idx: int,
-        next_heading_idx: int,
+        heading_elem,
+        section_paras: list,
         content: str,
     ) -> None:
         """Handle SCOPE section injection.
@@ -1239,7 +2069,6 @@ class DocumentBuilder:
         """
         import copy
 
-        paragraphs = list(doc.paragraphs)
         body = doc.element.body
         W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
 
@@ -1250,8 +2079,7 @@ class DocumentBuilder:
         current_header = None
         current_content_paras: list = []
 
-        for i in range(heading_idx + 1, next_heading_idx):
-            para = paragraphs[i]
+        for para in section_paras:
             p    = para._element
             has_pBdr = p.find(f".//{qn('w:pBdr')}") is not None
             has_shd  = p.find(f".//{qn('w:shd')}")  is not None
@@ -1283,8 +2111,7 @@ class DocumentBuilder:
 
         if not box_groups:
             logger.warning("doc_builder.scope_no_boxes_found — falling back to append")
-            anchor = paragraphs[heading_idx]._element
-            self._inject_blocks_after_element(anchor, content)
+            self._inject_blocks_after_element(heading_elem, content)
             return
 
         # ── Step 3: parse LLM output into 3 labeled blocks ────────────────
@@ -1502,19 +2329,7 @@ class DocumentBuilder:
 
         Returns True if rows were appended, False if the table was not found.
         """
-        # Locate the milestone table by header pattern
-        target_table = None
-        for table in doc.tables:
-            if not table.rows:
-                continue
-            hdrs = [
-                cell.text.strip().lower()
-                for cell in table.rows[0].cells
-            ]
-            if "milestone" in hdrs[0] and len(hdrs) >= 4:
-                target_table = table
-                break
-
+        target_table = self._find_milestone_table(doc)
         if target_table is None:
             logger.warning("doc_builder.milestone_table_not_found — cannot append rows")
             return False
@@ -1549,6 +2364,20 @@ class DocumentBuilder:
         )
         return True
 
+    @staticmethod
+    def _find_milestone_table(doc: Document):
+        """The template milestone table, located by its header row pattern."""
+        for table in doc.tables:
+            if not table.rows:
+                continue
+            hdrs = [
+                cell.text.strip().lower()
+                for cell in table.rows[0].cells
+            ]
+            if "milestone" in hdrs[0] and len(hdrs) >= 4:
+                return table
+        return None
+
     @staticmethod
     def _set_cell_with_pending_red(cell, text: str) -> None:
         """Write *text* into *cell*, colouring ``PENDING TO REVIEW`` spans red."""
@@ -1649,13 +2478,12 @@ class DocumentBuilder:
         For all other labeled-format sections, delegates directly to the
         text renderer without attempting JSON parsing.
         """
-        upper = section_name.upper()
-        if upper in _STRUCTURED_OUTPUT_SECTIONS:
+        if section_strategy(section_name).structured:
             try:
                 # Strip stray markdown code-fence wrappers before parsing.
                 raw = content.strip()
-                raw = re.sub(r"^```(?:json)?\s*\n?", "", raw)
-                raw = re.sub(r"\n?```\s*$", "", raw)
+                raw = _CODE_FENCE_OPEN_RE.sub("", raw)
+                raw = _CODE_FENCE_CLOSE_RE.sub("", raw)
                 data = _json.loads(raw.strip())
                 if not isinstance(data, dict):
                     raise ValueError(
@@ -2352,81 +3180,47 @@ class DocumentBuilder:
         Used when a section is excluded from generation — ensures the template heading
         doesn't appear in the final DOCX as an empty stub.
         """
-        raw_keyword = SECTION_HEADING_KEYWORDS.get(section_name.upper(), section_name.lower())
-        exact_match = raw_keyword.startswith("=")
-        keyword = raw_keyword[1:] if exact_match else raw_keyword
-
-        paragraphs = list(doc.paragraphs)
+        matcher = section_strategy(section_name).matcher
+        index = _HeadingIndex.for_document(doc)
 
         # Locate the section heading
-        heading_idx: int | None = None
-        heading_level = 1
-        for i, para in enumerate(paragraphs):
-            if not self._is_heading_style(para):
-                continue
-            para_text = para.text.strip().lower()
-            matched = (para_text == keyword.lower()) if exact_match else (keyword.lower() in para_text)
-            if matched:
-                heading_idx = i
-                heading_level = self._get_heading_level(para) or 1
-                break
-
-        if heading_idx is None:
+        heading = index.find(matcher.keyword, exact=matcher.exact)
+        if heading is None:
             logger.debug("doc_builder.delete_section_not_found section=%s", section_name)
             return False
 
         # Find where this section ends (next heading at same or higher hierarchy level)
-        end_idx = len(paragraphs)
-        for i in range(heading_idx + 1, len(paragraphs)):
-            if self._is_heading_style(paragraphs[i]):
-                lvl = self._get_heading_level(paragraphs[i]) or 1
-                if lvl <= heading_level:
-                    end_idx = i
-                    break
+        end = index.section_end(heading, numbered_only=False)
+        removed = [heading.element] + [p._element for p in index.paragraphs_between(heading.element, end)]
 
-        # Remove all paragraphs in [heading_idx, end_idx)
-        for para in paragraphs[heading_idx:end_idx]:
-            p = para._element
+        # Remove the heading and every body paragraph up to the next section
+        for p in removed:
             parent = p.getparent()
             if parent is not None:
                 parent.remove(p)
+        index.discard_detached()
 
         logger.info(
             "doc_builder.section_deleted section=%s removed_paragraphs=%d",
             section_name,
-            end_idx - heading_idx,
+            len(removed),
         )
         return True
 
     def _inject_section(self, doc: Document, section_name: str, content: str) -> bool:
         """Find heading in template, remove placeholder paragraphs, inject content."""
-        raw_keyword = SECTION_HEADING_KEYWORDS.get(section_name.upper(), section_name.lower())
-
         # A keyword prefixed with "=" requires an EXACT heading-text match
         # (case-insensitive) rather than a substring search.  Used for short
         # keywords like "scope" that would otherwise match longer headings.
-        exact_match = raw_keyword.startswith("=")
-        keyword = raw_keyword[1:] if exact_match else raw_keyword
+        strategy = section_strategy(section_name)
+        keyword = strategy.matcher.keyword
 
-        paragraphs = list(doc.paragraphs)
+        index = _HeadingIndex.for_document(doc)
 
         # Find the matching heading paragraph (body-level paragraphs only)
-        heading_idx: int | None = None
-        heading_level = 1
-        for i, para in enumerate(paragraphs):
-            if not self._is_heading_style(para):
-                continue
-            para_text = para.text.strip().lower()
-            if exact_match:
-                matched = (para_text == keyword.lower())
-            else:
-                matched = (keyword.lower() in para_text)
-            if matched:
-                heading_idx = i
-                heading_level = self._get_heading_level(para) or 1
-                break
+        heading = index.find(keyword, exact=strategy.matcher.exact)
 
-        if heading_idx is None:
+        if heading is None:
             # Fallback: search inside table cells — python-docx excludes these from doc.paragraphs
             table_elem = self._find_heading_in_tables(doc, keyword)
             if table_elem is not None:
@@ -2434,7 +3228,7 @@ class DocumentBuilder:
                     "doc_builder.heading_in_table section=%s — injecting after table element",
                     section_name,
                 )
-                self._inject_blocks_after_element(table_elem, content)
+                self._inject_marked(doc, table_elem, section_name, content, _MARK_TABLE)
                 content_blocks = [b.strip() for b in content.split("\n\n") if b.strip()]
                 logger.info(
                     "doc_builder.section_injected section=%s blocks=%d via table_fallback",
@@ -2443,7 +3237,7 @@ class DocumentBuilder:
                 )
                 return True
 
-            available_headings = [p.text for p in paragraphs if self._is_heading_style(p)]
+            available_headings = [Paragraph(h.element, doc._body).text for h in index.headings()]
             logger.warning(
                 "doc_builder.heading_not_found section=%s keyword=%r — "
                 "available template headings: %s",
@@ -2454,21 +3248,36 @@ class DocumentBuilder:
             return False
 
         # Find range: heading+1 → next same-or-higher-level heading
-        next_heading_idx = len(paragraphs)
-        for i in range(heading_idx + 1, len(paragraphs)):
-            lvl = self._get_heading_level(paragraphs[i])
-            if lvl is not None and lvl <= heading_level:
-                next_heading_idx = i
-                break
-
+        next_heading = index.section_end(heading)
+        section_paras = index.paragraphs_between(heading.element, next_heading)
+        try:
+            return self._inject_section_body(doc, index, heading, section_paras, strategy, section_name, content)
+        finally:
+            index.rescan(heading.element, next_heading)
+
+    def _inject_section_body(
+        self,
+        doc: Document,
+        index: _HeadingIndex,
+        heading: _Heading,
+        section_paras: list,
+        strategy: SectionStrategy,
+        section_name: str,
+        content: str,
+    ) -> bool:
+        """Replace the template body of a located section with *content*."""
         body = doc.element.body
         content_blocks = [b.strip() for b in content.split("\n\n") if b.strip()]
 
         # ── SCOPE special handling ───────────────────────────────────────
         # Retains the colored scope-box paragraphs from the template, removes
         # only LLM-generated intro text, and injects content inside each box.
-        if section_name.upper() == "SCOPE":
-            self._inject_scope_boxes(doc, heading_idx, next_heading_idx, content)
+        if strategy.scope_boxes:
+            marks = _SectionMarks.for_document(doc)
+            anchor_elem = marks.skip_ends(heading.element)
+            following = (section_paras[-1]._element if section_paras else anchor_elem).getnext()
+            self._inject_scope_boxes(doc, heading.element, section_paras, content)
+            marks.wrap(section_name, _MARK_SCOPE, anchor_elem, following)
             logger.info(
                 "doc_builder.section_injected section=%s blocks=%d (scope_boxes)",
                 section_name, len(content_blocks),
@@ -2476,76 +3285,47 @@ class DocumentBuilder:
             return True
 
         # ── Single-sentence sections: truncate to first paragraph ────────
-        # These sections must produce exactly ONE introductory sentence.
-        # The LLM is instructed accordingly but may still emit extra
-        # paragraphs.  Silently truncate so only the first paragraph is
-        # injected, preventing unwanted text above the following table.
-        if section_name.upper() in _SINGLE_SENTENCE_SECTIONS:
-            first_block = content.split("\n\n")[0].strip()
-            if first_block:
-                content = first_block
-                content_blocks = [first_block]
-                logger.debug(
-                    "doc_builder.content_truncated_single_sentence section=%s",
-                    section_name,
-                )
+        content = self._truncate_single_sentence(section_name, content)
+        content_blocks = [b.strip() for b in content.split("\n\n") if b.strip()]
 
         # ── Full-clear sections ──────────────────────────────────────────
         # For sections that are 100% LLM-generated, remove ALL non-heading
         # template paragraphs between the section heading and the next
         # heading, then inject the LLM content immediately after the heading.
-        if section_name.upper() in _FULL_CLEAR_SECTIONS:
-            for i in range(heading_idx + 1, next_heading_idx):
-                para = paragraphs[i]
-                if self._get_heading_level(para) is None:
+        if strategy.full_clear:
+            for para in section_paras:
+                if index.level(para._element) is None:
                     try:
                         body.remove(para._element)
                     except Exception:
                         pass
-            anchor_elem = paragraphs[heading_idx]._element
-            _use_formatted    = section_name.upper() in _LABELED_FORMAT_SECTIONS
-            _use_hierarchical = section_name.upper() in _HIERARCHICAL_BULLET_SECTIONS
-            if section_name.upper() == "ARCHITECTURE COMPONENTS" and self._inject_arch_components_table_after_element(anchor_elem, content, doc):
-                pass
-            elif _use_formatted:
-                self._inject_labeled_content(anchor_elem, content, section_name, doc=doc)
-            elif _use_hierarchical:
-                self._inject_hierarchical_bullets_after_element(anchor_elem, content)
-            else:
-                self._inject_blocks_after_element(anchor_elem, content)
+            self._inject_marked(doc, heading.element, section_name, content, _MARK_CLEARED)
             logger.info(
                 "doc_builder.section_injected section=%s blocks=%d (full_clear%s%s)",
                 section_name, len(content_blocks),
-                ",formatted" if _use_formatted else "",
-                ",hierarchical" if _use_hierarchical else "",
+                ",formatted" if strategy.labeled else "",
+                ",hierarchical" if strategy.hierarchical else "",
             )
             return True
 
         # ── Normal sections ──────────────────────────────────────────────
         # Remove placeholder paragraphs (but not sub-headings or real content)
-        for i in range(heading_idx + 1, next_heading_idx):
-            para = paragraphs[i]
+        for para in section_paras:
             if _PLACEHOLDER_RE.search(para.text):
                 body.remove(para._element)
 
         # Determine the injection anchor.
         # Advance the anchor past any template intro text so LLM content is
         # appended after it (never before surviving template paragraphs).
-        anchor_elem = paragraphs[heading_idx]._element
-        for i in range(heading_idx + 1, next_heading_idx):
-            para = paragraphs[i]
-            lvl = self._get_heading_level(para)
+        anchor_elem = heading.element
+        for para in section_paras:
+            lvl = index.level(para._element)
             if lvl is not None:
                 break  # hit a sub-heading — keep current anchor
             if para.text.strip() and not _PLACEHOLDER_RE.search(para.text):
                 anchor_elem = para._element  # advance anchor past intro para(s)
 
-        if section_name.upper() == "ARCHITECTURE COMPONENTS" and self._inject_arch_components_table_after_element(anchor_elem, content, doc):
-            pass
-        elif section_name.upper() in _LABELED_FORMAT_SECTIONS:
-            self._inject_labeled_content(anchor_elem, content, section_name, doc=doc)
-        else:
-            self._inject_blocks_after_element(anchor_elem, content)
+        self._inject_marked(doc, anchor_elem, section_name, content, _MARK_NORMAL)
         logger.info("doc_builder.section_injected section=%s blocks=%d", section_name, len(content_blocks))
         return True
 
@@ -2568,21 +3348,14 @@ class DocumentBuilder:
         fresh.  Returns True on success, False when the anchor cannot be found.
         """
         import copy
-        from lxml import etree
 
         ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
-        paragraphs = list(doc.paragraphs)
+        index = _HeadingIndex.for_document(doc)
 
         # Locate the anchor heading.
-        anchor_idx: int | None = None
-        anchor_level = 1
-        for i, para in enumerate(paragraphs):
-            if self._is_heading_style(para) and after_keyword.lower() in para.text.lower():
-                anchor_idx = i
-                anchor_level = self._get_heading_level(para) or 1
-                break
+        anchor = index.find(after_keyword)
 
-        if anchor_idx is None:
+        if anchor is None:
             logger.warning(
                 "doc_builder.inject_after_anchor_not_found section=%s anchor_keyword=%r",
                 section_name,
@@ -2591,43 +3364,32 @@ class DocumentBuilder:
             return False
 
         # Find the end of the anchor section (first same-or-higher heading after it).
-        end_idx = len(paragraphs)
-        for i in range(anchor_idx + 1, len(paragraphs)):
-            lvl = self._get_heading_level(paragraphs[i])
-            if lvl is not None and lvl <= anchor_level:
-                end_idx = i
-                break
+        end = index.section_end(anchor)
+        section_paras = index.paragraphs_between(anchor.element, end)
 
-        # Insert after the last paragraph of the anchor section.
-        insert_after_elem = (
-            paragraphs[end_idx - 1]._element
-            if end_idx > anchor_idx + 1
-            else paragraphs[anchor_idx]._element
-        )
+        # Insert after the last paragraph of the anchor section (and after the
+        # end of that section's marked span, when the paragraph closes it).
+        insert_after_elem = section_paras[-1]._element if section_paras else anchor.element
+        insert_after_elem = _SectionMarks.for_document(doc).skip_ends(insert_after_elem)
 
         # Build a new heading element: clone pPr from anchor (preserves style),
         # attach a fresh text run.
-        source_pPr = paragraphs[anchor_idx]._element.find(f"{{{ns}}}pPr")
-        heading_elem = etree.Element(f"{{{ns}}}p")
+        source_pPr = anchor.element.find(f"{{{ns}}}pPr")
+        heading_elem = OxmlElement("w:p")
         if source_pPr is not None:
             heading_elem.append(copy.deepcopy(source_pPr))
-        r_elem = etree.SubElement(heading_elem, f"{{{ns}}}r")
-        t_elem = etree.SubElement(r_elem, f"{{{ns}}}t")
+        r_elem = OxmlElement("w:r")
+        t_elem = OxmlElement("w:t")
         t_elem.text = section_name.title()
+        r_elem.append(t_elem)
+        heading_elem.append(r_elem)
 
         insert_after_elem.addnext(heading_elem)
 
         # Inject body content after the new heading.
-        _use_formatted = section_name.upper() in _LABELED_FORMAT_SECTIONS
-        _use_hierarchical = section_name.upper() in _HIERARCHICAL_BULLET_SECTIONS
-        if section_name.upper() == "ARCHITECTURE COMPONENTS" and self._inject_arch_components_table_after_element(heading_elem, content, doc):
-            pass
-        elif _use_formatted:
-            self._inject_labeled_content(heading_elem, content, section_name, doc=doc)
-        elif _use_hierarchical:
-            self._inject_hierarchical_bullets_after_element(heading_elem, content)
-        else:
-            self._inject_blocks_after_element(heading_elem, content)
+        strategy = section_strategy(section_name)
+        self._inject_marked(doc, heading_elem, section_name, content, _MARK_ADDED)
+        index.rescan(anchor.element, end)
 
         content_blocks = [b.strip() for b in content.split("\n\n") if b.strip()]
         logger.info(
@@ -2635,8 +3397,8 @@ class DocumentBuilder:
             section_name,
             after_keyword,
             len(content_blocks),
-            ",formatted" if _use_formatted else "",
-            ",hierarchical" if _use_hierarchical else "",
+            ",formatted" if strategy.labeled else "",
+            ",hierarchical" if strategy.hierarchical else "",
         )
         return True
 
@@ -2648,14 +3410,54 @@ class DocumentBuilder:
         structure is preserved even when the section is not found in the template.
         """
         heading = doc.add_heading(section_name.title(), level=1)
-        if section_name.upper() == "ARCHITECTURE COMPONENTS" and self._inject_arch_components_table_after_element(heading._element, content, doc):
-            return
-        if section_name.upper() in _LABELED_FORMAT_SECTIONS:
-            self._inject_labeled_content(heading._element, content, section_name, doc=doc)
-        else:
+        self._inject_marked(doc, heading._element, section_name, content, _MARK_APPENDED)
+        _HeadingIndex.for_document(doc).rescan(heading._element, None)
+
+    @staticmethod
+    def _truncate_single_sentence(section_name: str, content: str) -> str:
+        """Keep only the first paragraph of a single-sentence section (:data:`_SINGLE_SENTENCE_SECTIONS`).
+
+        These sections must produce exactly ONE introductory sentence.  The
+        LLM is instructed accordingly but may still emit extra paragraphs;
+        dropping them prevents unwanted text above the following table.
+        """
+        if section_strategy(section_name).single_sentence:
+            first_block = content.split("\n\n")[0].strip()
+            if first_block:
+                logger.debug(
+                    "doc_builder.content_truncated_single_sentence section=%s",
+                    section_name,
+                )
+                return first_block
+        return content
+
+    def _inject_marked(self, doc: Document, anchor_elem, section_name: str, content: str, mode: str) -> None:
+        """Inject *content* after *anchor_elem* and mark the injected span (see :class:`_SectionMarks`)."""
+        marks = _SectionMarks.for_document(doc)
+        anchor_elem = marks.skip_ends(anchor_elem)
+        following = anchor_elem.getnext()
+        self._inject_content(doc, anchor_elem, section_name, content, mode)
+        marks.wrap(section_name, mode, anchor_elem, following)
+
+    def _inject_content(self, doc: Document, anchor_elem, section_name: str, content: str, mode: str) -> None:
+        """Render *content* after *anchor_elem* with the renderer the injection *mode* uses."""
+        strategy = section_strategy(section_name)
+        if mode == _MARK_TABLE:
+            self._inject_blocks_after_element(anchor_elem, content)
+        elif strategy.renderer is not None and strategy.renderer(self, doc, anchor_elem, section_name, content) is not False:
+            pass
+        elif mode in (_MARK_CLEARED, _MARK_ADDED) and strategy.hierarchical:
+            self._inject_hierarchical_bullets_after_element(anchor_elem, content)
+        elif mode == _MARK_APPENDED:
+            # Plain document paragraphs, as the fallback template uses.
+            insert_after = anchor_elem
             for block in content.split("\n\n"):
                 if block.strip():
-                    doc.add_paragraph(block.strip())
+                    p_elem = doc.add_paragraph(block.strip())._element
+                    insert_after.addnext(p_elem)
+                    insert_after = p_elem
+        else:
+            self._inject_blocks_after_element(anchor_elem, content)
 
     def _find_heading_in_tables(self, doc: Document, keyword: str):
         """Search table cells for a heading paragraph matching keyword.
@@ -2687,19 +3489,8 @@ class DocumentBuilder:
     @staticmethod
     def _is_heading_style(para) -> bool:
         """Return True if the paragraph uses any Heading-based style (including custom derived styles)."""
-        style = para.style
-        while style is not None:
-            if style.name.startswith("Heading"):
-                return True
-            style = getattr(style, "base_style", None)
-        return False
+        return _style_is_heading(para.style)
 
     @staticmethod
     def _get_heading_level(para) -> int | None:
-        style_name = para.style.name
-        if style_name.startswith("Heading"):
-            try:
-                return int(style_name.split()[-1])
-            except (ValueError, IndexError):
-                return 1
-        return None
+        return _style_heading_level(para.style)
@@ -0,0 +1,482 @@
+"""Shared decode/resize stage for uploaded architecture diagrams.
+
+Each upload has two consumers: the vision agent, which needs the image at
+no more than 4096 px on its longest side, and the DOCX builder, which shows
+it 5.5 inches wide.  Before this stage the agent decoded and resized the
+upload itself, and the builder embedded the raw upload — often a 4K+ PNG
+of several megabytes — into every document.
+
+:func:`prepare_image` decodes an upload once and derives both variants:
+
+* **vision** — the original bytes when they already fit, otherwise a PNG
+  downsampled to ``max_dimension`` (what the agent used to produce); either
+  is transcoded when it exceeds ``VISION_PAYLOAD_MAX_BYTES`` (see
+  :func:`_fit_payload`), so every retry re-sends the same small payload;
+* **docx** — at most ``DOCX_IMAGE_MAX_WIDTH_PX`` wide (5.5 in at 300 dpi by
+  default), re-encoded as optimised PNG (JPEG for photographic JPEG uploads);
+  whichever of the original and the re-encode is smaller is kept.
+
+Each upload also gets a perceptual (difference) hash, so re-exports of one
+diagram — PNG vs JPEG, slightly rescaled — can be recognised before they
+are analysed twice (see :func:`perceptual_distance`).
+
+Results are cached by SHA-256 of the upload, in an LRU bounded by total
+variant bytes.  A downsampled vision variant is also indexed under its own
+digest, so looking it up again (e.g. to read its metadata) is a hit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from io import BytesIO
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# 5.5 inches — the width DocumentBuilder gives every diagram — at 300 dpi.
+DOCX_IMAGE_MAX_WIDTH_PX = int(os.getenv("DOCX_IMAGE_MAX_WIDTH_PX", "1650"))
+VISION_MAX_DIMENSION = 4096
+# Encoded size above which the vision variant is transcoded (before base64,
+# which adds a third).
+VISION_PAYLOAD_MAX_BYTES = int(os.getenv("VISION_PAYLOAD_MAX_BYTES", str(3 * 1024 * 1024)))
+# Distinct colours (in a nearest-neighbour sample) up to which an image is
+# treated as a flat diagram rather than a photograph or screenshot.
+_FLAT_MAX_COLOURS = 1024
+_EXIF_ORIENTATION = 0x0112
+
+
+@dataclass(frozen=True)
+class ImageVariant:
+    """Encoded image bytes plus the facts consumers need about them."""
+
+    data: bytes
+    width: int
+    height: int
+    fmt: str
+    mime_type: str
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """Both consumer variants of one upload."""
+
+    sha256: str
+    source_width: int
+    source_height: int
+    source_fmt: str
+    vision: ImageVariant
+    docx: ImageVariant
+    # 64-bit difference hash of the picture (see perceptual_distance).
+    dhash: int = 0
+    # Cache key (digest plus vision size limit) and the keys of derived variants.
+    key: str = ""
+    aliases: tuple[str, ...] = field(default=())
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.vision.data) + (len(self.docx.data) if self.docx.data is not self.vision.data else 0)
+
+
+def _mime(fmt: str) -> str:
+    from PIL import Image
+
+    return Image.MIME.get(fmt.upper(), "application/octet-stream")
+
+
+def _flatten(image: Any) -> Any:
+    """RGB copy of *image* with transparent areas painted white."""
+    if "A" not in image.getbands():
+        return image.convert("RGB")
+    from PIL import Image
+
+    background = Image.new("RGBA", image.size, "white")
+    return Image.alpha_composite(background, image.convert("RGBA")).convert("RGB")
+
+
+def _encode(image: Any, fmt: str, quality: int = 85) -> bytes:
+    buf = BytesIO()
+    if fmt == "jpeg":
+        _flatten(image).save(buf, format="JPEG", quality=quality, optimize=True)
+    else:
+        image.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def _palette_png(image: Any) -> bytes:
+    from PIL import Image
+
+    if "A" in image.getbands():
+        quantized = image.convert("RGBA").quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    else:
+        quantized = image.convert("RGB").quantize(256, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+    return _encode(quantized, "png")
+
+
+def _is_flat(image: Any) -> bool:
+    """True for diagram-like content: few distinct colours, large uniform areas."""
+    from PIL import Image
+
+    sample = image.copy()
+    sample.thumbnail((256, 256), Image.NEAREST)
+    return sample.getcolors(maxcolors=_FLAT_MAX_COLOURS) is not None
+
+
+_transcode_lock = threading.Lock()
+_transcode_stats = {"vision_transcoded": 0, "vision_bytes_saved": 0, "vision_encode_seconds": 0.0}
+
+
+def _fit_payload(
+    image: Any, variant: ImageVariant, file_name: str, budget: int, optimized: bool = False
+) -> ImageVariant:
+    """Re-encode the vision *variant* of *image* to fit *budget* bytes.
+
+    Flat diagrams try lossless optimised PNG, then a 256-colour palette PNG
+    (crisp edges and text), then JPEG; photographic content goes straight to
+    quality-90 JPEG.  If none fits, the image is scaled down by a quarter
+    at a time (not below 1024 px) with the last encoder.  The smallest
+    encoding is kept even when it is still over budget.  *optimized* marks
+    a *variant* that is already an optimised PNG of *image*.
+    """
+    if len(variant.data) <= budget:
+        return variant
+    t0 = time.perf_counter()
+    flat = _is_flat(image)
+    encoders = {
+        "png": lambda img: (_encode(img, "png"), "png"),
+        "palette": lambda img: (_palette_png(img), "png"),
+        "jpeg": lambda img: (_encode(img, "jpeg", quality=90), "jpeg"),
+    }
+    order = (["palette", "jpeg"] if optimized else ["png", "palette", "jpeg"]) if flat else ["jpeg"]
+    best, strategy = variant, "original"
+    for name in order:
+        data, fmt = encoders[name](image)
+        if len(data) < len(best.data):
+            best, strategy = ImageVariant(data, image.width, image.height, fmt, _mime(fmt)), name
+        if len(best.data) <= budget:
+            break
+    scaled = image
+    while len(best.data) > budget and max(scaled.size) > 1024:
+        from PIL import Image
+
+        scaled = scaled.resize((max(1, scaled.width * 3 // 4), max(1, scaled.height * 3 // 4)), Image.LANCZOS)
+        data, fmt = encoders[order[-1]](scaled)
+        best, strategy = ImageVariant(data, scaled.width, scaled.height, fmt, _mime(fmt)), f"{order[-1]}_scaled"
+
+    elapsed = time.perf_counter() - t0
+    saved = len(variant.data) - len(best.data)
+    with _transcode_lock:
+        _transcode_stats["vision_transcoded"] += 1
+        _transcode_stats["vision_bytes_saved"] += saved
+        _transcode_stats["vision_encode_seconds"] += elapsed
+    logger.info(
+        "image_prep.vision_transcoded file=%s flat=%s strategy=%s bytes_before=%d bytes_after=%d saved=%d encode_ms=%.0f",
+        file_name, flat, strategy, len(variant.data), len(best.data), saved, elapsed * 1000,
+    )
+    return best
+
+
+def _dhash(image: Any) -> int:
+    """64-bit difference hash: brightness gradients of a 9x8 greyscale thumbnail.
+
+    Transparent areas are flattened onto white first, so a PNG export with a
+    transparent background hashes like its JPEG export.
+    """
+    from PIL import Image
+
+    small = image.resize((9, 8), Image.LANCZOS, reducing_gap=3.0)
+    if "A" in small.getbands():
+        background = Image.new("RGBA", small.size, "white")
+        small = Image.alpha_composite(background, small.convert("RGBA"))
+    px = small.convert("L").tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return bits
+
+
+def perceptual_distance(a: PreparedImage, b: PreparedImage) -> int:
+    """Hamming distance (0-64) between the difference hashes of two images."""
+    return (a.dhash ^ b.dhash).bit_count()
+
+
+def _decode(
+    content: bytes,
+    sha256: str,
+    file_name: str,
+    max_dimension: int,
+    docx_max_width: int,
+    vision_max_bytes: int = VISION_PAYLOAD_MAX_BYTES,
+) -> PreparedImage | None:
+    try:
+        from PIL import Image, ImageOps
+    except ModuleNotFoundError:
+        logger.error("image_prep.pillow_missing file=%s", file_name)
+        return None
+
+    # Permanently suppress the PIL bomb check for this process. Saving/restoring
+    # the global limit is racy in a multi-threaded server; we do our own size
+    # handling and can safely ignore PIL's default cap.
+    Image.MAX_IMAGE_PIXELS = None
+
+    try:
+        with Image.open(BytesIO(content)) as image:
+            fmt = (image.format or "unknown").lower()
+            if fmt == "mpo":  # multi-picture JPEG from phone cameras
+                fmt = "jpeg"
+            image.load()
+            # Phone photos are stored sideways with an EXIF Orientation tag.
+            # Variants are re-encoded without the tag, so rotate the pixels —
+            # and never reuse the original bytes, whose tag consumers may ignore.
+            upright = image.getexif().get(_EXIF_ORIENTATION, 1) in (0, 1)
+            if not upright:
+                image = ImageOps.exif_transpose(image)
+            w, h = image.size
+            if image.mode not in ("L", "LA", "RGB", "RGBA"):
+                # Palette and bilevel images would be resized with nearest-neighbour.
+                has_alpha = "A" in image.getbands() or "transparency" in image.info
+                image = image.convert("RGBA" if has_alpha else "RGB")
+
+            if w <= max_dimension and h <= max_dimension:
+                if upright:
+                    vision = ImageVariant(content, w, h, fmt, _mime(fmt))
+                else:
+                    vision_fmt = "jpeg" if fmt == "jpeg" else "png"
+                    vision = ImageVariant(_encode(image, vision_fmt, quality=90), w, h, vision_fmt, _mime(vision_fmt))
+                vision = _fit_payload(image, vision, file_name, vision_max_bytes)
+            else:
+                scale = max_dimension / max(w, h)
+                new_w, new_h = int(w * scale), int(h * scale)
+                logger.warning(
+                    "image_prep.vision_downsampled file=%s original=%dx%d target=%dx%d",
+                    file_name, w, h, new_w, new_h,
+                )
+                resized = image.resize((new_w, new_h), Image.LANCZOS)
+                vision = ImageVariant(_encode(resized, "png"), new_w, new_h, "png", "image/png")
+                vision = _fit_payload(resized, vision, file_name, vision_max_bytes, optimized=True)
+
+            dhash = _dhash(image)
+
+            docx_fmt = "jpeg" if fmt == "jpeg" else "png"
+            docx_image = image
+            if w > docx_max_width:
+                docx_h = max(1, round(h * docx_max_width / w))
+                docx_image = image.resize((docx_max_width, docx_h), Image.LANCZOS)
+            encoded = _encode(docx_image, docx_fmt)
+            # python-docx only embeds PNG/JPEG/GIF/BMP/TIFF; anything else is
+            # always replaced by the re-encode.
+            keep_original = upright and len(content) <= len(encoded) and fmt in ("png", "jpeg", "gif")
+            if keep_original:
+                docx = ImageVariant(content, w, h, fmt, _mime(fmt))
+            else:
+                docx = ImageVariant(encoded, docx_image.width, docx_image.height, docx_fmt, _mime(docx_fmt))
+    except Exception:
+        logger.warning("image_prep.decode_failed file=%s size_bytes=%d", file_name, len(content), exc_info=True)
+        return None
+
+    return PreparedImage(
+        sha256=sha256,
+        source_width=w,
+        source_height=h,
+        source_fmt=fmt,
+        vision=vision,
+        docx=docx,
+        dhash=dhash,
+    )
+
+
+class _ImageCache:
+    """LRU of :class:`PreparedImage` keyed by upload digest, bounded by bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, PreparedImage] = OrderedDict()
+        self._aliases: dict[str, str] = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> PreparedImage | None:
+        with self._lock:
+            key = self._aliases.get(key, key)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(self, entry: PreparedImage) -> None:
+        if entry.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(entry.key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[entry.key] = entry
+            self._bytes += entry.nbytes
+            for alias in entry.aliases:
+                self._aliases[alias] = entry.key
+            while self._bytes > self.max_bytes:
+                _key, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                for alias in evicted.aliases:
+                    self._aliases.pop(alias, None)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+
+_cache = _ImageCache(int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024))))
+
+
+def prepare_image(
+    content: bytes,
+    file_name: str = "",
+    max_dimension: int = VISION_MAX_DIMENSION,
+) -> PreparedImage | None:
+    """Decode *content* once into its vision and DOCX variants (cached by content hash).
+
+    Returns ``None`` when the bytes cannot be decoded as an image.
+    """
+    sha256 = hashlib.sha256(content).hexdigest()
+    key = f"{sha256}:{max_dimension}"
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    prepared = _decode(content, sha256, file_name, max_dimension, DOCX_IMAGE_MAX_WIDTH_PX, VISION_PAYLOAD_MAX_BYTES)
+    if prepared is None:
+        return None
+    aliases: tuple[str, ...] = ()
+    if prepared.vision.data is not content:
+        aliases = (f"{hashlib.sha256(prepared.vision.data).hexdigest()}:{max_dimension}",)
+    prepared = replace(prepared, key=key, aliases=aliases)
+    _cache.put(prepared)
+    logger.info(
+        "image_prep.prepared file=%s source=%dx%d bytes=%d vision_bytes=%d docx=%dx%d docx_bytes=%d",
+        file_name,
+        prepared.source_width,
+        prepared.source_height,
+        len(content),
+        len(prepared.vision.data),
+        prepared.docx.width,
+        prepared.docx.height,
+        len(prepared.docx.data),
+    )
+    return prepared
+
+
+def _tile_starts(length: int, span: int, overlap: float) -> tuple[int, list[int]]:
+    """Tile length and evenly spaced start offsets covering *length* with *overlap*."""
+    if length <= span:
+        return length, [0]
+    count = math.ceil(length * (1 + overlap) / span)
+    tile = min(length, math.ceil(length * (1 + overlap) / count))
+    return tile, [round(i * (length - tile) / (count - 1)) for i in range(count)]
+
+
+def tile_image(
+    content: bytes,
+    file_name: str = "",
+    tile_size: int = 1536,
+    overlap: float = 0.15,
+    max_tiles: int = 9,
+) -> list[ImageVariant]:
+    """Split *content* into overlapping tiles cut at source resolution.
+
+    Tiles are at most *tile_size* px on a side and overlap their neighbours
+    by about *overlap* of their width, so a label on a seam is whole in at
+    least one tile.  When the grid would exceed *max_tiles*, tiles are cut
+    larger and scaled down to *tile_size*.  Tiles are row-major PNGs; an
+    image that cannot be decoded yields no tiles.  Not cached: tiles are
+    only needed for a diagram's (cached) first analysis.
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ModuleNotFoundError:
+        logger.error("image_prep.pillow_missing file=%s", file_name)
+        return []
+    Image.MAX_IMAGE_PIXELS = None
+
+    tiles: list[ImageVariant] = []
+    try:
+        with Image.open(BytesIO(content)) as image:
+            image.load()
+            if image.getexif().get(_EXIF_ORIENTATION, 1) not in (0, 1):
+                image = ImageOps.exif_transpose(image)
+            if image.mode not in ("L", "LA", "RGB", "RGBA"):
+                has_alpha = "A" in image.getbands() or "transparency" in image.info
+                image = image.convert("RGBA" if has_alpha else "RGB")
+            w, h = image.size
+            span = tile_size
+            while True:
+                tile_w, xs = _tile_starts(w, span, overlap)
+                tile_h, ys = _tile_starts(h, span, overlap)
+                if len(xs) * len(ys) <= max(1, max_tiles):
+                    break
+                span = int(span * 1.25)
+            for y in ys:
+                for x in xs:
+                    tile = image.crop((x, y, x + tile_w, y + tile_h))
+                    if max(tile.size) > tile_size:
+                        scale = tile_size / max(tile.size)
+                        tile = tile.resize((max(1, int(tile.width * scale)), max(1, int(tile.height * scale))), Image.LANCZOS)
+                    tiles.append(ImageVariant(_encode(tile, "png"), tile.width, tile.height, "png", "image/png"))
+    except Exception:
+        logger.warning("image_prep.tile_failed file=%s size_bytes=%d", file_name, len(content), exc_info=True)
+        return []
+    logger.info(
+        "image_prep.tiled file=%s source=%dx%d grid=%dx%d tile=%dx%d",
+        file_name, w, h, len(xs), len(ys), tile_w, tile_h,
+    )
+    return tiles
+
+
+def docx_variants(diagram_images: dict[str, list[tuple[str, bytes]]]) -> dict[str, list[tuple[str, bytes]]]:
+    """Swap every upload in *diagram_images* for its DOCX variant (undecodable ones stay as-is)."""
+    result: dict[str, list[tuple[str, bytes]]] = {}
+    for role, files in diagram_images.items():
+        result[role] = []
+        for file_name, content in files:
+            prepared = prepare_image(content, file_name)
+            result[role].append((file_name, prepared.docx.data if prepared is not None else content))
+    return result
+
+
+def image_cache_stats() -> dict[str, Any]:
+    """Hit/size counters of the prepared-image cache, plus vision transcoding totals."""
+    with _transcode_lock:
+        transcode = dict(_transcode_stats)
+    transcode["vision_encode_seconds"] = round(transcode["vision_encode_seconds"], 3)
+    return {**_cache.stats(), **transcode}
+
+
+def clear_image_cache() -> None:
+    _cache.clear()
@@ -0,0 +1,410 @@
+"""Persistent background jobs for SoW generation.
+
+``/jobs`` submissions are recorded in a local SQLite database together with
+their inputs (project context, flags and uploaded diagram bytes).  A
+:class:`JobRunner` executes them on a bounded pool of worker coroutines that
+live on a dedicated event-loop thread, independent of any HTTP request.
+
+While a job runs, the pipeline stores each finished phase output — vision
+analysis, inferred metadata, the RAG map, every drafted section and the QA
+review — as a checkpoint.  Jobs left ``queued`` or ``running`` when the
+process stopped are re-queued on start-up and resume from their checkpoints,
+so LLM work already paid for is not repeated.  A job that has already been
+started ``max_attempts`` times (e.g. because it crashes the process each
+time) is marked failed instead of being resumed again.
+
+Uploaded diagrams are dropped as soon as a job succeeds.  Finished jobs, with
+their remaining inputs and checkpoints, are purged ``ttl_seconds`` after
+their last update, on start-up and then every ``sweep_seconds``; SQLite
+reuses the freed pages, so the database stops growing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    phase TEXT NOT NULL DEFAULT '',
+    sections_done INTEGER NOT NULL DEFAULT 0,
+    sections_total INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_inputs (
+    job_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    file_name TEXT NOT NULL,
+    content BLOB NOT NULL,
+    PRIMARY KEY (job_id, role, position)
+);
+CREATE TABLE IF NOT EXISTS job_checkpoints (
+    job_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, name)
+);
+"""
+
+
+@dataclass
+class JobRecord:
+    """One row of the ``jobs`` table."""
+
+    id: str
+    kind: str
+    status: str
+    params: dict[str, Any]
+    phase: str = ""
+    sections_done: int = 0
+    sections_total: int = 0
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    attempts: int = 0
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    checkpoints: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "phase": self.phase,
+            "progress": {
+                "sections_done": self.sections_done,
+                "sections_total": self.sections_total,
+            },
+            "completed_phases": self.checkpoints,
+            "result": self.result,
+            "error": self.error,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class JobStore:
+    """SQLite-backed job records, inputs and phase checkpoints.
+
+    One connection per thread (sqlite3 connections are not shareable across
+    threads by default); WAL mode lets HTTP handlers poll while workers write.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ── jobs ─────────────────────────────────────────────────────────────
+
+    def create(
+        self,
+        kind: str,
+        params: dict[str, Any],
+        inputs: dict[str, list[tuple[str, bytes]]],
+    ) -> JobRecord:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, JOB_QUEUED, json.dumps(params), now, now),
+            )
+            conn.executemany(
+                "INSERT INTO job_inputs (job_id, role, position, file_name, content) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (job_id, role, position, file_name, content)
+                    for role, files in inputs.items()
+                    for position, (file_name, content) in enumerate(files)
+                ],
+            )
+        logger.info("job_store.created job_id=%s kind=%s", job_id, kind)
+        return self.get(job_id)  # type: ignore[return-value]
+
+    def get(self, job_id: str) -> JobRecord | None:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT id, kind, status, params, phase, sections_done, sections_total, result, error, "
+            "attempts, created_at, updated_at FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        checkpoints = [
+            name
+            for (name,) in conn.execute(
+                "SELECT name FROM job_checkpoints WHERE job_id = ? ORDER BY updated_at", (job_id,)
+            )
+        ]
+        return JobRecord(
+            id=row[0],
+            kind=row[1],
+            status=row[2],
+            params=json.loads(row[3]),
+            phase=row[4],
+            sections_done=row[5],
+            sections_total=row[6],
+            result=json.loads(row[7]) if row[7] else None,
+            error=row[8],
+            attempts=row[9],
+            created_at=row[10],
+            updated_at=row[11],
+            checkpoints=checkpoints,
+        )
+
+    def inputs(self, job_id: str) -> dict[str, list[tuple[str, bytes]]]:
+        result: dict[str, list[tuple[str, bytes]]] = {}
+        for role, file_name, content in self._conn().execute(
+            "SELECT role, file_name, content FROM job_inputs WHERE job_id = ? ORDER BY role, position",
+            (job_id,),
+        ):
+            result.setdefault(role, []).append((file_name, bytes(content)))
+        return result
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Set job columns; ``result`` is JSON-encoded."""
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"])
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._conn() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def mark_running(self, job_id: str) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, error = NULL, updated_at = ? WHERE id = ?",
+                (JOB_RUNNING, time.time(), job_id),
+            )
+
+    def drop_inputs(self, job_id: str) -> None:
+        """Delete a job's uploaded diagrams (once they can no longer be needed)."""
+        with self._conn() as conn:
+            conn.execute("DELETE FROM job_inputs WHERE job_id = ?", (job_id,))
+
+    def purge(self, ttl_seconds: float, now: float | None = None) -> int:
+        """Delete finished jobs last updated over *ttl_seconds* ago, with their inputs and checkpoints."""
+        cutoff = (time.time() if now is None else now) - ttl_seconds
+        with self._conn() as conn:
+            expired = [
+                (job_id,)
+                for (job_id,) in conn.execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                    (JOB_SUCCEEDED, JOB_FAILED, cutoff),
+                )
+            ]
+            conn.executemany("DELETE FROM job_inputs WHERE job_id = ?", expired)
+            conn.executemany("DELETE FROM job_checkpoints WHERE job_id = ?", expired)
+            conn.executemany("DELETE FROM jobs WHERE id = ?", expired)
+        if expired:
+            logger.info("job_store.purged count=%d", len(expired))
+        return len(expired)
+
+    def unfinished(self) -> list[str]:
+        """Ids of jobs that were queued or running, oldest first."""
+        return [
+            job_id
+            for (job_id,) in self._conn().execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JOB_QUEUED, JOB_RUNNING),
+            )
+        ]
+
+    def count_unfinished(self) -> int:
+        (count,) = self._conn().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (JOB_QUEUED, JOB_RUNNING)
+        ).fetchone()
+        return int(count)
+
+    # ── checkpoints ──────────────────────────────────────────────────────
+
+    def get_checkpoint(self, job_id: str, name: str) -> Any | None:
+        row = self._conn().execute(
+            "SELECT value FROM job_checkpoints WHERE job_id = ? AND name = ?", (job_id, name)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_checkpoint(self, job_id: str, name: str, value: Any) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_checkpoints (job_id, name, value, updated_at) VALUES (?, ?, ?, ?)",
+                (job_id, name, json.dumps(value), time.time()),
+            )
+
+
+class JobCheckpoint:
+    """Checkpoint view of one job, handed to the pipeline."""
+
+    def __init__(self, store: JobStore, job_id: str) -> None:
+        self.store = store
+        self.job_id = job_id
+
+    def get(self, name: str) -> Any | None:
+        return self.store.get_checkpoint(self.job_id, name)
+
+    async def aget(self, name: str) -> Any | None:
+        return self.get(name)
+
+    def put(self, name: str, value: Any) -> None:
+        self.store.put_checkpoint(self.job_id, name, value)
+
+
+JobExecutor = Callable[[JobRecord, JobStore], Awaitable[dict[str, Any]]]
+
+
+class JobQueueFull(Exception):
+    """Raised by :meth:`JobRunner.submit` when the backlog limit is reached."""
+
+
+class JobRunner:
+    """Bounded pool of worker coroutines on a dedicated event-loop thread."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        execute: JobExecutor,
+        workers: int = 2,
+        max_pending: int = 100,
+        max_attempts: int = 3,
+        ttl_seconds: float = 7 * 24 * 3600,
+        sweep_seconds: float = 3600,
+    ) -> None:
+        self.store = store
+        self.execute = execute
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.max_attempts = max(1, max_attempts)
+        self.ttl_seconds = ttl_seconds
+        self.sweep_seconds = max(1.0, sweep_seconds)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[str] | None = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the worker thread (idempotent), purge expired jobs and re-queue unfinished ones."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run_loop, name="sow-job-runner", daemon=True)
+            self._thread.start()
+        self._started.wait()
+        self._purge()
+        resumed = self.store.unfinished()
+        for job_id in resumed:
+            self._enqueue(job_id)
+        if resumed:
+            logger.info("job_runner.resumed count=%d", len(resumed))
+
+    def _run_loop(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        for index in range(self.workers):
+            loop.create_task(self._worker(index))
+        loop.create_task(self._sweeper())
+        self._started.set()
+        loop.run_forever()
+
+    def submit(
+        self,
+        kind: str,
+        params: dict[str, Any],
+        inputs: dict[str, list[tuple[str, bytes]]],
+    ) -> JobRecord:
+        self.start()
+        if self.store.count_unfinished() >= self.max_pending:
+            raise JobQueueFull(f"{self.max_pending} jobs already pending")
+        job = self.store.create(kind, params, inputs)
+        self._enqueue(job.id)
+        return job
+
+    def _enqueue(self, job_id: str) -> None:
+        assert self._loop is not None and self._queue is not None
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, job_id)
+
+    def _purge(self) -> None:
+        try:
+            self.store.purge(self.ttl_seconds)
+        except Exception:
+            logger.exception("job_runner.purge_failed")
+
+    async def _sweeper(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_seconds)
+            await asyncio.to_thread(self._purge)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        while True:
+            job_id = await self._queue.get()
+            job = self.store.get(job_id)
+            if job is None or job.status not in (JOB_QUEUED, JOB_RUNNING):
+                continue
+            if job.attempts >= self.max_attempts:
+                # Every earlier attempt was interrupted; running it again
+                # would crash-loop the process on each restart.
+                logger.warning("job_runner.gave_up job_id=%s attempts=%d", job_id, job.attempts)
+                self.store.update(
+                    job_id, status=JOB_FAILED, error=f"Interrupted {job.attempts} times; not retried"
+                )
+                continue
+            self.store.mark_running(job_id)
+            t0 = time.monotonic()
+            logger.info("job_runner.start job_id=%s worker=%d attempt=%d", job_id, index, job.attempts + 1)
+            try:
+                result = await self.execute(job, self.store)
+            except Exception as exc:
+                logger.exception("job_runner.failed job_id=%s", job_id)
+                self.store.update(job_id, status=JOB_FAILED, error=str(exc) or type(exc).__name__)
+                continue
+            self.store.update(job_id, status=JOB_SUCCEEDED, phase="done", result=result)
+            self.store.drop_inputs(job_id)
+            logger.info("job_runner.done job_id=%s elapsed=%.1fs", job_id, time.monotonic() - t0)
+
+
+def default_db_path(project_root: Path) -> Path:
+    return Path(os.getenv("JOBS_DB_PATH") or project_root / "jobs.sqlite3")
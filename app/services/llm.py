@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import random
+import threading
 import time
 from dataclasses import dataclass
-from typing import Any, Callable, TypeVar
+from typing import Any, Awaitable, Callable, TypeVar
 
 import oci
 from oci.generative_ai_inference import GenerativeAiInferenceClient
@@ -21,6 +23,10 @@ from oci.generative_ai_inference.models import (
 )
 
 from app.config.settings import OCISettings
+from app.services.async_transport import AsyncGenerativeAiInferenceClient
+from app.services.cache import TieredCache, cache_dir, digest
+from app.services.oci_clients import get_registry, track_call
+from app.services.rate_limiter import AdaptiveLimiter, get_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -35,20 +41,26 @@ def _call_with_retry(
     fn: Callable[..., _T],
     *args: Any,
     max_retries: int = _MAX_LLM_RETRIES,
+    limiter: AdaptiveLimiter | None = None,
     **kwargs: Any,
 ) -> _T:
     """Call *fn* with exponential backoff on transient OCI ServiceErrors.
 
     Retries up to *max_retries* times on HTTP 429/5xx responses.
     Other exceptions (parsing failures, 4xx client errors) propagate immediately.
+    When *limiter* is given each attempt holds one of its slots; the slot is
+    released during backoff so throttled callers do not block others.
     """
     for attempt in range(1, max_retries + 2):  # +2: initial attempt + max_retries
         try:
-            return fn(*args, **kwargs)
+            if limiter is None:
+                return fn(*args, **kwargs)
+            with limiter.blocking_slot():
+                return fn(*args, **kwargs)
         except oci.exceptions.ServiceError as exc:
             if exc.status not in _RETRYABLE_HTTP_STATUSES or attempt > max_retries:
                 raise
-            wait = min(1.0 * (2 ** (attempt - 1)) + random.uniform(0, 1.0), 30.0)
+            wait = _retry_wait(attempt)
             logger.warning(
                 "OCI transient error status=%s attempt=%d/%d retrying in %.1fs: %s",
                 exc.status,
@@ -62,6 +74,40 @@ def _call_with_retry(
     raise RuntimeError("_call_with_retry exhausted without result")  # pragma: no cover
 
 
+def _retry_wait(attempt: int) -> float:
+    return min(1.0 * (2 ** (attempt - 1)) + random.uniform(0, 1.0), 30.0)
+
+
+async def _acall_with_retry(
+    fn: Callable[..., Awaitable[_T]],
+    *args: Any,
+    max_retries: int = _MAX_LLM_RETRIES,
+    limiter: AdaptiveLimiter | None = None,
+    **kwargs: Any,
+) -> _T:
+    """Async variant of :func:`_call_with_retry` — backs off with ``asyncio.sleep``."""
+    for attempt in range(1, max_retries + 2):
+        try:
+            if limiter is None:
+                return await fn(*args, **kwargs)
+            async with limiter.slot():
+                return await fn(*args, **kwargs)
+        except oci.exceptions.ServiceError as exc:
+            if exc.status not in _RETRYABLE_HTTP_STATUSES or attempt > max_retries:
+                raise
+            wait = _retry_wait(attempt)
+            logger.warning(
+                "OCI transient error status=%s attempt=%d/%d retrying in %.1fs: %s",
+                exc.status,
+                attempt,
+                max_retries,
+                wait,
+                exc.message,
+            )
+            await asyncio.sleep(wait)
+    raise RuntimeError("_acall_with_retry exhausted without result")  # pragma: no cover
+
+
 @dataclass(frozen=True)
 class LLMConfig:
     """Configuration values for OCI Generative AI client."""
@@ -94,13 +140,19 @@ class LLMConfig:
 
 
 def _build_client(config: LLMConfig) -> GenerativeAiInferenceClient:
-    """Instantiate OCI Generative AI client."""
-    oci_config = oci.config.from_file(file_location=config.config_file, profile_name=config.profile)
-    return GenerativeAiInferenceClient(
-        config=oci_config,
-        service_endpoint=config.endpoint,
-        timeout=(config.timeout_connect, config.timeout_read),
-        retry_strategy=oci.retry.NoneRetryStrategy(),
+    """Return the pooled OCI Generative AI client for this config.
+
+    The client (and its HTTP connection pool) is shared process-wide and only
+    rebuilt when the profile/endpoint/timeouts differ or the OCI config or key
+    file changes on disk.
+    """
+    return get_registry().get(
+        GenerativeAiInferenceClient,
+        config_file=config.config_file,
+        profile=config.profile,
+        endpoint=config.endpoint,
+        timeout_connect=config.timeout_connect,
+        timeout_read=config.timeout_read,
     )
 
 
@@ -122,16 +174,12 @@ def _extract_text(response: object) -> str:
         raise RuntimeError("Unable to parse LLM response") from exc
 
 
-def call_llm(system_prompt: str, user_prompt: str) -> str:
-    """Send a prompt to OCI Generative AI and return plain text response."""
-    mock_response = os.getenv("MOCK_LLM_RESPONSE")
-    if mock_response is not None:
-        logger.info("Using MOCK_LLM_RESPONSE for local testing")
-        return mock_response
+def _build_async_client(config: LLMConfig) -> AsyncGenerativeAiInferenceClient:
+    """Return an async inference client that signs with the pooled SDK client."""
+    return AsyncGenerativeAiInferenceClient(_build_client(config))
 
-    config = LLMConfig.from_env()
-    client = _build_client(config)
 
+def _build_chat_details(config: LLMConfig, system_prompt: str, user_prompt: str) -> ChatDetails:
     combined_prompt = f"System:\n{system_prompt.strip()}\n\nUser:\n{user_prompt.strip()}"
     message = Message(role="USER", content=[TextContent(text=combined_prompt)])
     chat_request = GenericChatRequest(
@@ -143,19 +191,145 @@ def call_llm(system_prompt: str, user_prompt: str) -> str:
         top_k=1,
         max_tokens=config.max_tokens,
     )
-    details = ChatDetails(
+    return ChatDetails(
         compartment_id=config.compartment_id,
         serving_mode=OnDemandServingMode(model_id=config.model_id),
         chat_request=chat_request,
     )
 
+
+# Content-addressed cache of model responses, shared process-wide.  Keyed on
+# everything that determines the output, so a byte-identical prompt replays
+# the stored text without an OCI call.  LLM_CACHE_ENABLED=false disables it.
+_response_cache_instance: TieredCache | None = None
+_response_cache_lock = threading.Lock()
+
+
+def _response_cache() -> TieredCache | None:
+    global _response_cache_instance
+    if os.getenv("LLM_CACHE_ENABLED", "true").casefold() == "false":
+        return None
+    with _response_cache_lock:
+        if _response_cache_instance is None:
+            disk = os.getenv("LLM_CACHE_DISK", "true").casefold() != "false"
+            _response_cache_instance = TieredCache(
+                "llm_responses",
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512")),
+                ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+                db_path=cache_dir() / "llm_responses.sqlite3" if disk else None,
+                max_disk_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+            )
+        return _response_cache_instance
+
+
+def _response_cache_key(config: LLMConfig, system_prompt: str, user_prompt: str) -> str:
+    return digest(config.model_id, config.temperature, config.max_tokens, system_prompt, user_prompt)
+
+
+def llm_cache_stats() -> dict[str, Any] | None:
+    """Hit/miss counters of the response cache (``None`` when disabled)."""
+    cache = _response_cache()
+    return cache.stats() if cache is not None else None
+
+
+def _cached_response(config: LLMConfig, system_prompt: str, user_prompt: str) -> tuple[str | None, str | None]:
+    """Return ``(cache_key, cached_text)``; both ``None`` when caching is off."""
+    cache = _response_cache()
+    if cache is None:
+        return None, None
+    key = _response_cache_key(config, system_prompt, user_prompt)
+    text = cache.get(key)
+    if text is not None:
+        logger.info("llm_cache.hit key=%s", key[:12])
+    return key, text
+
+
+def _store_response(key: str | None, text: str) -> None:
+    cache = _response_cache()
+    if key is not None and cache is not None:
+        cache.put(key, text)
+
+
+async def _acached_response(
+    config: LLMConfig, system_prompt: str, user_prompt: str
+) -> tuple[str | None, str | None]:
+    """Async :func:`_cached_response`; the disk tier is read off the event loop."""
+    cache = _response_cache()
+    if cache is None:
+        return None, None
+    key = _response_cache_key(config, system_prompt, user_prompt)
+    text = await cache.aget(key)
+    if text is not None:
+        logger.info("llm_cache.hit key=%s", key[:12])
+    return key, text
+
+
+async def _astore_response(key: str | None, text: str) -> None:
+    cache = _response_cache()
+    if key is not None and cache is not None:
+        await cache.aput(key, text)
+
+
+def call_llm(system_prompt: str, user_prompt: str, use_cache: bool = False) -> str:
+    """Send a prompt to OCI Generative AI and return plain text response.
+
+    With ``use_cache`` a response previously returned for the same model,
+    sampling settings and prompts is replayed without calling OCI.
+    """
+    mock_response = os.getenv("MOCK_LLM_RESPONSE")
+    if mock_response is not None:
+        logger.info("Using MOCK_LLM_RESPONSE for local testing")
+        return mock_response
+
+    config = LLMConfig.from_env()
+    cache_key: str | None = None
+    if use_cache:
+        cache_key, cached = _cached_response(config, system_prompt, user_prompt)
+        if cached is not None:
+            return cached
+    client = _build_client(config)
+    details = _build_chat_details(config, system_prompt, user_prompt)
+
     try:
         logger.info("Calling OCI Generative AI model")
-        response = _call_with_retry(client.chat, details)
-        return _extract_text(response)
+        with track_call(client, "inference.chat"):
+            response = _call_with_retry(client.chat, details, limiter=get_limiter("inference"))
+        text = _extract_text(response)
+    except oci.exceptions.ServiceError as exc:
+        logger.exception("OCI service error status=%s", exc.status)
+        raise RuntimeError(f"OCI service error: {exc.message}") from exc
+    except Exception as exc:
+        logger.exception("Unexpected OCI LLM error")
+        raise RuntimeError("Unexpected LLM invocation failure") from exc
+    _store_response(cache_key, text)
+    return text
+
+
+async def acall_llm(system_prompt: str, user_prompt: str, use_cache: bool = False) -> str:
+    """Async :func:`call_llm` — awaits the HTTP call instead of blocking a thread."""
+    mock_response = os.getenv("MOCK_LLM_RESPONSE")
+    if mock_response is not None:
+        logger.info("Using MOCK_LLM_RESPONSE for local testing")
+        return mock_response
+
+    config = LLMConfig.from_env()
+    cache_key: str | None = None
+    if use_cache:
+        cache_key, cached = await _acached_response(config, system_prompt, user_prompt)
+        if cached is not None:
+            return cached
+    client = _build_async_client(config)
+    details = _build_chat_details(config, system_prompt, user_prompt)
+
+    try:
+        logger.info("Calling OCI Generative AI model (async)")
+        response = await _acall_with_retry(client.chat, details, limiter=get_limiter("inference"))
+        text = _extract_text(response)
     except oci.exceptions.ServiceError as exc:
         logger.exception("OCI service error status=%s", exc.status)
         raise RuntimeError(f"OCI service error: {exc.message}") from exc
     except Exception as exc:
         logger.exception("Unexpected OCI LLM error")
         raise RuntimeError("Unexpected LLM invocation failure") from exc
+    await _astore_response(cache_key, text)
+    return text
@@ -0,0 +1,262 @@
+"""Process-wide registry of pooled OCI SDK clients.
+
+Building an OCI client is expensive: ``oci.config.from_file`` re-parses the
+config file and loads the private key, and every new client opens a fresh
+HTTP session so the first request pays a full TCP + TLS handshake.  The
+registry builds each client once per (client type, profile, endpoint,
+timeouts) and hands the same instance to every caller.  The underlying
+vendored ``requests`` session is thread-safe for concurrent requests, so
+section writers running in parallel share one bounded connection pool.
+
+Entries are rebuilt automatically when the OCI config file or the API key it
+points to changes on disk (mtime/size fingerprint), so rotated credentials
+are picked up without a restart.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+import oci
+from oci._vendor.requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Max sockets kept open per OCI host.  pool_block=True makes callers wait
+# for a free connection instead of opening (and discarding) extra sockets.
+_POOL_MAXSIZE = int(os.getenv("OCI_POOL_MAXSIZE", "16"))
+
+
+@dataclass(frozen=True)
+class ClientKey:
+    """Identity of a pooled client — one entry per distinct combination."""
+
+    client_type: str
+    config_file: str
+    profile: str
+    endpoint: str
+    timeout_connect: float
+    timeout_read: float
+
+
+@dataclass
+class _Entry:
+    client: Any
+    watched_paths: tuple[str, ...]
+    fingerprint: tuple[tuple[int, int], ...]
+    created_at: float
+    hits: int = 0
+
+
+@dataclass
+class CallStats:
+    """Per-call transport metrics reported by :func:`track_call`."""
+
+    operation: str
+    latency_ms: float = 0.0
+    new_connections: int = 0
+
+
+def _stat_fingerprint(paths: tuple[str, ...]) -> tuple[tuple[int, int], ...]:
+    """Return (mtime_ns, size) for every watched path; (0, 0) when missing."""
+    result: list[tuple[int, int]] = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            result.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            result.append((0, 0))
+    return tuple(result)
+
+
+def _connections_opened(client: Any) -> int:
+    """Sum of sockets ever opened by *client*'s HTTP session (0 for fakes)."""
+    session = getattr(getattr(client, "base_client", None), "session", None)
+    if session is None:
+        return 0
+    total = 0
+    for adapter in getattr(session, "adapters", {}).values():
+        pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+        if pools is None:
+            continue
+        for pool_key in list(pools.keys()):
+            try:
+                total += int(getattr(pools[pool_key], "num_connections", 0))
+            except KeyError:
+                continue  # evicted concurrently
+    return total
+
+
+class OCIClientRegistry:
+    """Thread-safe cache of long-lived OCI clients keyed by :class:`ClientKey`."""
+
+    def __init__(self, pool_maxsize: int = _POOL_MAXSIZE) -> None:
+        self.pool_maxsize = max(1, pool_maxsize)
+        self._lock = threading.Lock()
+        self._entries: dict[ClientKey, _Entry] = {}
+        self._builds = 0
+        self._invalidations = 0
+
+    def get(
+        self,
+        client_cls: type,
+        *,
+        config_file: str,
+        profile: str,
+        endpoint: str,
+        timeout_connect: float,
+        timeout_read: float,
+        allow_instance_principal: bool = False,
+    ) -> Any:
+        """Return the pooled client for this key, building it on first use.
+
+        When ``allow_instance_principal`` is set and the config file cannot be
+        read, the client is built with an instance-principal signer instead
+        (the signer refreshes its own security token).
+        """
+        key = ClientKey(
+            client_type=f"{client_cls.__module__}.{client_cls.__qualname__}",
+            config_file=config_file,
+            profile=profile,
+            endpoint=endpoint,
+            timeout_connect=float(timeout_connect),
+            timeout_read=float(timeout_read),
+        )
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if _stat_fingerprint(entry.watched_paths) == entry.fingerprint:
+                    entry.hits += 1
+                    return entry.client
+                logger.info(
+                    "oci_clients.invalidated reason=config_changed client=%s profile=%s",
+                    key.client_type.rsplit(".", 1)[-1],
+                    profile,
+                )
+                self._invalidations += 1
+                self._close(entry)
+                del self._entries[key]
+
+            entry = self._build(client_cls, key, allow_instance_principal)
+            self._entries[key] = entry
+            return entry.client
+
+    def _build(self, client_cls: type, key: ClientKey, allow_instance_principal: bool) -> _Entry:
+        watched: tuple[str, ...] = ()
+        kwargs: dict[str, Any] = {
+            "service_endpoint": key.endpoint,
+            "timeout": (key.timeout_connect, key.timeout_read),
+            "retry_strategy": oci.retry.NoneRetryStrategy(),
+        }
+        try:
+            oci_config = oci.config.from_file(file_location=key.config_file, profile_name=key.profile)
+            key_file = oci_config.get("key_file")
+            watched = (os.path.expanduser(key.config_file),)
+            if key_file:
+                watched += (os.path.expanduser(str(key_file)),)
+            client = client_cls(config=oci_config, **kwargs)
+        except Exception:
+            if not allow_instance_principal:
+                raise
+            logger.info("oci_clients.using_instance_principal client=%s", key.client_type.rsplit(".", 1)[-1])
+            signer = oci.auth.signers.InstancePrincipalsSecurityTokenSigner()
+            client = client_cls(config={}, signer=signer, **kwargs)
+
+        # Replace the default unbounded-growth adapter with a bounded pool.
+        session = client.base_client.session
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=True,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        self._builds += 1
+        logger.info(
+            "oci_clients.built client=%s endpoint=%s pool_maxsize=%d",
+            key.client_type.rsplit(".", 1)[-1],
+            key.endpoint,
+            self.pool_maxsize,
+        )
+        return _Entry(
+            client=client,
+            watched_paths=watched,
+            fingerprint=_stat_fingerprint(watched),
+            created_at=time.time(),
+        )
+
+    @staticmethod
+    def _close(entry: _Entry) -> None:
+        try:
+            entry.client.base_client.session.close()
+        except Exception:
+            logger.debug("oci_clients.close_failed", exc_info=True)
+
+    def invalidate(self) -> None:
+        """Drop every pooled client; the next ``get`` rebuilds from config."""
+        with self._lock:
+            for entry in self._entries.values():
+                self._close(entry)
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+        logger.info("oci_clients.invalidated reason=manual")
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of registry state for diagnostics."""
+        with self._lock:
+            clients = [
+                {
+                    "client": key.client_type.rsplit(".", 1)[-1],
+                    "profile": key.profile,
+                    "endpoint": key.endpoint,
+                    "hits": entry.hits,
+                    "connections_opened": _connections_opened(entry.client),
+                    "age_s": round(time.time() - entry.created_at, 1),
+                }
+                for key, entry in self._entries.items()
+            ]
+            return {
+                "pool_maxsize": self.pool_maxsize,
+                "builds": self._builds,
+                "invalidations": self._invalidations,
+                "clients": clients,
+            }
+
+
+_registry = OCIClientRegistry()
+
+
+def get_registry() -> OCIClientRegistry:
+    """Return the process-wide client registry."""
+    return _registry
+
+
+@contextmanager
+def track_call(client: Any, operation: str) -> Iterator[CallStats]:
+    """Measure latency and newly opened sockets around one OCI call.
+
+    ``new_connections`` is derived from the shared pool counters, so under
+    heavy concurrency it may include sockets opened by a parallel call on the
+    same client.  A steady stream of zeros means connections are being reused.
+    """
+    stats = CallStats(operation=operation)
+    before = _connections_opened(client)
+    t0 = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.latency_ms = (time.perf_counter() - t0) * 1000
+        stats.new_connections = max(0, _connections_opened(client) - before)
+        logger.info(
+            "oci_clients.call operation=%s latency_ms=%.0f new_connections=%d",
+            operation,
+            stats.latency_ms,
+            stats.new_connections,
+        )
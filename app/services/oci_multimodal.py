@@ -18,7 +18,10 @@ from oci.generative_ai_inference.models import (
 )
 
 from app.config.settings import OCISettings
-from app.services.llm import _call_with_retry, _extract_text
+from app.services.async_transport import AsyncGenerativeAiInferenceClient
+from app.services.llm import _acall_with_retry, _call_with_retry, _extract_text
+from app.services.oci_clients import get_registry, track_call
+from app.services.rate_limiter import get_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -31,15 +34,16 @@ class OCIClient:
         self._client = self._build_client()
 
     def _build_client(self) -> GenerativeAiInferenceClient:
-        oci_config = oci.config.from_file(file_location=self.settings.config_file, profile_name=self.settings.profile)
-        return GenerativeAiInferenceClient(
-            config=oci_config,
-            service_endpoint=self.settings.endpoint,
-            timeout=(self.settings.timeout_connect, self.settings.timeout_read),
-            retry_strategy=oci.retry.NoneRetryStrategy(),
+        return get_registry().get(
+            GenerativeAiInferenceClient,
+            config_file=self.settings.config_file,
+            profile=self.settings.profile,
+            endpoint=self.settings.endpoint,
+            timeout_connect=self.settings.timeout_connect,
+            timeout_read=self.settings.timeout_read,
         )
 
-    def multimodal_completion(self, prompt: str, image_base64: str, mime_type: str, **kwargs: object) -> str:
+    def _build_details(self, prompt: str, image_base64: str, mime_type: str, **kwargs: object) -> ChatDetails:
         model_name = str(kwargs.get("model_name") or self.settings.multimodal_model_name)
         max_tokens = max(3000, int(kwargs.get("max_tokens") or 4000))
         temperature = float(kwargs.get("temperature") if kwargs.get("temperature") is not None else 0)
@@ -59,14 +63,33 @@ class OCIClient:
             top_k=1,
             max_tokens=max_tokens,
         )
-        details = ChatDetails(
+        return ChatDetails(
             compartment_id=self.settings.compartment_id,
             serving_mode=OnDemandServingMode(model_id=model_name),
             chat_request=request,
         )
 
+    def multimodal_completion(self, prompt: str, image_base64: str, mime_type: str, **kwargs: object) -> str:
+        details = self._build_details(prompt, image_base64, mime_type, **kwargs)
+
+        try:
+            with track_call(self._client, "multimodal.chat"):
+                response = _call_with_retry(self._client.chat, details, limiter=get_limiter("multimodal"))
+            return _extract_text(response)
+        except oci.exceptions.ServiceError as exc:
+            logger.exception("oci_multimodal.service_error status=%s", exc.status)
+            raise RuntimeError(f"OCI multimodal service error: {exc.message}") from exc
+        except Exception as exc:
+            logger.exception("oci_multimodal.unexpected_error")
+            raise RuntimeError("Unexpected OCI multimodal invocation failure") from exc
+
+    async def amultimodal_completion(self, prompt: str, image_base64: str, mime_type: str, **kwargs: object) -> str:
+        """Async :meth:`multimodal_completion` over the shared async transport."""
+        details = self._build_details(prompt, image_base64, mime_type, **kwargs)
+        async_client = AsyncGenerativeAiInferenceClient(self._client)
+
         try:
-            response = _call_with_retry(self._client.chat, details)
+            response = await _acall_with_retry(async_client.chat, details, limiter=get_limiter("multimodal"))
             return _extract_text(response)
         except oci.exceptions.ServiceError as exc:
             logger.exception("oci_multimodal.service_error status=%s", exc.status)
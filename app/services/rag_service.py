@@ -1,20 +1,37 @@
-"""Section-aware retrieval service for SoW generation."""
+"""Section-aware retrieval service for SoW generation.
+
+Retrievals are cached process-wide (and optionally on disk) so repeated SoW
+runs for the same client/industry/services do not re-query the knowledge base.
+Cache keys include a knowledge-base version: when a sync changes the KB's
+``time_updated`` (or ``RAG_KB_VERSION`` is bumped) older entries stop matching
+and age out of the LRU.  ``time_updated`` is re-read at most once per
+``RAG_KB_VERSION_POLL_SECONDS`` from the retrieval path; until it is known,
+retrievals are cached in memory only.
+"""
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
+import os
 import re
+import threading
 import time
+import weakref
 from dataclasses import dataclass
+from functools import partial
 from typing import Any
 
-import oci
 from oci import retry
 from oci.generative_ai_agent import GenerativeAiAgentClient
 from oci.generative_ai_agent_runtime import GenerativeAiAgentRuntimeClient
 
 from app.config.settings import OCISettings
+from app.services.async_transport import AsyncGenerativeAiAgentRuntimeClient
+from app.services.cache import TieredCache, cache_dir, digest
+from app.services.oci_clients import get_registry, track_call
+from app.services.rate_limiter import get_limiter
+from app.services.session_pool import get_session_pool
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +47,86 @@ class SectionChunk:
     services: tuple[str, ...] = ()
 
 
+# Shared retrieval cache.  RAG_CACHE_ENABLED=false disables it.
+_retrieval_cache_instance: TieredCache | None = None
+_retrieval_cache_lock = threading.Lock()
+# Per-section hit/miss counters: section -> [hits, misses].
+_section_stats: dict[str, list[int]] = {}
+# Last observed version (``time_updated``) of each knowledge base, and when
+# (monotonic) it was last polled.  One poll at a time; callers arriving while
+# it runs wait for it and then see it as fresh.
+_kb_versions: dict[str, str] = {}
+_kb_checked_at: dict[str, float] = {}
+_kb_poll_lock = threading.Lock()
+
+# In-flight Agent Runtime searches, keyed by (endpoint, query, top_k).
+# Concurrent callers await the same task instead of issuing a duplicate call
+# (single-flight).  Tasks are bound to their event loop, so keep one table
+# per loop; weak keys let closed loops be collected.
+_inflight_searches: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[str, str, int], asyncio.Task[Any]]]" = (
+    weakref.WeakKeyDictionary()
+)
+_shared_searches = 0
+
+
+def _retrieval_cache() -> TieredCache | None:
+    global _retrieval_cache_instance
+    if os.getenv("RAG_CACHE_ENABLED", "true").casefold() == "false":
+        return None
+    with _retrieval_cache_lock:
+        if _retrieval_cache_instance is None:
+            disk = os.getenv("RAG_CACHE_DISK", "true").casefold() != "false"
+            _retrieval_cache_instance = TieredCache(
+                "rag_retrievals",
+                max_entries=int(os.getenv("RAG_CACHE_MAX_ENTRIES", "1024")),
+                ttl_seconds=float(os.getenv("RAG_CACHE_TTL_SECONDS", str(24 * 3600))),
+                db_path=cache_dir() / "rag_retrievals.sqlite3" if disk else None,
+                max_disk_bytes=int(os.getenv("RAG_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            )
+        return _retrieval_cache_instance
+
+
+def _record_section_lookup(section: str, hit: bool) -> None:
+    with _retrieval_cache_lock:
+        counters = _section_stats.setdefault(section.upper().strip(), [0, 0])
+        counters[0 if hit else 1] += 1
+
+
+def rag_cache_stats() -> dict[str, Any] | None:
+    """Retrieval cache counters with per-section hit rates (``None`` when disabled)."""
+    cache = _retrieval_cache()
+    if cache is None:
+        return None
+    with _retrieval_cache_lock:
+        sections = {
+            section: {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            }
+            for section, (hits, misses) in sorted(_section_stats.items())
+        }
+        kb_versions = dict(_kb_versions)
+        shared_searches = _shared_searches
+    return {
+        **cache.stats(),
+        "shared_searches": shared_searches,
+        "kb_versions": kb_versions,
+        "sections": sections,
+    }
+
+
+def _finish_search(
+    inflight: dict[tuple[str, str, int], asyncio.Task[Any]],
+    key: tuple[str, str, int],
+    task: asyncio.Task[Any],
+) -> None:
+    if inflight.get(key) is task:
+        del inflight[key]
+    if not task.cancelled():
+        task.exception()  # mark retrieved; every awaiting caller re-raises it
+
+
 class SectionAwareRAGService:
     """RAG service that retrieves context using OCI Knowledge Base search."""
 
@@ -88,12 +185,19 @@ class SectionAwareRAGService:
         top_k: int = 5,
         service_endpoint: str | None = None,
         runtime_client: Any | None = None,
+        async_runtime_client: Any | None = None,
+        agent_client: Any | None = None,
     ) -> None:
         self._oci_config = oci_config or {}
         self.agent_endpoint_id = agent_endpoint_id
         self.knowledge_base_id = knowledge_base_id
         self.top_k = top_k
-        self._cache: dict[str, list[SectionChunk]] = {}
+        # Optional async counterpart of runtime_client.  Without it, async
+        # retrieval falls back to running the blocking SDK call in a thread.
+        self.async_runtime_client = async_runtime_client
+        # Control-plane client for knowledge-base lookups; built on first use
+        # from ``oci_config`` when not supplied.
+        self._agent_client = agent_client
 
         if runtime_client is not None:
             self.runtime_client = runtime_client
@@ -116,46 +220,134 @@ class SectionAwareRAGService:
 
     @classmethod
     def from_env(cls) -> "SectionAwareRAGService":
-        """Initialize from OCI settings and env-backed credentials."""
-        settings = OCISettings.from_env()
+        """Initialize from OCI settings, reusing the process-wide runtime client.
 
-        try:
-            oci_config = oci.config.from_file(
-                file_location=settings.config_file,
-                profile_name=settings.profile,
-            )
-        except Exception:
-            logger.info("rag.using_instance_principal")
-            signer = oci.auth.signers.InstancePrincipalsSecurityTokenSigner()
-            oci_config = {"signer": signer}
-
-        oci_config["timeout_connect"] = settings.timeout_connect
-        oci_config["timeout_read"] = settings.timeout_read
+        The Agent Runtime client comes from the shared registry so its HTTP
+        connections survive across requests; it falls back to an
+        instance-principal signer when no OCI config file is available.
+        """
+        settings = OCISettings.from_env()
+        runtime_client = get_registry().get(
+            GenerativeAiAgentRuntimeClient,
+            config_file=settings.config_file,
+            profile=settings.profile,
+            endpoint=settings.agent_endpoint,
+            timeout_connect=settings.timeout_connect,
+            timeout_read=settings.timeout_read,
+            allow_instance_principal=True,
+        )
+        agent_client = get_registry().get(
+            GenerativeAiAgentClient,
+            config_file=settings.config_file,
+            profile=settings.profile,
+            # Same region as the runtime endpoint, on the control-plane host.
+            endpoint=settings.agent_endpoint.replace("//agent-runtime.", "//agent.", 1),
+            timeout_connect=settings.timeout_connect,
+            timeout_read=settings.timeout_read,
+            allow_instance_principal=True,
+        )
 
         return cls(
-            oci_config=oci_config,
+            oci_config=dict(runtime_client.base_client.config),
             agent_endpoint_id=settings.agent_endpoint_id,
             knowledge_base_id=settings.knowledge_base_id,
             top_k=settings.rag_top_k,
             service_endpoint=settings.agent_endpoint,
+            runtime_client=runtime_client,
+            async_runtime_client=AsyncGenerativeAiAgentRuntimeClient(runtime_client),
+            agent_client=agent_client,
         )
 
-    def retrieve_section_context(self, section: str, project_data: dict[str, Any]) -> list[SectionChunk]:
-        """Retrieve top-k section-matched chunks with diagnostics and semantic fallback."""
-        cache_key = self._cache_key(section, project_data)
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+    def retrieve_section_context(
+        self,
+        section: str,
+        project_data: dict[str, Any],
+        use_cache: bool = True,
+    ) -> list[SectionChunk]:
+        """Blocking wrapper around :meth:`aretrieve_section_context` for scripts and tests."""
+        return asyncio.run(
+            self.aretrieve_section_context(section=section, project_data=project_data, use_cache=use_cache)
+        )
 
-        results = self._retrieve_by_section(section=section, project_data=project_data)
+    async def aretrieve_section_context(
+        self,
+        section: str,
+        project_data: dict[str, Any],
+        use_cache: bool = True,
+    ) -> list[SectionChunk]:
+        """Retrieve top-k section-matched chunks with diagnostics and semantic fallback.
+
+        With ``use_cache`` a retrieval previously made for the same semantic
+        query against the same knowledge-base version is returned without an
+        OCI call.  Fresh results are stored either way.
+        """
+        await self._arefresh_kb_version()
+        cache_key = self._cache_key(section, project_data)
+        if use_cache:
+            cached = await self._cached_chunks(cache_key)
+            _record_section_lookup(section, hit=cached is not None)
+            if cached is not None:
+                logger.info("rag_cache.hit section=%s key=%s", section, cache_key[:12])
+                return cached
+
+        results = await self._retrieve_by_section(section=section, project_data=project_data, use_cache=use_cache)
         # Only cache non-empty results.  An empty result means no matching chunks
-        # were found yet; skipping the cache allows a Phase-2 retry in the
-        # orchestrator (after all primary fetches complete) to benefit from warm
-        # fallback-target caches without finding a stale [] entry here.
+        # were found yet; caching [] would pin that miss across requests until
+        # the entry expires, even after the KB gains matching documents.
         if results:
-            self._cache[cache_key] = results
+            await self._store_chunks(cache_key, results)
         return results
 
-    def _retrieve_by_section(self, section: str, project_data: dict[str, Any]) -> list[SectionChunk]:
+    async def _cached_chunks(self, cache_key: str) -> list[SectionChunk] | None:
+        cache = _retrieval_cache()
+        if cache is None:
+            return None
+        payload = await cache.aget(cache_key, disk=self._disk_cacheable())
+        if payload is None:
+            return None
+        return [
+            SectionChunk(
+                section=item["section"],
+                text=item["text"],
+                client=item.get("client", ""),
+                industry=item.get("industry", ""),
+                services=tuple(item.get("services") or ()),
+            )
+            for item in payload
+        ]
+
+    async def _store_chunks(self, cache_key: str, chunks: list[SectionChunk]) -> None:
+        cache = _retrieval_cache()
+        if cache is not None:
+            await cache.aput(
+                cache_key,
+                [
+                    {
+                        "section": chunk.section,
+                        "text": chunk.text,
+                        "client": chunk.client,
+                        "industry": chunk.industry,
+                        "services": list(chunk.services),
+                    }
+                    for chunk in chunks
+                ],
+                disk=self._disk_cacheable(),
+            )
+
+    def _disk_cacheable(self) -> bool:
+        """Only persist retrievals tagged with a known KB version.
+
+        Under an unknown version a KB sync could not be detected, so such
+        entries would outlive it on disk for the whole TTL.
+        """
+        return bool(self._kb_version())
+
+    async def _retrieve_by_section(
+        self,
+        section: str,
+        project_data: dict[str, Any],
+        use_cache: bool = True,
+    ) -> list[SectionChunk]:
         """Retrieve chunks by calling OCI Agent Chat API."""
         logger.info("rag.retrieve_start section=%s", section)
 
@@ -163,7 +355,7 @@ class SectionAwareRAGService:
             query = self._build_semantic_query(section, project_data)
             logger.info("rag.query section=%s query=%s", section, query[:100])
 
-            response = self._search_via_chat(query=query, top_k=self.top_k * 2)
+            response = await self._asearch_shared(query=query, top_k=self.top_k * 2)
             documents = self._extract_documents(response)
 
             if not documents:
@@ -219,26 +411,30 @@ class SectionAwareRAGService:
                                 )
                             return chunks[: self.top_k]
                     # No fallback hit in the current result set.
-                    # First check the in-memory cache — the parallel RAG fan-out may have
-                    # already fetched a fallback section as a direct query and cached it.
-                    # Bypassing the cache here caused expensive serial fresh-query latency.
-                    for fallback in fallback_sections:
-                        fb_cache_key = self._cache_key(fallback, project_data)
-                        if fb_cache_key in self._cache and self._cache[fb_cache_key]:
+                    # First check the retrieval cache — the parallel RAG fan-out (or an
+                    # earlier request) may already have fetched a fallback section as a
+                    # direct query.  Bypassing the cache here caused expensive serial
+                    # fresh-query latency.
+                    for fallback in fallback_sections if use_cache else ():
+                        fb_cached = await self._cached_chunks(self._cache_key(fallback, project_data))
+                        if fb_cached:
                             logger.info(
                                 "rag.fallback_cache_shortcut section=%s fallback=%s count=%d",
                                 section,
                                 fallback,
-                                len(self._cache[fb_cache_key]),
+                                len(fb_cached),
                             )
-                            return self._cache[fb_cache_key][: self.top_k]
+                            return fb_cached[: self.top_k]
 
-                    # Cache missed for all fallbacks — do a fresh targeted OCI KB query.
+                    # Cache missed for all fallbacks — query the fallback's own semantic
+                    # query.  It is the same (query, top_k) the fallback section's primary
+                    # lookup sends, so when that lookup is still in flight (the parallel
+                    # fan-out) this joins it instead of issuing a duplicate call.
                     for fallback in fallback_sections:
                         try:
-                            fallback_response = self._search_via_chat(
+                            fallback_response = await self._asearch_shared(
                                 query=self._build_semantic_query(fallback, project_data),
-                                top_k=self.top_k,
+                                top_k=self.top_k * 2,
                             )
                             fallback_docs = self._extract_documents(fallback_response)
                             fb_filtered = [
@@ -300,10 +496,10 @@ class SectionAwareRAGService:
             return []
 
     def count(self) -> int:
-        """Get document count from OCI Knowledge Base."""
+        """Get document count from OCI Knowledge Base (and note its current version)."""
         try:
-            agent_client = GenerativeAiAgentClient(config=self._oci_config)
-            kb_response = agent_client.get_knowledge_base(self.knowledge_base_id)
+            kb_response = self._kb_client().get_knowledge_base(self.knowledge_base_id)
+            self._record_kb_version(getattr(kb_response.data, "time_updated", None))
             document_count = getattr(kb_response.data, "document_count", None)
             if isinstance(document_count, int):
                 return document_count
@@ -334,38 +530,211 @@ class SectionAwareRAGService:
             return False
 
     def clear_cache(self) -> None:
-        """Clear in-memory retrieval cache without querying the KB."""
-        self._cache.clear()
+        """Drop every cached retrieval (all knowledge bases) without querying the KB."""
+        cache = _retrieval_cache()
+        if cache is not None:
+            cache.clear()
         logger.info("rag.cache_cleared")
 
     def refresh_from_env(self) -> int:
-        """OCI KB auto-syncs from Object Storage; just return current count."""
+        """OCI KB auto-syncs from Object Storage; return current count.
+
+        The KB lookup refreshes its recorded version, so retrievals cached
+        before a sync are no longer served.
+        """
         logger.info("rag.refresh_from_env - OCI KB auto-syncs")
-        self._cache.clear()
         return self.count()
 
-    def _search_via_chat(self, query: str, top_k: int) -> Any:
-        """Fresh session per query — prevents context poisoning across searches."""
-        from oci.generative_ai_agent_runtime.models import CreateSessionDetails, ChatDetails
+    def _kb_client(self) -> Any:
+        if self._agent_client is None:
+            self._agent_client = GenerativeAiAgentClient(config=self._oci_config)
+        return self._agent_client
+
+    async def _arefresh_kb_version(self) -> None:
+        """Re-read the KB version when the last poll is older than RAG_KB_VERSION_POLL_SECONDS.
+
+        The throttle is checked inline; the lookup itself is a blocking
+        control-plane call and runs on a worker thread.
+        """
+        if os.getenv("RAG_KB_VERSION") or not self._kb_poll_due():
+            return
+        await asyncio.to_thread(self._refresh_kb_version)
+
+    def _kb_poll_due(self) -> bool:
+        interval = float(os.getenv("RAG_KB_VERSION_POLL_SECONDS", "300"))
+        with _retrieval_cache_lock:
+            checked_at = _kb_checked_at.get(self.knowledge_base_id)
+        return checked_at is None or time.monotonic() - checked_at >= interval
+
+    def _refresh_kb_version(self) -> None:
+        with _kb_poll_lock:
+            if not self._kb_poll_due():
+                return  # another caller polled while this one waited
+            try:
+                kb_response = self._kb_client().get_knowledge_base(self.knowledge_base_id)
+                self._record_kb_version(getattr(kb_response.data, "time_updated", None))
+            except Exception as exc:
+                logger.warning("rag.kb_version_poll_failed kb=%s error=%s", self.knowledge_base_id[-20:], exc)
+            finally:
+                with _retrieval_cache_lock:
+                    _kb_checked_at[self.knowledge_base_id] = time.monotonic()
+
+    def _record_kb_version(self, time_updated: Any) -> None:
+        if not time_updated:
+            return
+        version = str(time_updated)
+        with _retrieval_cache_lock:
+            previous = _kb_versions.get(self.knowledge_base_id)
+            _kb_versions[self.knowledge_base_id] = version
+        if previous is not None and previous != version:
+            logger.info(
+                "rag_cache.invalidated kb=%s version=%s->%s",
+                self.knowledge_base_id[-20:],
+                previous,
+                version,
+            )
+
+    def _kb_version(self) -> str:
+        """``RAG_KB_VERSION`` when set, else the last observed KB ``time_updated``."""
+        override = os.getenv("RAG_KB_VERSION")
+        if override:
+            return override
+        with _retrieval_cache_lock:
+            return _kb_versions.get(self.knowledge_base_id, "")
 
+    def _search_via_chat(self, query: str, top_k: int) -> Any:
+        """Run one retrieval chat on a pooled Agent Runtime session.
+
+        Sessions are reused for a bounded number of searches and retired early
+        when a response looks poisoned by earlier turns (see
+        :mod:`app.services.session_pool`).  With RAG_SESSION_POOL_ENABLED=false
+        every query gets a fresh session, as before.
+        """
+        with get_limiter("agent_runtime").blocking_slot():
+            pool = get_session_pool(self.agent_endpoint_id)
+            if pool is None:
+                return self._chat(self._create_session(), query, top_k)
+            with pool.blocking_session(self._create_session, self._delete_session) as session:
+                response = self._chat(session.id, query, top_k)
+                session.poisoned = self._poisoning_reason(response)
+                session.record_reply(cited=bool(self._citations(response)))
+                return response
+
+    def start_session_pool(self) -> None:
+        """Pre-warm this endpoint's session pool and start its reaper (no-op when pooling is off)."""
+        pool = get_session_pool(self.agent_endpoint_id)
+        if pool is not None:
+            pool.start(self._create_session, self._delete_session)
+
+    def _create_session(self) -> str:
         session_response = self.runtime_client.create_session(
             agent_endpoint_id=self.agent_endpoint_id,
-            create_session_details=CreateSessionDetails(
-                display_name=f"sow-rag-{int(time.time())}"
-            ),
+            create_session_details=self._session_details(),
         )
         session_id = session_response.data.id
         logger.debug("rag.session_created session_id=%s", session_id)
+        return session_id
+
+    def _delete_session(self, session_id: str) -> None:
+        self.runtime_client.delete_session(agent_endpoint_id=self.agent_endpoint_id, session_id=session_id)
 
-        chat_details = ChatDetails(
+    def _chat(self, session_id: str, query: str, top_k: int) -> Any:
+        with track_call(self.runtime_client, "agent_runtime.chat"):
+            return self.runtime_client.chat(
+                agent_endpoint_id=self.agent_endpoint_id,
+                chat_details=self._chat_details(session_id, query, top_k),
+            )
+
+    @staticmethod
+    def _session_details() -> Any:
+        from oci.generative_ai_agent_runtime.models import CreateSessionDetails
+
+        return CreateSessionDetails(display_name=f"sow-rag-{int(time.time())}")
+
+    @staticmethod
+    def _chat_details(session_id: str, query: str, top_k: int) -> Any:
+        from oci.generative_ai_agent_runtime.models import ChatDetails
+
+        return ChatDetails(
             user_message=f"Retrieve {top_k} relevant documents about: {query}",
             should_stream=False,
             session_id=session_id,
         )
 
-        return self.runtime_client.chat(
+    @staticmethod
+    def _poisoning_reason(response: Any) -> str | None:
+        """Why a pooled session must be retired right after *response*, if at all.
+
+        Only a reply with no message is disqualifying on its own.  A reply
+        without citations is usually just a knowledge-base miss; the pool
+        retires the session after a run of them (RAG_SESSION_MAX_UNCITED).
+        """
+        if getattr(getattr(response, "data", None), "message", None) is None:
+            return "no_message"
+        return None
+
+    @staticmethod
+    def _citations(response: Any) -> list[Any]:
+        message = getattr(getattr(response, "data", None), "message", None)
+        content = getattr(message, "content", None)
+        return list(getattr(content, "citations", None) or getattr(message, "citations", None) or [])
+
+    async def _asearch_shared(self, query: str, top_k: int) -> Any:
+        """Single-flight :meth:`_asearch_via_chat`.
+
+        Callers on the same event loop asking for the same (query, top_k)
+        while a search is in progress share its result (or exception).  The
+        search runs as its own task and is awaited through ``shield``, so one
+        cancelled caller does not cancel it for the others.
+        """
+        global _shared_searches
+        loop = asyncio.get_running_loop()
+        key = (self.agent_endpoint_id, query, top_k)
+        with _retrieval_cache_lock:
+            inflight = _inflight_searches.setdefault(loop, {})
+            task = inflight.get(key)
+            if task is None:
+                task = loop.create_task(self._asearch_via_chat(query=query, top_k=top_k))
+                inflight[key] = task
+                task.add_done_callback(partial(_finish_search, inflight, key))
+            else:
+                _shared_searches += 1
+                logger.info("rag.search_shared query=%s", query[:100])
+        return await asyncio.shield(task)
+
+    async def _asearch_via_chat(self, query: str, top_k: int) -> Any:
+        """Async :meth:`_search_via_chat`; same pooled-session semantics."""
+        if self.async_runtime_client is None:
+            return await asyncio.to_thread(self._search_via_chat, query, top_k)
+
+        async with get_limiter("agent_runtime").slot():
+            pool = get_session_pool(self.agent_endpoint_id)
+            if pool is None:
+                return await self._achat(await self._acreate_session(), query, top_k)
+            async with pool.session(self._acreate_session, self._adelete_session) as session:
+                response = await self._achat(session.id, query, top_k)
+                session.poisoned = self._poisoning_reason(response)
+                session.record_reply(cited=bool(self._citations(response)))
+                return response
+
+    async def _acreate_session(self) -> str:
+        session_response = await self.async_runtime_client.create_session(
+            agent_endpoint_id=self.agent_endpoint_id,
+            create_session_details=self._session_details(),
+        )
+        session_id = session_response.data.id
+        logger.debug("rag.session_created session_id=%s", session_id)
+        return session_id
+
+    async def _adelete_session(self, session_id: str) -> None:
+        await self.async_runtime_client.delete_session(
+            agent_endpoint_id=self.agent_endpoint_id, session_id=session_id
+        )
+
+    async def _achat(self, session_id: str, query: str, top_k: int) -> Any:
+        return await self.async_runtime_client.chat(
             agent_endpoint_id=self.agent_endpoint_id,
-            chat_details=chat_details,
+            chat_details=self._chat_details(session_id, query, top_k),
         )
 
     def _extract_documents(self, response: Any) -> list[Any]:
@@ -448,19 +817,51 @@ class SectionAwareRAGService:
         return default
 
     def _build_semantic_query(self, section: str, project_data: dict[str, Any]) -> str:
-        """Build rich semantic query using section-specific descriptors."""
-        base = self.SECTION_QUERY_MAP.get(section.upper().strip(), section)
-        parts = [base]
-
-        if project_data.get("client"):
-            parts.append(project_data["client"])
-        if project_data.get("industry"):
-            parts.append(project_data["industry"])
-        if project_data.get("services"):
-            parts.append(", ".join(str(s) for s in project_data["services"]))
+        """Build rich semantic query using section-specific descriptors.
+
+        Values are whitespace- and case-normalised and services de-duplicated
+        and sorted, so requests sharing a cache entry (see :meth:`_cache_key`)
+        send the same query.
+        """
+        name = " ".join(section.split()).upper()
+        parts = [self.SECTION_QUERY_MAP.get(name, name)]
+
+        for field in ("client", "industry"):
+            value = _normalize_key_part(project_data.get(field))
+            if value:
+                parts.append(value)
+        services = sorted({_normalize_key_part(item) for item in _services_list(project_data.get("services"))} - {""})
+        if services:
+            parts.append(", ".join(services))
 
         return " ".join(parts)
 
     def _cache_key(self, section: str, project_data: dict[str, Any]) -> str:
-        raw = json.dumps(project_data, sort_keys=True, ensure_ascii=False)
-        return f"{section.casefold()}::{raw}"
+        """Fixed-size digest of the KB, its version, the section and its semantic query.
+
+        Only section, client, industry and services shape the query, so the
+        rest of ``project_data`` (vision analysis, inferred metadata, ...) is
+        ignored: it is large, and including it kept requests with identical
+        queries from sharing an entry.  Keying on the query itself keeps the
+        entry and the retrieval it stores in step.
+        """
+        return digest(
+            self.knowledge_base_id,
+            self._kb_version(),
+            self.top_k,
+            _normalize_key_part(section),
+            self._build_semantic_query(section, project_data),
+        )
+
+
+def _services_list(services: Any) -> list[str]:
+    """``services`` as a list of strings; a bare string is one service."""
+    if not services:
+        return []
+    if isinstance(services, str):
+        return [services]
+    return [str(item) for item in services]
+
+
+def _normalize_key_part(value: Any) -> str:
+    return " ".join(str(value or "").split()).casefold()
@@ -0,0 +1,283 @@
+"""Process-wide adaptive concurrency limits for OCI endpoints.
+
+Every SoW request used to create its own ``asyncio.Semaphore`` for RAG and
+writer calls, so N concurrent users meant N × limit in-flight OCI calls and a
+storm of 429s.  This module keeps one :class:`AdaptiveLimiter` per OCI
+endpoint family (``inference``, ``multimodal``, ``agent_runtime``) shared by
+every request in the process.
+
+Each limiter follows AIMD (additive increase, multiplicative decrease) on the
+number of in-flight calls:
+
+* every successful call grows the limit by ``1 / limit`` — roughly +1 per
+  full window of successes, up to ``max_limit``;
+* a throttling response (429/503) multiplies the limit by ``backoff``, at
+  most once per ``cooldown_s`` so one burst of rejections from the same window
+  only shrinks it once.
+
+Limiters are used from async code (the pipeline), from worker threads (the
+blocking SDK paths) and from more than one event loop (Starlette's TestClient
+runs requests on separate loops), so state is guarded by a ``threading.Lock``
+and async waiters are woken with ``call_soon_threadsafe``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses that mean "slow down" rather than "this request is wrong".
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class _Waiter:
+    """A queued acquirer — either an asyncio future or a blocking thread."""
+
+    __slots__ = ("loop", "future", "event")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self.loop = loop
+        self.future: asyncio.Future[None] | None = loop.create_future() if loop else None
+        self.event: threading.Event | None = None if loop else threading.Event()
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter shared across threads and event loops."""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        *,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff: float = 0.5,
+        cooldown_s: float = 1.0,
+    ) -> None:
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.backoff = backoff
+        self.cooldown_s = cooldown_s
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._last_decrease = 0.0
+        self._successes = 0
+        self._throttles = 0
+        self._peak_queued = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    # ── acquire / release ────────────────────────────────────────────────
+
+    def _try_take(self) -> bool:
+        if self._in_flight < int(self._limit) and not self._waiters:
+            self._in_flight += 1
+            return True
+        return False
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        self._waiters.append(waiter)
+        self._peak_queued = max(self._peak_queued, len(self._waiters))
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now."""
+        with self._lock:
+            return self._try_take()
+
+    async def acquire(self) -> None:
+        """Wait for a slot on the running event loop."""
+        with self._lock:
+            if self._try_take():
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._enqueue(waiter)
+        assert waiter.future is not None
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    granted = False
+                except ValueError:
+                    granted = True
+            # A slot handed to us in the same instant we were cancelled is
+            # returned from _deliver (future already done); only release here
+            # when the hand-off completed before the cancellation landed.
+            if granted and waiter.future.done() and not waiter.future.cancelled():
+                self.release()
+            raise
+
+    def acquire_blocking(self) -> None:
+        """Wait for a slot from a worker thread."""
+        with self._lock:
+            if self._try_take():
+                return
+            waiter = _Waiter()
+            self._enqueue(waiter)
+        assert waiter.event is not None
+        waiter.event.wait()
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            granted = self._grant_locked()
+        self._wake(granted)
+
+    def _grant_locked(self) -> list[_Waiter]:
+        """Hand free slots to queued waiters; caller holds the lock."""
+        granted: list[_Waiter] = []
+        while self._waiters and self._in_flight < int(self._limit):
+            self._in_flight += 1
+            granted.append(self._waiters.popleft())
+        return granted
+
+    def _wake(self, granted: list[_Waiter]) -> None:
+        for waiter in granted:
+            if waiter.event is not None:
+                waiter.event.set()
+                continue
+            assert waiter.loop is not None
+            try:
+                waiter.loop.call_soon_threadsafe(self._deliver, waiter)
+            except RuntimeError:
+                # Loop already closed — the waiter is gone; return its slot.
+                self.release()
+
+    def _deliver(self, waiter: _Waiter) -> None:
+        assert waiter.future is not None
+        if waiter.future.done():
+            self.release()
+        else:
+            waiter.future.set_result(None)
+
+    # ── feedback ─────────────────────────────────────────────────────────
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._successes += 1
+            if self._limit < self.max_limit:
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            granted = self._grant_locked()
+        self._wake(granted)
+
+    def record_throttle(self) -> None:
+        with self._lock:
+            self._throttles += 1
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown_s:
+                return
+            self._last_decrease = now
+            old = self._limit
+            self._limit = max(float(self.min_limit), self._limit * self.backoff)
+        logger.warning(
+            "rate_limiter.decrease name=%s limit=%d->%d in_flight=%d",
+            self.name,
+            int(old),
+            int(self._limit),
+            self._in_flight,
+        )
+
+    def _record_outcome(self, exc: BaseException | None) -> None:
+        if exc is None:
+            self.record_success()
+        elif getattr(exc, "status", None) in THROTTLE_STATUSES:
+            self.record_throttle()
+
+    # ── context managers ─────────────────────────────────────────────────
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one slot for an awaited OCI call and feed back its outcome."""
+        await self.acquire()
+        try:
+            yield
+        except BaseException as exc:
+            self._record_outcome(exc)
+            raise
+        else:
+            self._record_outcome(None)
+        finally:
+            self.release()
+
+    @contextmanager
+    def blocking_slot(self) -> Iterator[None]:
+        """Thread counterpart of :meth:`slot` for blocking SDK calls."""
+        self.acquire_blocking()
+        try:
+            yield
+        except BaseException as exc:
+            self._record_outcome(exc)
+            raise
+        else:
+            self._record_outcome(None)
+        finally:
+            self.release()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "limit": int(self._limit),
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "in_flight": self._in_flight,
+                "queued": len(self._waiters),
+                "peak_queued": self._peak_queued,
+                "successes": self._successes,
+                "throttles": self._throttles,
+            }
+
+
+@dataclass(frozen=True)
+class _LimiterSpec:
+    initial_env: str
+    initial_default: int
+    max_env: str
+    max_default: int
+
+
+# Initial limits keep the historical per-request env vars as their knobs so
+# existing deployments start from the same concurrency they were tuned for.
+_SPECS: dict[str, _LimiterSpec] = {
+    "inference": _LimiterSpec("WRITER_CONCURRENCY", 4, "OCI_INFERENCE_MAX_CONCURRENCY", 32),
+    "multimodal": _LimiterSpec("VISION_IMAGE_CONCURRENCY", 2, "OCI_MULTIMODAL_MAX_CONCURRENCY", 16),
+    "agent_runtime": _LimiterSpec("RAG_CONCURRENCY", 4, "OCI_AGENT_RUNTIME_MAX_CONCURRENCY", 32),
+}
+
+_limiters: dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> AdaptiveLimiter:
+    """Return the process-wide limiter for an OCI endpoint family."""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            spec = _SPECS[name]
+            limiter = AdaptiveLimiter(
+                name,
+                int(os.getenv(spec.initial_env, str(spec.initial_default))),
+                max_limit=int(os.getenv(spec.max_env, str(spec.max_default))),
+            )
+            _limiters[name] = limiter
+        return limiter
+
+
+def limiter_stats() -> list[dict[str, Any]]:
+    """Snapshots of every limiter, creating them so the list is stable."""
+    return [get_limiter(name).snapshot() for name in _SPECS]
@@ -0,0 +1,267 @@
+"""Out-of-process DOCX rendering.
+
+:meth:`DocumentBuilder.build` is CPU-bound (lxml tree surgery plus zip
+compression).  Run on the event loop it stalls every other request on the
+worker; run on a thread it still holds the GIL for most of the build.
+:class:`RenderPool` sends builds to a pool of worker processes instead:
+
+* inputs travel as a picklable :class:`RenderJob` (sections, diagram bytes,
+  project context and flags) and the worker writes the DOCX and Markdown
+  files itself, returning only their names — or, for ``in_memory`` jobs,
+  returns the serialised DOCX without touching the disk; jobs with a
+  ``base_file`` patch the changed sections of that earlier output instead
+  of building from the template (see :meth:`DocumentBuilder.rebuild`);
+* each worker parses the template into its own template cache when it
+  starts, so the first build it serves is already warm;
+* at most ``max_pending`` builds may be queued or running; further
+  submissions raise :class:`RenderQueueFull` instead of piling up.
+
+A build keeps its queue slot until it has actually finished, even when
+the awaiting request is cancelled.  With ``RENDER_POOL_WORKERS=0`` builds
+run on threads of the calling process, behind the same queue limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from app.services.doc_builder import DocumentBuilder
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RenderJob:
+    """Everything a worker needs to render one SoW; must stay picklable."""
+
+    template_path: str
+    output_dir: str
+    sections: list[tuple[str, str]]
+    markdown: str
+    customer_name: str = ""
+    project_name: str = ""
+    diagram_images: dict[str, list[tuple[str, bytes]]] = field(default_factory=dict)
+    project_context: dict[str, Any] = field(default_factory=dict)
+    include_architect_review: bool = False
+    excluded_sections: frozenset[str] = frozenset()
+    # Return the DOCX bytes instead of writing output files.
+    in_memory: bool = False
+    # Previously built DOCX to patch: ``sections`` then holds only the
+    # changed sections and no Markdown is written.
+    base_file: str | None = None
+
+
+@dataclass
+class RenderResult:
+    """Output file names, or the DOCX itself for ``in_memory`` jobs."""
+
+    file_name: str | None = None
+    markdown_name: str | None = None
+    docx: bytes | None = None
+
+
+def render_job(job: RenderJob) -> RenderResult:
+    """Render *job* into ``job.output_dir`` (or into memory for ``in_memory`` jobs)."""
+    builder = DocumentBuilder(
+        template_path=Path(job.template_path),
+        customer_name=job.customer_name,
+        project_name=job.project_name,
+    )
+    if job.base_file:
+        base_path = Path(job.base_file)
+        if job.in_memory:
+            return RenderResult(docx=builder.rebuild_bytes(base_path, job.sections))
+        return RenderResult(file_name=builder.rebuild(base_path, job.sections, Path(job.output_dir)))
+    if job.in_memory:
+        return RenderResult(
+            docx=builder.build_bytes(
+                sections=job.sections,
+                diagram_images=job.diagram_images or None,
+                project_context=job.project_context,
+                include_architect_review=job.include_architect_review,
+                excluded_sections=job.excluded_sections,
+            )
+        )
+    output_dir = Path(job.output_dir)
+    file_name = builder.build(
+        sections=job.sections,
+        output_dir=output_dir,
+        diagram_images=job.diagram_images or None,
+        project_context=job.project_context,
+        include_architect_review=job.include_architect_review,
+        excluded_sections=job.excluded_sections,
+    )
+    markdown_name = builder.build_markdown(full_document=job.markdown, output_dir=output_dir)
+    return RenderResult(file_name=file_name, markdown_name=markdown_name)
+
+
+def _warm_worker(template_path: str) -> None:
+    """Process-pool initializer: parse the template before the first build arrives."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+    )
+    path = Path(template_path)
+    if not path.exists():
+        return
+    try:
+        DocumentBuilder(path)._load_or_create_template()
+        logger.info("render_pool.worker_warm pid=%d template=%s", os.getpid(), path.name)
+    except Exception:
+        logger.exception("render_pool.worker_warm_failed pid=%d", os.getpid())
+
+
+class RenderQueueFull(Exception):
+    """Raised by :meth:`RenderPool.render` when ``max_pending`` builds are in flight."""
+
+
+class RenderPool:
+    """Bounded queue of DOCX builds executed by warm worker processes."""
+
+    def __init__(self, template_path: Path, workers: int = 2, max_pending: int = 16) -> None:
+        self.template_path = Path(template_path)
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending)
+        self._lock = threading.Lock()
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._restarts = 0
+        self._busy_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.workers:
+                    # "spawn": the parent runs event-loop and job-runner
+                    # threads, which fork() would copy in an arbitrary state.
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_warm_worker,
+                        initargs=(str(self.template_path),),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_pending, thread_name_prefix="docx-render"
+                    )
+                logger.info("render_pool.started workers=%d max_pending=%d", self.workers, self.max_pending)
+            return self._executor
+
+    def start(self) -> None:
+        """Start the worker processes ahead of the first build (no-op without workers)."""
+        if self.workers:
+            executor = self._get_executor()
+            # Workers are spawned on demand; one no-op per worker brings them all up.
+            for _ in range(self.workers):
+                executor.submit(os.getpid)
+
+    async def render(self, job: RenderJob) -> RenderResult:
+        """Render *job* on the pool; raises :class:`RenderQueueFull` when saturated."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise RenderQueueFull(f"{self.max_pending} document builds already pending")
+            self._pending += 1
+            self._submitted += 1
+        t0 = time.monotonic()
+        executor = self._get_executor()
+        try:
+            future = executor.submit(render_job, job)
+        except BaseException as exc:
+            self._release(t0, executor, None)
+            if isinstance(exc, BrokenProcessPool):
+                self._reset_executor(executor)
+            raise
+        future.add_done_callback(lambda done: self._release(t0, executor, done))
+        return await asyncio.wrap_future(future)
+
+    def _release(self, t0: float, executor: Executor, future: Future | None) -> None:
+        elapsed = time.monotonic() - t0
+        error = future.exception() if future is not None and not future.cancelled() else None
+        failed = future is None or future.cancelled() or error is not None
+        with self._lock:
+            self._pending -= 1
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+                self._busy_seconds += elapsed
+        if isinstance(error, BrokenProcessPool):
+            # A worker died (OOM kill, crash): drop the pool so the next
+            # build starts a fresh one.
+            self._reset_executor(executor)
+        logger.info("render_pool.build_done elapsed=%.2fs failed=%s", elapsed, failed)
+
+    def _reset_executor(self, broken: Executor) -> None:
+        with self._lock:
+            if self._executor is not broken:
+                return  # already replaced by another failed build
+            self._executor = None
+            self._restarts += 1
+        logger.error("render_pool.broken — restarting worker processes")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "restarts": self._restarts,
+                "avg_build_seconds": round(self._busy_seconds / self._completed, 3) if self._completed else 0.0,
+            }
+
+
+_pool: RenderPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool(template_path: Path) -> RenderPool:
+    """Process-wide render pool sized from ``RENDER_POOL_WORKERS`` / ``RENDER_POOL_MAX_PENDING``."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderPool(
+                template_path,
+                workers=int(os.getenv("RENDER_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))),
+                max_pending=int(os.getenv("RENDER_POOL_MAX_PENDING", "16")),
+            )
+        return _pool
+
+
+def render_pool_stats() -> dict[str, Any] | None:
+    with _pool_lock:
+        pool = _pool
+    return pool.stats() if pool is not None else None
+
+
+def shutdown_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
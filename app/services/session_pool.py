@@ -0,0 +1,348 @@
+"""Pooled Agent Runtime sessions for RAG retrieval.
+
+Every knowledge-base search used to open a fresh Agent Runtime session
+before its ``chat`` call.  That doubled RAG latency and kept the number of
+live sessions per agent endpoint high enough to trigger the service's
+session-limit 429s.  :class:`AgentSessionPool` keeps a bounded set of
+sessions per endpoint and lends each one to a single search at a time.
+
+A session carries conversation history, so reuse is limited:
+
+* a session is retired after ``max_uses`` searches;
+* it is retired immediately when the search raised or the caller flags the
+  response as poisoned (e.g. a reply with no message at all);
+* it is retired after ``max_uncited`` consecutive replies without citations.
+  A single one is an ordinary knowledge-base miss; a run of them suggests
+  the agent is answering from earlier turns instead of retrieving;
+* idle sessions are reaped after ``idle_seconds`` — before the service's own
+  idle timeout would invalidate them.
+
+Retired sessions are deleted best-effort in the background, off the search
+path.  :meth:`AgentSessionPool.start` pre-warms ``min_sessions`` sessions and
+runs a daemon thread that reaps idle sessions and tops the pool back up.
+The pool is shared by threads and event loops; checkouts are gated by a
+fixed-size :class:`AdaptiveLimiter`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+
+from app.services.rate_limiter import AdaptiveLimiter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AgentSession:
+    """One Agent Runtime session lent to a single search at a time."""
+
+    id: str
+    created_at: float
+    last_used: float
+    uses: int = 0
+    # Set by the caller when the response shows the session is unusable; the
+    # session is retired on check-in.
+    poisoned: str | None = None
+    # Consecutive replies without citations (see :meth:`record_reply`).
+    uncited_streak: int = 0
+
+    def record_reply(self, cited: bool) -> None:
+        """Track runs of citation-less replies; a cited reply resets the run."""
+        self.uncited_streak = 0 if cited else self.uncited_streak + 1
+
+
+class AgentSessionPool:
+    """Bounded pool of reusable sessions for one agent endpoint."""
+
+    def __init__(
+        self,
+        agent_endpoint_id: str,
+        max_sessions: int = 8,
+        max_uses: int = 10,
+        idle_seconds: float = 600.0,
+        max_uncited: int = 3,
+        min_sessions: int = 0,
+        reap_seconds: float = 60.0,
+    ) -> None:
+        self.agent_endpoint_id = agent_endpoint_id
+        self.max_sessions = max(1, max_sessions)
+        self.max_uses = max(1, max_uses)
+        self.idle_seconds = idle_seconds
+        self.max_uncited = max(1, max_uncited)
+        self.min_sessions = min(max(0, min_sessions), self.max_sessions)
+        self.reap_seconds = reap_seconds
+        self._gate = AdaptiveLimiter(
+            "agent_sessions",
+            self.max_sessions,
+            min_limit=self.max_sessions,
+            max_limit=self.max_sessions,
+        )
+        self._lock = threading.Lock()
+        self._idle: list[AgentSession] = []
+        self._in_use = 0
+        self._created = 0
+        self._reused = 0
+        self._waits = 0
+        self._reaped = 0
+        self._warmed = 0
+        self._recycled: dict[str, int] = {}
+        # Blocking create/delete used by the maintenance thread (see start()).
+        self._create: Callable[[], str] | None = None
+        self._delete: Callable[[str], Any] | None = None
+        self._maintainer: threading.Thread | None = None
+        self._stop = threading.Event()
+        # Strong references to in-flight async deletes.
+        self._delete_tasks: set[asyncio.Task[None]] = set()
+
+    # ── warm-up / maintenance ────────────────────────────────────────────
+
+    def start(self, create: Callable[[], str], delete: Callable[[str], Any]) -> None:
+        """Pre-warm ``min_sessions`` and reap every ``reap_seconds`` on a daemon thread (idempotent)."""
+        with self._lock:
+            if self._maintainer is not None:
+                return
+            self._create, self._delete = create, delete
+            self._stop.clear()
+            self._maintainer = threading.Thread(
+                target=self._maintain_loop, name="agent-session-reaper", daemon=True
+            )
+            self._maintainer.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            maintainer, self._maintainer = self._maintainer, None
+        if maintainer is not None:
+            self._stop.set()
+            maintainer.join(timeout=5)
+
+    def _maintain_loop(self) -> None:
+        while True:
+            try:
+                self.maintain()
+            except Exception:
+                logger.exception("session_pool.maintain_failed endpoint=%s", self.agent_endpoint_id[-20:])
+            if self._stop.wait(self.reap_seconds):
+                return
+
+    def maintain(self) -> None:
+        """Delete idle-expired sessions, then top the idle set up to ``min_sessions``."""
+        if self._create is None or self._delete is None:
+            return
+        for session_id in self._reap_idle():
+            _delete_quietly(self._delete, session_id)
+        with self._lock:
+            missing = min(
+                self.min_sessions - len(self._idle),
+                self.max_sessions - len(self._idle) - self._in_use,
+            )
+        for _ in range(missing):
+            session = self._new_session(self._create())
+            with self._lock:
+                self._idle.append(session)
+                self._warmed += 1
+
+    # ── checkout / check-in ──────────────────────────────────────────────
+
+    def _reap_idle(self) -> list[str]:
+        """Drop idle sessions past ``idle_seconds``; return their ids for deletion."""
+        now = time.time()
+        with self._lock:
+            reaped = [s.id for s in self._idle if now - s.last_used > self.idle_seconds]
+            if reaped:
+                self._idle = [s for s in self._idle if now - s.last_used <= self.idle_seconds]
+                self._reaped += len(reaped)
+        if reaped:
+            logger.info("session_pool.reaped endpoint=%s count=%d", self.agent_endpoint_id[-20:], len(reaped))
+        return reaped
+
+    def _take_idle(self) -> tuple[AgentSession | None, list[str]]:
+        """Pop the most recently used live session; also return reaped ids."""
+        reaped = self._reap_idle()
+        with self._lock:
+            session = self._idle.pop() if self._idle else None
+            if session is not None:
+                self._reused += 1
+            self._in_use += 1
+        return session, reaped
+
+    def _new_session(self, session_id: str) -> AgentSession:
+        now = time.time()
+        with self._lock:
+            self._created += 1
+        logger.debug("session_pool.created endpoint=%s session_id=%s", self.agent_endpoint_id[-20:], session_id)
+        return AgentSession(id=session_id, created_at=now, last_used=now)
+
+    def _check_in(self, session: AgentSession | None, error: BaseException | None) -> str | None:
+        """Return *session* to the pool; the id is returned when it must be deleted."""
+        with self._lock:
+            self._in_use -= 1
+            if session is None:
+                return None
+            session.uses += 1
+            session.last_used = time.time()
+            if error is not None:
+                reason = "error"
+            elif session.poisoned:
+                reason = session.poisoned
+            elif session.uncited_streak >= self.max_uncited:
+                reason = "no_citations"
+            elif session.uses >= self.max_uses:
+                reason = "max_uses"
+            else:
+                self._idle.append(session)
+                return None
+            self._recycled[reason] = self._recycled.get(reason, 0) + 1
+        logger.info(
+            "session_pool.recycled endpoint=%s reason=%s uses=%d",
+            self.agent_endpoint_id[-20:],
+            reason,
+            session.uses,
+        )
+        return session.id
+
+    @contextmanager
+    def blocking_session(
+        self,
+        create: Callable[[], str],
+        delete: Callable[[str], Any],
+    ) -> Iterator[AgentSession]:
+        """Lend a session to a blocking search, creating one with *create* if needed."""
+        if not self._gate.try_acquire():
+            with self._lock:
+                self._waits += 1
+            self._gate.acquire_blocking()
+        session: AgentSession | None = None
+        error: BaseException | None = None
+        retired: list[str] = []
+        try:
+            session, retired = self._take_idle()
+            if session is None:
+                session = self._new_session(create())
+            yield session
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            retired_id = self._check_in(session, error)
+            self._gate.release()
+            for session_id in retired + ([retired_id] if retired_id else []):
+                _delete_executor().submit(_delete_quietly, delete, session_id)
+
+    @asynccontextmanager
+    async def session(
+        self,
+        create: Callable[[], Awaitable[str]],
+        delete: Callable[[str], Awaitable[Any]],
+    ) -> AsyncIterator[AgentSession]:
+        """Async counterpart of :meth:`blocking_session`."""
+        if not self._gate.try_acquire():
+            with self._lock:
+                self._waits += 1
+            await self._gate.acquire()
+        session: AgentSession | None = None
+        error: BaseException | None = None
+        retired: list[str] = []
+        try:
+            session, retired = self._take_idle()
+            if session is None:
+                session = self._new_session(await create())
+            yield session
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            retired_id = self._check_in(session, error)
+            self._gate.release()
+            for session_id in retired + ([retired_id] if retired_id else []):
+                task = asyncio.get_running_loop().create_task(_adelete_quietly(delete, session_id))
+                self._delete_tasks.add(task)
+                task.add_done_callback(self._delete_tasks.discard)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "endpoint": self.agent_endpoint_id[-20:],
+                "max_sessions": self.max_sessions,
+                "size": len(self._idle) + self._in_use,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "created": self._created,
+                "reused": self._reused,
+                "waits": self._waits,
+                "recycled": dict(self._recycled),
+                "reaped": self._reaped,
+                "warmed": self._warmed,
+            }
+
+
+def _delete_quietly(delete: Callable[[str], Any], session_id: str) -> None:
+    try:
+        delete(session_id)
+    except Exception:
+        logger.debug("session_pool.delete_failed session_id=%s", session_id, exc_info=True)
+
+
+async def _adelete_quietly(delete: Callable[[str], Awaitable[Any]], session_id: str) -> None:
+    try:
+        await delete(session_id)
+    except Exception:
+        logger.debug("session_pool.delete_failed session_id=%s", session_id, exc_info=True)
+
+
+_delete_executor_instance: ThreadPoolExecutor | None = None
+
+
+def _delete_executor() -> ThreadPoolExecutor:
+    """Small shared executor for deleting sessions retired by blocking searches."""
+    global _delete_executor_instance
+    with _pools_lock:
+        if _delete_executor_instance is None:
+            _delete_executor_instance = ThreadPoolExecutor(max_workers=2, thread_name_prefix="session-delete")
+        return _delete_executor_instance
+
+
+_pools: dict[str, AgentSessionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_session_pool(agent_endpoint_id: str) -> AgentSessionPool | None:
+    """Process-wide pool for *agent_endpoint_id* (``None`` when RAG_SESSION_POOL_ENABLED=false)."""
+    if os.getenv("RAG_SESSION_POOL_ENABLED", "true").casefold() == "false":
+        return None
+    with _pools_lock:
+        pool = _pools.get(agent_endpoint_id)
+        if pool is None:
+            pool = AgentSessionPool(
+                agent_endpoint_id,
+                max_sessions=int(os.getenv("RAG_SESSION_POOL_SIZE", "8")),
+                max_uses=int(os.getenv("RAG_SESSION_MAX_USES", "10")),
+                idle_seconds=float(os.getenv("RAG_SESSION_IDLE_SECONDS", "600")),
+                max_uncited=int(os.getenv("RAG_SESSION_MAX_UNCITED", "3")),
+                min_sessions=int(os.getenv("RAG_SESSION_POOL_MIN", "2")),
+                reap_seconds=float(os.getenv("RAG_SESSION_REAP_SECONDS", "60")),
+            )
+            _pools[agent_endpoint_id] = pool
+        return pool
+
+
+def stop_session_pools() -> None:
+    """Stop every pool's maintenance thread (application shutdown)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.stop()
+
+
+def session_pool_stats() -> list[dict[str, Any]]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
@@ -0,0 +1,248 @@
+"""Process-wide bounded executor for blocking multimodal calls.
+
+:class:`ArchitectureVisionAgent` used to wrap every attempt in its own
+``ThreadPoolExecutor(max_workers=1)``.  Leaving that pool's ``with`` block
+waits for its thread, so a call that hit the timeout still held the request
+until the OCI SDK gave up, and nothing bounded how many such threads a busy
+process could pile up.  :class:`VisionExecutor` replaces those pools:
+
+* a fixed set of ``workers`` daemon threads runs the calls; at most
+  ``max_pending`` calls may wait for one, further submissions raise
+  :class:`VisionQueueFull`;
+* a call whose caller times out while it is still queued is cancelled and
+  never runs;
+* a call that times out while running cannot be interrupted (Python threads
+  cannot be killed), so it is *abandoned*: its worker stops counting as
+  active and a replacement worker starts at once, so the timeout frees
+  capacity for the next call.  The abandoned thread exits when its call
+  returns.  At most ``max_abandoned`` threads may be abandoned at a time;
+  beyond that, a timed-out call keeps its worker until it returns.
+
+Clients with a native async API (``amultimodal_completion``, as
+``OCIClient`` has) do not need a thread.  Their calls go through
+:meth:`VisionExecutor.await_call` instead, which only applies the timeout and
+counts them, so in-flight and timed-out calls are reported on both paths.
+
+Counters (active, queued, timed out, abandoned, rejected, async in flight)
+are reported by :func:`vision_executor_stats`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class VisionQueueFull(Exception):
+    """Raised when ``max_pending`` multimodal calls are already waiting for a worker."""
+
+
+@dataclass(eq=False)
+class _Task:
+    fn: Callable[..., Any]
+    args: tuple[Any, ...]
+    future: Future = field(default_factory=Future)
+    # Set once the caller gave up on a running task; a replacement worker
+    # was started when ``replaced`` is also set.
+    abandoned: bool = False
+    replaced: bool = False
+
+
+class VisionExecutor:
+    """Fixed pool of worker threads with a bounded queue and abandon-on-timeout."""
+
+    def __init__(self, workers: int = 4, max_pending: int = 32, max_abandoned: int | None = None) -> None:
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.max_abandoned = self.workers if max_abandoned is None else max(0, max_abandoned)
+        self._cond = threading.Condition()
+        self._queue: deque[_Task] = deque()
+        self._threads = 0
+        self._started = 0
+        self._active = 0
+        self._abandoned = 0
+        self._submitted = 0
+        self._completed = 0
+        self._timed_out = 0
+        self._rejected = 0
+        self._async_active = 0
+        self._async_calls = 0
+        self._shutdown = False
+
+    def _spawn_locked(self) -> None:
+        self._threads += 1
+        self._started += 1
+        threading.Thread(target=self._work, name=f"vision-call-{self._started}", daemon=True).start()
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> _Task:
+        task = _Task(fn, args)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("vision executor is shut down")
+            if len(self._queue) >= self.max_pending:
+                self._rejected += 1
+                raise VisionQueueFull(f"{self.max_pending} multimodal calls already queued")
+            self._queue.append(task)
+            self._submitted += 1
+            # Workers start on demand, up to the pool size.
+            if self._threads - self._active < len(self._queue) and self._threads < self.workers:
+                self._spawn_locked()
+            self._cond.notify()
+        return task
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._shutdown:
+                    self._cond.wait()
+                if not self._queue:
+                    self._threads -= 1
+                    return
+                task = self._queue.popleft()
+                if not task.future.set_running_or_notify_cancel():
+                    continue
+                self._active += 1
+            try:
+                result = task.fn(*task.args)
+            except BaseException as exc:
+                task.future.set_exception(exc)
+            else:
+                task.future.set_result(result)
+            with self._cond:
+                if not task.abandoned:
+                    self._active -= 1
+                    self._completed += 1
+                    continue
+                self._abandoned -= 1
+                if task.replaced:
+                    # A replacement worker already took this thread's slot.
+                    return
+                self._active -= 1
+
+    def _give_up(self, task: _Task, timed_out: bool = True) -> None:
+        """Drop the caller's interest in *task*: cancel it if queued, abandon it if running."""
+        with self._cond:
+            if timed_out:
+                self._timed_out += 1
+            if task.future.cancel():
+                try:
+                    self._queue.remove(task)
+                except ValueError:
+                    pass
+                return
+            if task.future.done() or task.abandoned:
+                return
+            task.abandoned = True
+            self._abandoned += 1
+            if self._abandoned <= self.max_abandoned and not self._shutdown:
+                # The stuck thread leaves the pool; its slot is free again.
+                task.replaced = True
+                self._active -= 1
+                self._threads -= 1
+                if self._queue:
+                    self._spawn_locked()
+            abandoned = self._abandoned
+        logger.warning("vision_executor.call_abandoned replaced=%s abandoned=%d", task.replaced, abandoned)
+
+    def call(self, fn: Callable[..., Any], *args: Any, timeout: float | None = None) -> Any:
+        """Run ``fn(*args)`` on the pool and wait up to *timeout* seconds.
+
+        Raises :class:`TimeoutError` when the call did not finish in time and
+        :class:`VisionQueueFull` when the queue is full.
+        """
+        task = self._submit(fn, *args)
+        try:
+            return task.future.result(timeout=timeout)
+        except FuturesTimeoutError as exc:
+            if task.future.done():
+                raise  # the call itself raised TimeoutError
+            self._give_up(task)
+            raise TimeoutError(f"Multimodal call timed out after {timeout} seconds") from exc
+
+    async def acall(self, fn: Callable[..., Any], *args: Any, timeout: float | None = None) -> Any:
+        """Async :meth:`call`: awaits the pooled call without blocking the event loop."""
+        task = self._submit(fn, *args)
+        try:
+            # Cancelling the wrapper also cancels a call that is still queued.
+            return await asyncio.wait_for(asyncio.wrap_future(task.future), timeout=timeout)
+        except asyncio.TimeoutError as exc:
+            if task.future.done() and not task.future.cancelled():
+                raise  # the call itself raised TimeoutError
+            self._give_up(task)
+            raise TimeoutError(f"Multimodal call timed out after {timeout} seconds") from exc
+        except asyncio.CancelledError:
+            self._give_up(task, timed_out=False)
+            raise
+
+    async def await_call(self, call: Awaitable[Any], timeout: float | None = None) -> Any:
+        """Await a native async call with *timeout*, counted like pooled calls.
+
+        No worker is used; the call is cancelled when it times out.
+        """
+        with self._cond:
+            self._async_active += 1
+            self._async_calls += 1
+        try:
+            return await asyncio.wait_for(call, timeout=timeout)
+        except asyncio.TimeoutError as exc:
+            with self._cond:
+                self._timed_out += 1
+            raise TimeoutError(f"Multimodal call timed out after {timeout} seconds") from exc
+        finally:
+            with self._cond:
+                self._async_active -= 1
+
+    def shutdown(self) -> None:
+        """Cancel queued calls and let idle workers exit (running calls finish)."""
+        with self._cond:
+            self._shutdown = True
+            while self._queue:
+                self._queue.popleft().future.cancel()
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "threads": self._threads,
+                "active": self._active,
+                "queued": len(self._queue),
+                "abandoned": self._abandoned,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "timed_out": self._timed_out,
+                "rejected": self._rejected,
+                "async_active": self._async_active,
+                "async_calls": self._async_calls,
+            }
+
+
+_executor: VisionExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_vision_executor() -> VisionExecutor:
+    """Process-wide executor sized from ``VISION_EXECUTOR_WORKERS`` / ``VISION_EXECUTOR_MAX_PENDING``."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = VisionExecutor(
+                workers=int(os.getenv("VISION_EXECUTOR_WORKERS", "4")),
+                max_pending=int(os.getenv("VISION_EXECUTOR_MAX_PENDING", "32")),
+            )
+        return _executor
+
+
+def vision_executor_stats() -> dict[str, Any] | None:
+    with _executor_lock:
+        executor = _executor
+    return executor.stats() if executor is not None else None
@@ -5,6 +5,28 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[2]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def offline_rag(monkeypatch):
+    """Make ``SectionAwareRAGService.from_env`` return a service whose KB is unreachable.
+
+    Every search fails on ``create_session``, so the pipeline runs with empty
+    RAG context instead of calling OCI.
+    """
+    from app.services.rag_service import SectionAwareRAGService
+
+    class _OfflineRuntime:
+        def create_session(self, *_args, **_kwargs):
+            raise RuntimeError("offline")
+
+    monkeypatch.setattr(
+        SectionAwareRAGService,
+        "from_env",
+        classmethod(lambda cls: SectionAwareRAGService(None, "agent", "kb", runtime_client=_OfflineRuntime())),
+    )
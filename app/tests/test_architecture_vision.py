@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import re
 
 from app.agents.architecture_vision import ArchitectureVisionAgent, _ImageMetadata
 
@@ -164,3 +165,143 @@ def test_call_multimodal_uses_larger_token_limit_for_high_resolution_images(monk
     assert calls
     assert calls[0]["max_tokens"] == 8000
     assert calls[0]["temperature"] == 0
+
+
+def test_analysis_cache_replays_confident_results_by_content_hash(monkeypatch) -> None:
+    from io import BytesIO
+
+    from PIL import Image
+
+    from app.agents import architecture_vision
+    from app.services import image_prep
+    from app.services.cache import TieredCache
+
+    monkeypatch.setattr(architecture_vision, "_analysis_cache_instance", TieredCache("vision"))
+    # Keep the decode cache (and its counters) private to this test.
+    monkeypatch.setattr(image_prep, "_cache", image_prep._ImageCache(16 * 1024 * 1024))
+    buf = BytesIO()
+    Image.new("RGB", (1200, 800), "white").save(buf, format="PNG")
+    content = buf.getvalue()
+
+    def _payload(confidence: str) -> str:
+        return json.dumps({
+            "components": {"compute": ["OKE"]},
+            "confidence_assessment": {"overall_confidence": confidence, "reason": "test"},
+        })
+
+    client = _MockMMClient([_payload("low"), _payload("low"), _payload("high"), _payload("medium")])
+    agent = ArchitectureVisionAgent(llm_client=client, low_confidence_retries=0)
+
+    # Low confidence is never stored: the second upload is analysed again.
+    assert agent.analyze("a.png", content, "target")["analysis_confidence"]["overall_confidence"] == "low"
+    assert agent.analyze("a.png", content, "target")["analysis_confidence"]["overall_confidence"] == "low"
+    first = agent.analyze("a.png", content, "target")
+    replayed = agent.analyze("renamed.png", content, "target")
+
+    assert replayed["file_name"] == "renamed.png"
+    assert replayed["architecture_extraction"] == first["architecture_extraction"]
+    assert replayed["image_resolution"] == {"width": 1200, "height": 800}
+    # Role is part of the key, and use_cache=False neither reads nor writes.
+    assert agent.analyze("a.png", content, "current")["analysis_confidence"]["overall_confidence"] == "medium"
+    bypass = ArchitectureVisionAgent(llm_client=_MockMMClient([_payload("low")]), use_cache=False)
+    assert bypass.analyze("a.png", content, "target")["analysis_confidence"]["overall_confidence"] == "low"
+    assert architecture_vision.vision_cache_stats()["hits"] == 1
+
+
+def test_tiled_mode_unions_tile_components_into_the_overview(monkeypatch) -> None:
+    import asyncio
+    from io import BytesIO
+
+    from PIL import Image
+
+    from app.services import image_prep
+
+    monkeypatch.setattr(image_prep, "_cache", image_prep._ImageCache(64 * 1024 * 1024))
+    buf = BytesIO()
+    Image.new("RGB", (5000, 1000), "white").save(buf, format="PNG")
+    prompts: list[str] = []
+
+    class _TileClient:
+        async def amultimodal_completion(self, prompt: str, image_base64: str, mime_type: str, **kwargs) -> str:
+            return self.multimodal_completion(prompt, image_base64, mime_type, **kwargs)
+
+        def multimodal_completion(self, prompt: str, image_base64: str, mime_type: str, **_kwargs) -> str:
+            prompts.append(prompt)
+            tile = re.search(r"tile=(\d+)/", prompt)
+            if tile is None:
+                return json.dumps({
+                    "diagram_summary": {"diagram_type": "oci", "scope": "regional", "primary_intent": "ha"},
+                    "components": {"kubernetes": ["OKE"]},
+                    "confidence_assessment": {"overall_confidence": "low", "reason": "labels too small"},
+                    "deployment_topology": "Two subnets in one region.",
+                })
+            return json.dumps({
+                "diagram_summary": {"diagram_type": "partial"},
+                "components": {"kubernetes": ["oke"], "networking": [f"10.0.{tile.group(1)}.0/24"]},
+                "confidence_assessment": {"overall_confidence": "high", "reason": "clear"},
+            })
+
+    agent = ArchitectureVisionAgent(
+        llm_client=_TileClient(), low_confidence_retries=0, use_cache=False, tiled=True, tile_min_dimension=4096
+    )
+    result = asyncio.run(agent.aanalyze("wide.png", buf.getvalue(), "target"))
+
+    assert result["tiles"] == 4
+    assert len(prompts) == 5
+    extraction = result["architecture_extraction"]
+    assert extraction["components"]["kubernetes"] == ["OKE"]
+    assert extraction["components"]["networking"] == [f"10.0.{i}.0/24" for i in range(1, 5)]
+    assert extraction["diagram_summary"]["diagram_type"] == "oci"
+    assert extraction["deployment_topology"] == "Two subnets in one region."
+    assert result["analysis_confidence"]["overall_confidence"] == "high"
+
+    async def _blocking_call_inside_loop() -> dict:
+        return agent.analyze("wide.png", buf.getvalue(), "target")
+
+    # The blocking path tiles too, and must not need an event loop of its own.
+    prompts.clear()
+    blocking = asyncio.run(_blocking_call_inside_loop())
+    assert len(prompts) == 5
+    assert blocking["architecture_extraction"] == extraction
+
+
+def test_analyze_many_collapses_near_duplicate_uploads(monkeypatch) -> None:
+    from io import BytesIO
+
+    from PIL import Image, ImageDraw
+
+    from app.services import image_prep
+
+    monkeypatch.setattr(image_prep, "_cache", image_prep._ImageCache(64 * 1024 * 1024))
+
+    def _export(size: tuple[int, int], fmt: str, layout: int) -> bytes:
+        image = Image.new("RGB", (1600, 900), "white")
+        draw = ImageDraw.Draw(image)
+        for i in range(4):
+            x = 100 + i * 350 if layout == 0 else 100 + (i % 2) * 700
+            y = 150 if layout == 0 else 100 + (i // 2) * 400
+            draw.rectangle((x, y, x + 250, y + 300), fill="navy")
+        buf = BytesIO()
+        image.resize(size).save(buf, format=fmt)
+        return buf.getvalue()
+
+    files = [
+        ("arch.png", _export((1600, 900), "PNG", 0)),
+        ("arch.jpg", _export((1200, 675), "JPEG", 0)),
+        ("other.png", _export((1600, 900), "PNG", 1)),
+    ]
+    payload = {"components": {"compute": ["VM"]}, "confidence_assessment": {"overall_confidence": "high"}}
+    client = _MockMMClient([json.dumps(payload)] * 2)
+    agent = ArchitectureVisionAgent(llm_client=client, low_confidence_retries=0, use_cache=False)
+
+    result = agent.analyze_many(files, "current")
+
+    # Two model calls (the third response was never needed), three sources recorded.
+    assert next(client._responses, None) is None
+    sources = {entry["file_name"]: entry for entry in result["source_images"]}
+    assert set(sources) == {"arch.png", "arch.jpg", "other.png"}
+    assert sources["arch.jpg"]["duplicate_of"] == "arch.png"
+    assert "duplicate_of" not in sources["other.png"]
+
+    disabled = ArchitectureVisionAgent(llm_client=_MockMMClient([json.dumps(payload)] * 3), use_cache=False, dedup_distance=-1)
+    assert len(disabled.analyze_many(files, "current")["source_images"]) == 3
@@ -0,0 +1,70 @@
+"""Tests for the generated-artifact store."""
+
+from __future__ import annotations
+
+import time
+
+from app.services.artifact_store import ArtifactStore
+
+_NAME = "output_ab12cd34ef56ab12cd34ef56ab12cd34.docx"
+
+
+def _staged(store: ArtifactStore, name: str, size: int = 10):
+    path = store.staging_dir / name
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_add_shards_file_and_indexes_metadata(tmp_path) -> None:
+    store = ArtifactStore(tmp_path / "artifacts")
+    created = time.mktime((2026, 3, 4, 12, 0, 0, 0, 0, -1))
+
+    artifact = store.add(_staged(store, _NAME), job_id="job-1", created_at=created)
+
+    day = time.strftime("%Y-%m-%d", time.gmtime(created))
+    assert artifact.path == tmp_path / "artifacts" / day / "ab" / _NAME
+    assert artifact.path.read_bytes() == b"x" * 10
+    assert not (store.staging_dir / _NAME).exists()
+    found = store.get(_NAME)
+    assert found is not None
+    assert (found.size, found.job_id, found.etag) == (10, "job-1", artifact.etag)
+    assert found.media_type.endswith("wordprocessingml.document")
+
+    # A file removed behind the store's back drops out of the index.
+    artifact.path.unlink()
+    assert store.get(_NAME) is None
+    assert store.stats()["count"] == 0
+
+
+def test_evict_applies_ttl_then_total_size(tmp_path) -> None:
+    store = ArtifactStore(tmp_path / "artifacts", ttl_seconds=100, max_bytes=25)
+    now = time.time()
+    store.add(_staged(store, "output_00expired.md"), created_at=now - 500)
+    store.add(_staged(store, "output_01oldest.md"), created_at=now - 30)
+    store.add(_staged(store, "output_02middle.md"), created_at=now - 20)
+    store.add(_staged(store, "output_03newest.md"), created_at=now - 10)
+
+    assert store.evict(now) == 2
+
+    assert store.get("output_00expired.md") is None
+    assert store.get("output_01oldest.md") is None
+    assert store.get("output_02middle.md") is not None
+    assert store.get("output_03newest.md") is not None
+    assert store.stats()["bytes"] == 20
+    # Emptied shard directories are removed with their last artifact.
+    expired_day = time.strftime("%Y-%m-%d", time.gmtime(now - 500))
+    assert not (tmp_path / "artifacts" / expired_day / "00").exists()
+
+
+def test_adopt_moves_loose_outputs_into_the_store(tmp_path) -> None:
+    legacy = tmp_path / "app"
+    legacy.mkdir()
+    (legacy / "output_aa.docx").write_bytes(b"docx")
+    (legacy / "output_bb.md").write_text("# SoW", encoding="utf-8")
+    (legacy / "main.py").write_text("", encoding="utf-8")
+    store = ArtifactStore(tmp_path / "artifacts")
+
+    assert store.adopt(legacy) == 2
+
+    assert sorted(p.name for p in legacy.iterdir()) == ["main.py"]
+    assert store.get("output_bb.md").path.read_text(encoding="utf-8") == "# SoW"
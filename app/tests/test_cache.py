@@ -0,0 +1,57 @@
+"""Tests for the two-tier response cache."""
+
+from __future__ import annotations
+
+from app.services.cache import TieredCache, digest
+
+
+def test_tiered_cache_persists_to_disk_and_evicts_lru(tmp_path) -> None:
+    db_path = tmp_path / "cache.sqlite3"
+    cache = TieredCache("test", max_entries=2, db_path=db_path, max_disk_bytes=60)
+
+    cache.put("a", "x" * 20)
+    cache.put("b", "y" * 20)
+    assert cache.get("a") == "x" * 20  # refresh "a" so "b" is least recently used
+    cache.put("c", "z" * 20)  # 3 × 22 bytes > 60 → evict "b" from disk
+
+    reopened = TieredCache("test", max_entries=2, db_path=db_path, max_disk_bytes=60)
+    assert reopened.get("a") == "x" * 20
+    assert reopened.get("b") is None
+    assert reopened.get("c") == "z" * 20
+    stats = reopened.stats()
+    assert stats["hits_disk"] == 2 and stats["misses"] == 1
+    assert cache.stats()["disk_evictions"] == 1
+
+
+def test_tiered_cache_expires_entries_after_ttl(monkeypatch) -> None:
+    from app.services import cache as cache_module
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    cache = TieredCache("test", ttl_seconds=10)
+    cache.put(digest("model", 0.2, "prompt"), "text")
+
+    now[0] += 5
+    assert cache.get(digest("model", 0.2, "prompt")) == "text"
+    now[0] += 10
+    assert cache.get(digest("model", 0.2, "prompt")) is None
+
+
+def test_tiered_cache_async_access_and_low_water_eviction(tmp_path) -> None:
+    import asyncio
+
+    db_path = tmp_path / "cache.sqlite3"
+    cache = TieredCache("test", max_entries=1, db_path=db_path, max_disk_bytes=100)
+
+    async def _fill() -> None:
+        for key in "abcde":
+            await cache.aput(key, key * 20)  # 22 bytes each
+
+    asyncio.run(_fill())
+    # 5 × 22 > 100 → drained to the 90-byte low-water mark, evicting "a" only.
+    assert cache.stats()["disk_evictions"] == 1
+    assert asyncio.run(cache.aget("a")) is None
+    assert asyncio.run(cache.aget("b")) == "b" * 20  # from disk; memory holds only "e"
+    assert cache.get("c", disk=False) is None
+    stats = cache.stats()
+    assert stats["hits_disk"] == 1 and stats["misses"] == 2
@@ -0,0 +1,243 @@
+"""Tests for DocumentBuilder template handling."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import zipfile
+from pathlib import Path
+
+import pytest
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+
+from app.services import doc_builder
+from app.services.doc_builder import (
+    SECTION_HEADING_KEYWORDS,
+    DocumentBuilder,
+    IncrementalBuildError,
+    register_section,
+    section_strategy,
+)
+
+
+def _write_template(path, heading: str) -> None:
+    doc = Document()
+    doc.add_heading(heading, level=1)
+    doc.add_paragraph("Possible arias to include for Customer1 on Project1.")
+    doc.save(str(path))
+
+
+_W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def _document_xml(output_dir, name: str) -> str:
+    with zipfile.ZipFile(output_dir / name) as archive:
+        return archive.read("word/document.xml").decode("utf-8")
+
+
+def test_template_is_parsed_once_and_reloaded_when_it_changes(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(doc_builder, "_template_cache", doc_builder._TemplateCache())
+    template = tmp_path / "sow_template.docx"
+    _write_template(template, "Project Overview")
+    builder = DocumentBuilder(template, customer_name="Acme", project_name="Atlas")
+    sections = [("PROJECT OVERVIEW", "Overview body.")]
+
+    first = _document_xml(tmp_path, builder.build(sections, tmp_path))
+    second = _document_xml(tmp_path, builder.build(sections, tmp_path))
+
+    assert first == second
+    assert "Possible areas to include for Acme on Atlas." in first
+    assert doc_builder.template_cache_stats() == {"templates": 1, "hits": 1, "loads": 1}
+
+    # Touching the file without changing its content keeps the parsed tree.
+    os.utime(template, ns=(1, 1))
+    builder.build(sections, tmp_path)
+    assert doc_builder.template_cache_stats()["loads"] == 1
+
+    _write_template(template, "Scope Overview")
+    third = _document_xml(tmp_path, builder.build(sections, tmp_path))
+    assert "Scope Overview" in third
+    assert doc_builder.template_cache_stats()["loads"] == 2
+
+
+def test_heading_index_follows_sections_injected_during_the_build(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(doc_builder, "_template_cache", doc_builder._TemplateCache())
+    template = tmp_path / "sow_template.docx"
+    doc = Document()
+    for heading in ("Project Overview", "High Availability", "Security", "Closing Feedback"):
+        doc.add_heading(heading, level=1)
+        doc.add_paragraph("<add information here>")
+    doc.save(str(template))
+    builder = DocumentBuilder(template)
+
+    name = builder.build(
+        [
+            ("HIGH AVAILABILITY", "HA body."),
+            # No template heading: inserted after HA, then DR after the new heading.
+            ("BACKUP STRATEGY", "Backup body."),
+            ("DISASTER RECOVERY", "DR body."),
+            ("SECURITY", "Security body."),
+        ],
+        tmp_path,
+        excluded_sections=frozenset({"CLOSING FEEDBACK"}),
+    )
+
+    paragraphs = [p.text for p in Document(str(tmp_path / name)).paragraphs if p.text]
+    assert paragraphs == [
+        "Project Overview",
+        "<add information here>",
+        "High Availability",
+        "HA body.",
+        "Backup Strategy",
+        "Backup body.",
+        "Disaster Recovery",
+        "DR body.",
+        "Security",
+        "Security body.",
+    ]
+
+
+def test_template_rewrite_covers_text_boxes_fields_and_split_runs() -> None:
+    doc = Document()
+    body = doc.element.body
+    for xml in (
+        # Split-run capitalisation error + a blank customer slot after a known prefix.
+        "<w:p><w:r><w:t>Cu</w:t></w:r><w:r><w:t>R</w:t></w:r><w:r><w:t>rently agreed for the </w:t></w:r>"
+        "<w:fldSimple w:instr='DOCPROPERTY 01_Customer'><w:r><w:t> </w:t></w:r></w:fldSimple></w:p>",
+        # Placeholder tokens inside a text box.
+        "<w:p><w:r><w:pict><w:txbxContent><w:p><w:r><w:t>Customer1 / Project1</w:t></w:r></w:p>"
+        "</w:txbxContent></w:pict></w:r></w:p>",
+        "<w:sdt><w:sdtContent><w:p><w:r><w:t>Dropdown Options</w:t></w:r></w:p></w:sdtContent></w:sdt>",
+    ):
+        body.insert(len(body) - 1, parse_xml(f"<w:body {_W}>{xml}</w:body>")[0])
+    builder = DocumentBuilder(Path("unused.docx"), customer_name="Acme", project_name="Atlas")
+
+    builder._normalize_template_artifacts(doc)
+    builder._substitute_names(doc)
+
+    texts = ["".join(t.text or "" for t in p.iter(qn("w:t"))) for p in body.iterchildren(qn("w:p"))]
+    assert texts == ["Currently agreed for the Acme", "Acme / Atlas"]
+    assert not list(body.iter(qn("w:sdt")))
+
+
+def _scope_template(path) -> None:
+    doc = Document()
+    doc.add_heading("Project Overview", level=1)
+    doc.add_paragraph("Overview intro for Customer1.")
+    doc.add_heading("Scope", level=3)
+    for label in ("Initial Scope", "Agreed outcome"):
+        box = f"<w:p {_W}><w:pPr><w:pBdr><w:top w:val='single'/></w:pBdr><w:shd w:fill='CCCCCC'/></w:pPr>"
+        doc.element.body.insert(len(doc.element.body) - 1, parse_xml(f"{box}<w:r><w:t>{label}</w:t></w:r></w:p>"))
+        doc.add_paragraph("To be agreed with Customer1")
+    doc.add_heading("High Availability", level=1)
+    doc.add_paragraph("<add information here>")
+    doc.add_heading("Major Project Milestones", level=1)
+    table = doc.add_table(rows=1, cols=4)
+    for cell, header in zip(table.rows[0].cells, ("Milestone", "Target Date", "Completed", "Comments")):
+        cell.text = header
+    doc.add_heading("Security", level=1)
+    doc.add_paragraph("<add information here>")
+    doc.save(str(path))
+
+
+def test_rebuild_replaces_only_changed_sections(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(doc_builder, "_template_cache", doc_builder._TemplateCache())
+    template = tmp_path / "sow_template.docx"
+    _scope_template(template)
+    builder = DocumentBuilder(template, customer_name="Acme", project_name="Atlas")
+
+    def milestones(*names: str) -> str:
+        return json.dumps({"milestones": [{"milestone": name, "target_date": "Q1"} for name in names]})
+
+    sections = {
+        "PROJECT OVERVIEW": "Overview body.",
+        "SCOPE": "Initial Scope:\nLift and shift.\n\nAgreed outcome:\nRun on OCI.\nWith DR.",
+        "HIGH AVAILABILITY": "HA body.",
+        "BACKUP STRATEGY": "Backup body.",
+        "MILESTONE PLAN": milestones("Kickoff", "Go-live"),
+        "SECURITY": "",
+    }
+    base = builder.build(list(sections.items()), tmp_path)
+    changes = {
+        "SCOPE": "Initial Scope:\nRe-platform.",
+        "HIGH AVAILABILITY": "HA v2.\n\nMore HA.",
+        "BACKUP STRATEGY": "Backup v2.",
+        "MILESTONE PLAN": milestones("Design"),
+        # Empty in the first build: placed the way a full build places it.
+        "SECURITY": "Security body.",
+    }
+    loads = doc_builder.template_cache_stats()["loads"]
+
+    rebuilt = builder.rebuild(tmp_path / base, list(changes.items()), tmp_path)
+    full = builder.build(list({**sections, **changes}.items()), tmp_path)
+
+    def without_marks(name: str) -> str:
+        return re.sub(r"<w:bookmark(Start|End) [^>]*/>", "", _document_xml(tmp_path, name))
+
+    assert without_marks(rebuilt) == without_marks(full)
+    text = [p.text for p in Document(str(tmp_path / rebuilt)).paragraphs]
+    assert "Re-platform." in text and "Lift and shift." not in text
+    assert "To be agreed with Acme" in text  # restored template box text, names substituted
+    assert doc_builder.template_cache_stats()["loads"] == loads
+    # The base document is left as it was.
+    assert "HA body." in [p.text for p in Document(str(tmp_path / base)).paragraphs]
+
+
+def test_rebuild_restores_sections_excluded_from_the_base(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(doc_builder, "_template_cache", doc_builder._TemplateCache())
+    template = tmp_path / "sow_template.docx"
+    _scope_template(template)
+    builder = DocumentBuilder(template, customer_name="Acme", project_name="Atlas")
+    sections = {"PROJECT OVERVIEW": "Overview body.", "HIGH AVAILABILITY": "HA body.", "SECURITY": "Security body."}
+    base = builder.build(
+        list(sections.items()), tmp_path, excluded_sections=frozenset({"HIGH AVAILABILITY", "SECURITY"})
+    )
+
+    rebuilt = builder.rebuild(
+        tmp_path / base, [("HIGH AVAILABILITY", "HA body."), ("SECURITY", "Security body.")], tmp_path
+    )
+    full = builder.build(list(sections.items()), tmp_path)
+
+    def without_marks(name: str) -> str:
+        return re.sub(r"<w:bookmark(Start|End) [^>]*/>", "", _document_xml(tmp_path, name))
+
+    # Each heading is back in its template position, not appended at the end.
+    assert without_marks(rebuilt) == without_marks(full)
+
+
+def test_rebuild_rejects_documents_without_section_markers(tmp_path) -> None:
+    template = tmp_path / "sow_template.docx"
+    _write_template(template, "Project Overview")
+    Document(str(template)).save(str(tmp_path / "legacy.docx"))
+    builder = DocumentBuilder(template)
+
+    with pytest.raises(IncrementalBuildError):
+        builder.rebuild(tmp_path / "legacy.docx", [("PROJECT OVERVIEW", "New body.")], tmp_path)
+
+
+def test_registered_section_strategy_drives_injection(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(doc_builder, "_template_cache", doc_builder._TemplateCache())
+    monkeypatch.setattr(doc_builder, "_SECTION_STRATEGIES", dict(doc_builder._SECTION_STRATEGIES))
+    monkeypatch.setattr(doc_builder, "SECTION_HEADING_KEYWORDS", dict(SECTION_HEADING_KEYWORDS))
+    template = tmp_path / "sow_template.docx"
+    _write_template(template, "Project Overview")
+    rendered = []
+
+    def shout(builder, doc, anchor_elem, section_name, content):
+        rendered.append(section_name)
+        builder._inject_blocks_after_element(anchor_elem, content.upper())
+
+    strategy = register_section("EXEC SUMMARY", "=project overview", renderer=shout, single_sentence=True)
+
+    assert section_strategy("Exec Summary") is strategy
+    assert strategy.matcher == doc_builder.HeadingMatcher("project overview", exact=True)
+    name = DocumentBuilder(template).build([("EXEC SUMMARY", "first.\n\nsecond.")], tmp_path)
+    paragraphs = [p.text for p in Document(str(tmp_path / name)).paragraphs]
+    assert rendered == ["EXEC SUMMARY"]
+    assert "FIRST." in paragraphs and "SECOND." not in paragraphs
+    # Unregistered sections fall back to plain paragraphs under a same-named heading.
+    assert section_strategy("Glossary").matcher.keyword == "glossary"
+    assert section_strategy("Glossary").renderer is None
@@ -0,0 +1,124 @@
+"""Tests for the shared diagram decode/resize stage."""
+
+from __future__ import annotations
+
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from app.services import image_prep
+from app.services.image_prep import DOCX_IMAGE_MAX_WIDTH_PX, clear_image_cache, image_cache_stats, prepare_image
+
+
+def _diagram(width: int, height: int) -> bytes:
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    for x in range(0, width, 200):
+        draw.rectangle((x + 20, 40, x + 160, 140), outline="navy", width=4)
+        draw.text((x + 40, 80), "OKE", fill="black")
+    buf = BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_prepare_image_builds_both_variants_from_one_decode(monkeypatch) -> None:
+    clear_image_cache()
+    content = _diagram(3200, 1800)
+    decodes = []
+    real_decode = image_prep._decode
+    monkeypatch.setattr(image_prep, "_decode", lambda *args: decodes.append(args[2]) or real_decode(*args))
+
+    prepared = prepare_image(content, "arch.png", max_dimension=2048)
+
+    assert (prepared.source_width, prepared.source_height) == (3200, 1800)
+    assert (prepared.vision.width, prepared.vision.height, prepared.vision.fmt) == (2048, 1152, "png")
+    assert Image.open(BytesIO(prepared.vision.data)).size == (2048, 1152)
+    assert prepared.docx.width == DOCX_IMAGE_MAX_WIDTH_PX
+    assert Image.open(BytesIO(prepared.docx.data)).width == DOCX_IMAGE_MAX_WIDTH_PX
+    assert len(prepared.docx.data) < len(content)
+
+    # The upload and its downsampled vision variant both resolve to the cached entry.
+    assert prepare_image(content, "arch.png", max_dimension=2048) is prepared
+    assert prepare_image(prepared.vision.data, "arch.png", max_dimension=2048) is prepared
+    assert decodes == ["arch.png"]
+    assert image_cache_stats()["hits"] == 2
+
+
+def test_prepare_image_keeps_small_uploads_and_rejects_non_images() -> None:
+    clear_image_cache()
+    content = _diagram(800, 400)
+
+    prepared = prepare_image(content, "small.png")
+
+    assert prepared.vision.data is content
+    # Already narrower than the page: only re-encoded, and only when that is smaller.
+    assert (prepared.docx.width, prepared.docx.height) == (800, 400)
+    assert len(prepared.docx.data) <= len(content)
+    assert prepared.vision.mime_type == "image/png"
+    assert prepare_image(b"not an image", "notes.txt") is None
+
+
+def test_prepare_image_applies_exif_orientation(monkeypatch) -> None:
+    clear_image_cache()
+    monkeypatch.setattr(image_prep, "VISION_PAYLOAD_MAX_BYTES", 64 * 1024 * 1024)
+    # A phone photo: stored 4032x3024 landscape, tagged to display rotated 90° (portrait).
+    stored = Image.new("RGB", (4032, 3024), "white")
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buf = BytesIO()
+    stored.save(buf, format="JPEG", exif=exif.tobytes())
+
+    prepared = prepare_image(buf.getvalue(), "photo.jpg", max_dimension=2268)
+
+    assert (prepared.source_width, prepared.source_height) == (3024, 4032)
+    assert (prepared.vision.width, prepared.vision.height) == (1701, 2268)
+    assert prepared.docx.width == DOCX_IMAGE_MAX_WIDTH_PX and prepared.docx.height == 2200
+    for variant in (prepared.vision, prepared.docx):
+        decoded = Image.open(BytesIO(variant.data))
+        assert decoded.size == (variant.width, variant.height)
+        assert decoded.getexif().get(0x0112, 1) == 1
+    assert [t.height > t.width for t in image_prep.tile_image(buf.getvalue(), "photo.jpg", tile_size=4096)] == [True]
+
+
+def test_tile_image_covers_the_source_with_overlapping_tiles() -> None:
+    content = _diagram(5000, 1200)
+
+    tiles = image_prep.tile_image(content, "wide.png", tile_size=1536, overlap=0.15)
+
+    # ceil(5000 * 1.15 / 1536) = 4 columns, one row; each tile overlaps its neighbour.
+    assert len(tiles) == 4
+    assert {(t.width, t.height) for t in tiles} == {(1438, 1200)}
+    assert 4 * 1438 > 5000 * 1.1
+    assert all(Image.open(BytesIO(t.data)).size == (t.width, t.height) for t in tiles)
+
+    # Past max_tiles the grid coarsens and tiles are scaled back to tile_size.
+    capped = image_prep.tile_image(_diagram(4000, 4000), "big.png", tile_size=1024, max_tiles=4)
+    assert len(capped) == 4
+    assert max(max(t.width, t.height) for t in capped) <= 1024
+    assert image_prep.tile_image(b"not an image", "notes.txt") == []
+
+
+def test_vision_variant_is_transcoded_to_the_payload_budget(monkeypatch) -> None:
+    import random
+
+    clear_image_cache()
+    monkeypatch.setattr(image_prep, "VISION_PAYLOAD_MAX_BYTES", 15_000)
+    before = image_cache_stats()
+
+    # A flat diagram keeps lossless or palette PNG; a noisy screenshot becomes JPEG.
+    diagram = _diagram(3000, 2000)
+    rng = random.Random(7)
+    noisy = Image.frombytes("RGB", (900, 900), rng.randbytes(900 * 900 * 3))
+    buf = BytesIO()
+    noisy.save(buf, format="PNG")
+
+    flat = prepare_image(diagram, "arch.png", max_dimension=2048)
+    photo = prepare_image(buf.getvalue(), "photo.png")
+
+    assert flat.vision.fmt == "png" and len(flat.vision.data) <= 15_000
+    assert Image.open(BytesIO(flat.vision.data)).size == (flat.vision.width, flat.vision.height)
+    assert photo.vision.fmt == "jpeg" and photo.vision.mime_type == "image/jpeg"
+    assert len(photo.vision.data) < len(buf.getvalue())
+    stats = image_cache_stats()
+    assert stats["vision_transcoded"] - before["vision_transcoded"] == 2
+    assert stats["vision_bytes_saved"] > before["vision_bytes_saved"]
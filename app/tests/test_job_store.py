@@ -0,0 +1,84 @@
+"""Tests for the persistent SoW job store and runner."""
+
+from __future__ import annotations
+
+import time
+
+from app.services.job_store import JOB_FAILED, JOB_RUNNING, JOB_SUCCEEDED, JobCheckpoint, JobRunner, JobStore
+
+
+def _wait_for(store: JobStore, job_id: str, status: str, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job is not None and job.status == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not reach {status}")
+
+
+def test_runner_resumes_interrupted_job_from_checkpoints(tmp_path) -> None:
+    db_path = tmp_path / "jobs.sqlite3"
+    store = JobStore(db_path)
+    job = store.create("sow", {"context": {"client": "Cegid"}}, {"target": [("t.png", b"\x89PNG")]})
+    JobCheckpoint(store, job.id).put("section:SCOPE", "Saved scope.")
+    # Simulate a worker that died mid-run.
+    store.mark_running(job.id)
+    assert store.get(job.id).status == JOB_RUNNING
+
+    seen = {}
+
+    async def _execute(record, job_store):
+        checkpoint = JobCheckpoint(job_store, record.id)
+        seen["scope"] = checkpoint.get("section:SCOPE")
+        seen["inputs"] = job_store.inputs(record.id)
+        return {"file": "output_x.docx", "markdown_file": "output_y.md"}
+
+    # A fresh store/runner on the same file stands in for a restarted process.
+    runner = JobRunner(JobStore(db_path), _execute, workers=1)
+    runner.start()
+
+    finished = _wait_for(runner.store, job.id, JOB_SUCCEEDED)
+    assert finished.result == {"file": "output_x.docx", "markdown_file": "output_y.md"}
+    assert finished.attempts == 2
+    assert "section:SCOPE" in finished.checkpoints
+    assert seen == {"scope": "Saved scope.", "inputs": {"target": [("t.png", b"\x89PNG")]}}
+    # The diagrams are dropped once the job succeeded; the record stays until purged.
+    assert runner.store.inputs(job.id) == {}
+
+
+def test_runner_fails_job_interrupted_max_attempts_times(tmp_path) -> None:
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job = store.create("sow", {"context": {}}, {})
+    # Two earlier runs died mid-job (e.g. OOM-killed the worker).
+    store.mark_running(job.id)
+    store.mark_running(job.id)
+    executed = []
+
+    async def _execute(record, _job_store):
+        executed.append(record.id)
+        return {}
+
+    runner = JobRunner(store, _execute, workers=1, max_attempts=2)
+    runner.start()
+
+    failed = _wait_for(store, job.id, JOB_FAILED)
+    assert failed.attempts == 2
+    assert "Interrupted 2 times" in failed.error
+    assert executed == []
+
+
+def test_purge_drops_expired_finished_jobs_with_inputs_and_checkpoints(tmp_path) -> None:
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    done = store.create("sow", {"context": {}}, {"target": [("t.png", b"\x89PNG")]})
+    JobCheckpoint(store, done.id).put("metadata", {"client": "Cegid"})
+    store.update(done.id, status=JOB_SUCCEEDED)
+    pending = store.create("sow", {"context": {}}, {"target": [("t.png", b"\x89PNG")]})
+
+    assert store.purge(ttl_seconds=3600) == 0
+    assert store.purge(ttl_seconds=3600, now=time.time() + 7200) == 1
+
+    assert store.get(done.id) is None
+    assert store.inputs(done.id) == {} and store.get_checkpoint(done.id, "metadata") is None
+    # Unfinished jobs are never purged, however old.
+    assert store.get(pending.id) is not None and store.inputs(pending.id)
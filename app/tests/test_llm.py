@@ -81,3 +81,106 @@ def test_llm_config_respects_oci_max_tokens(monkeypatch) -> None:
     config = LLMConfig.from_env()
 
     assert config.max_tokens == 9000
+
+
+def test_client_registry_reuses_client_until_config_changes(monkeypatch, tmp_path) -> None:
+    from app.services import oci_clients
+
+    config_file = tmp_path / "config"
+    config_file.write_text("[DEFAULT]\n", encoding="utf-8")
+    key_file = tmp_path / "key.pem"
+    key_file.write_text("key-v1", encoding="utf-8")
+
+    class _FakeSession:
+        def __init__(self) -> None:
+            self.adapters = {}
+
+        def mount(self, prefix, adapter) -> None:
+            self.adapters[prefix] = adapter
+
+        def close(self) -> None:
+            pass
+
+    class _FakeSDKClient:
+        def __init__(self, config, **kwargs) -> None:
+            self.base_client = SimpleNamespace(session=_FakeSession(), config=config)
+
+    monkeypatch.setattr(
+        oci_clients.oci.config,
+        "from_file",
+        lambda file_location, profile_name: {"key_file": str(key_file)},
+    )
+    registry = oci_clients.OCIClientRegistry(pool_maxsize=2)
+    kwargs = dict(
+        config_file=str(config_file),
+        profile="DEFAULT",
+        endpoint="https://example.com",
+        timeout_connect=10,
+        timeout_read=120,
+    )
+
+    first = registry.get(_FakeSDKClient, **kwargs)
+    assert registry.get(_FakeSDKClient, **kwargs) is first
+    assert first.base_client.session.adapters["https://"]._pool_maxsize == 2
+
+    key_file.write_text("key-v2-rotated", encoding="utf-8")
+
+    rebuilt = registry.get(_FakeSDKClient, **kwargs)
+    assert rebuilt is not first
+    assert registry.stats()["invalidations"] == 1
+
+
+def test_acall_llm_awaits_client_and_retries_transient_errors(monkeypatch) -> None:
+    import asyncio
+
+    calls = []
+
+    class _FakeAsyncClient:
+        async def chat(self, details):
+            calls.append(details)
+            if len(calls) == 1:
+                raise llm.oci.exceptions.ServiceError(429, "TooManyRequests", {}, "throttled")
+            return SimpleNamespace()
+
+    async def _no_sleep(_seconds):
+        return None
+
+    monkeypatch.delenv("MOCK_LLM_RESPONSE", raising=False)
+    monkeypatch.setattr(llm, "_build_async_client", lambda config: _FakeAsyncClient())
+    monkeypatch.setattr(llm.asyncio, "sleep", _no_sleep)
+    monkeypatch.setattr(llm, "_extract_text", lambda response: "ok")
+
+    out = asyncio.run(llm.acall_llm("sys", "user"))
+
+    assert out == "ok"
+    assert len(calls) == 2
+    assert calls[0].chat_request.top_k >= 1
+
+
+def test_acall_llm_replays_cached_response_for_identical_prompt(monkeypatch, tmp_path) -> None:
+    import asyncio
+
+    from app.services.cache import TieredCache
+
+    calls = []
+
+    class _FakeAsyncClient:
+        async def chat(self, details):
+            calls.append(details)
+            return SimpleNamespace()
+
+    monkeypatch.delenv("MOCK_LLM_RESPONSE", raising=False)
+    monkeypatch.setattr(llm, "_response_cache_instance", TieredCache("llm", db_path=tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(llm, "_build_async_client", lambda config: _FakeAsyncClient())
+    monkeypatch.setattr(llm, "_extract_text", lambda response: f"draft {len(calls)}")
+
+    first = asyncio.run(llm.acall_llm("sys", "user", use_cache=True))
+    second = asyncio.run(llm.acall_llm("sys", "user", use_cache=True))
+    bypass = asyncio.run(llm.acall_llm("sys", "user", use_cache=False))
+    other = asyncio.run(llm.acall_llm("sys", "other user", use_cache=True))
+
+    assert first == second == "draft 1"
+    assert bypass == "draft 2"
+    assert other == "draft 3"
+    assert len(calls) == 3
+    assert llm.llm_cache_stats()["hits"] == 1
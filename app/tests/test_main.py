@@ -2,11 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 
+import pytest
+from docx import Document
 from fastapi.testclient import TestClient
 
+from app import main as main_module
 from app.main import app
+from app.services.artifact_store import ArtifactStore, get_artifact_store
+from app.services.doc_builder import DocumentBuilder
+from app.services.render_pool import RenderPool
 
 
 def test_health() -> None:
@@ -18,13 +25,15 @@ def test_health() -> None:
 
 
 def test_generate_sow_with_mock_llm(monkeypatch) -> None:
-    """Generate endpoint should create docx and markdown outputs in app folder."""
+    """Generate endpoint should store docx and markdown outputs in the artifact store."""
     dynamic_sections = 11
     responses = iter(["Generated section content."] * dynamic_sections + ["Reviewed full document."])
 
-    mock_call = lambda *_args, **_kwargs: next(responses)
-    monkeypatch.setattr("app.agents.writer.call_llm", mock_call)
-    monkeypatch.setattr("app.agents.qa.call_llm", mock_call)
+    async def mock_call(*_args, **_kwargs):
+        return next(responses)
+
+    monkeypatch.setattr("app.agents.writer.acall_llm", mock_call)
+    monkeypatch.setattr("app.agents.qa.acall_llm", mock_call)
 
     client = TestClient(app)
     payload = {
@@ -45,8 +54,9 @@ def test_generate_sow_with_mock_llm(monkeypatch) -> None:
     assert body["file"].endswith(".docx")
     assert body["markdown_file"].startswith("output_")
     assert body["markdown_file"].endswith(".md")
-    assert (Path("app") / body["file"]).exists()
-    assert (Path("app") / body["markdown_file"]).exists()
+    store = get_artifact_store(Path("app").resolve())
+    assert store.get(body["file"]) is not None
+    assert store.get(body["markdown_file"]) is not None
 
 
 def test_download_generated_files(monkeypatch) -> None:
@@ -54,9 +64,11 @@ def test_download_generated_files(monkeypatch) -> None:
     dynamic_sections = 11
     responses = iter(["Generated section content."] * dynamic_sections + ["Reviewed full document."])
 
-    mock_call = lambda *_args, **_kwargs: next(responses)
-    monkeypatch.setattr("app.agents.writer.call_llm", mock_call)
-    monkeypatch.setattr("app.agents.qa.call_llm", mock_call)
+    async def mock_call(*_args, **_kwargs):
+        return next(responses)
+
+    monkeypatch.setattr("app.agents.writer.acall_llm", mock_call)
+    monkeypatch.setattr("app.agents.qa.acall_llm", mock_call)
 
     client = TestClient(app)
     payload = {
@@ -80,6 +92,109 @@ def test_download_generated_files(monkeypatch) -> None:
     assert md_response.headers["content-type"].startswith("text/markdown")
 
 
+@pytest.mark.usefixtures("offline_rag")
+def test_generate_sow_returns_docx_body_when_accept_requests_it(monkeypatch, tmp_path) -> None:
+    """Asking for the DOCX media type should return the document itself, without writing files."""
+    from app.services import artifact_store
+
+    def _reply(text):
+        async def mock_call(*_args, **_kwargs):
+            return text
+        return mock_call
+
+    monkeypatch.setattr("app.agents.writer.acall_llm", _reply("Generated section content."))
+    monkeypatch.setattr("app.agents.qa.acall_llm", _reply("Reviewed full document."))
+    monkeypatch.setattr("app.agents.metadata_inference.acall_llm", _reply("{}"))
+    # A fresh process-wide store under tmp_path, so the working tree is untouched.
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(artifact_store, "_store", None)
+
+    client = TestClient(app)
+    payload = {
+        "client": "Cegid",
+        "project_name": "xrp Modernization",
+        "cloud": "OCI",
+        "scope": "Refactor monolith to microservices",
+        "duration": "4 months",
+        "services": ["OKE", "MySQL"],
+    }
+    docx_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    store = main_module._artifact_store()
+    assert store.root == tmp_path / "artifacts"
+
+    response = client.post("/generate-sow", json=payload, headers={"Accept": docx_type})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(docx_type)
+    assert response.headers["content-disposition"].startswith('attachment; filename="output_')
+    assert response.content[:2] == b"PK"
+    assert store.stats()["count"] == 0
+    assert not any(store.staging_dir.iterdir())
+
+
+def test_download_supports_etag_and_range(monkeypatch, tmp_path) -> None:
+    """Downloads should revalidate with If-None-Match and serve byte ranges."""
+    store = ArtifactStore(tmp_path / "artifacts")
+    staged = store.staging_dir / "output_0123.md"
+    staged.write_text("# Statement of Work", encoding="utf-8")
+    artifact = store.add(staged)
+    monkeypatch.setattr(main_module, "_artifact_store", lambda: store)
+    client = TestClient(app)
+
+    full = client.get("/files/output_0123.md")
+    assert full.status_code == 200
+    assert full.headers["etag"] == artifact.etag
+    assert full.text == "# Statement of Work"
+
+    assert client.get("/files/output_0123.md", headers={"If-None-Match": artifact.etag}).status_code == 304
+
+    partial = client.get("/files/output_0123.md", headers={"Range": "bytes=2-10"})
+    assert partial.status_code == 206
+    assert partial.text == "Statement"
+    assert partial.headers["content-range"] == "bytes 2-10/19"
+
+    assert client.get("/files/output_missing.md").status_code == 404
+
+
+def test_update_sections_rebuilds_a_stored_docx(monkeypatch, tmp_path) -> None:
+    """Section updates should patch a stored DOCX into a new artifact."""
+    template = tmp_path / "templates" / "sow_template.docx"
+    template.parent.mkdir()
+    doc = Document()
+    for heading in ("Project Overview", "Security"):
+        doc.add_heading(heading, level=1)
+        doc.add_paragraph("<add information here>")
+    doc.save(str(template))
+    store = ArtifactStore(tmp_path / "artifacts")
+    builder = DocumentBuilder(template)
+    base = store.add(
+        store.staging_dir / builder.build([("PROJECT OVERVIEW", "Overview."), ("SECURITY", "Old.")], store.staging_dir)
+    )
+    monkeypatch.setattr(main_module, "_artifact_store", lambda: store)
+    monkeypatch.setattr(main_module, "_template_path", lambda _root: template)
+    pool = RenderPool(template, workers=0)
+    monkeypatch.setattr(main_module, "get_render_pool", lambda _path: pool)
+    client = TestClient(app)
+
+    response = client.post(f"/files/{base.name}/sections", json={"sections": {"security": "New."}})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["base_file"] == base.name
+    rebuilt = store.get(body["file"])
+    assert rebuilt is not None
+    assert [p.text for p in Document(str(rebuilt.path)).paragraphs if p.text] == [
+        "Project Overview", "Overview.", "Security", "New.",
+    ]
+    assert store.get(base.name) is not None
+
+    legacy = store.staging_dir / "output_legacy.docx"
+    doc.save(str(legacy))
+    store.add(legacy)
+    assert client.post("/files/output_legacy.docx/sections", json={"sections": {"SECURITY": "x"}}).status_code == 409
+    pool.shutdown()
+
+
 def test_cors_preflight_health() -> None:
     """CORS preflight should be accepted for browser clients."""
     client = TestClient(app)
@@ -99,9 +214,11 @@ def test_generate_sow_allows_known_services_when_service_list_not_provided(monke
     dynamic_sections = 11
     responses = iter(["Uses OKE, MySQL, and API Gateway."] * dynamic_sections + ["Reviewed full document."])
 
-    mock_call = lambda *_args, **_kwargs: next(responses)
-    monkeypatch.setattr("app.agents.writer.call_llm", mock_call)
-    monkeypatch.setattr("app.agents.qa.call_llm", mock_call)
+    async def mock_call(*_args, **_kwargs):
+        return next(responses)
+
+    monkeypatch.setattr("app.agents.writer.acall_llm", mock_call)
+    monkeypatch.setattr("app.agents.qa.acall_llm", mock_call)
 
     client = TestClient(app)
     payload = {
@@ -121,9 +238,11 @@ def test_generate_sow_rejects_disallowed_services_when_service_list_is_explicit(
     dynamic_sections = 11
     responses = iter(["Uses OKE and Streaming."] * dynamic_sections + ["Reviewed full document."])
 
-    mock_call = lambda *_args, **_kwargs: next(responses)
-    monkeypatch.setattr("app.agents.writer.call_llm", mock_call)
-    monkeypatch.setattr("app.agents.qa.call_llm", mock_call)
+    async def mock_call(*_args, **_kwargs):
+        return next(responses)
+
+    monkeypatch.setattr("app.agents.writer.acall_llm", mock_call)
+    monkeypatch.setattr("app.agents.qa.acall_llm", mock_call)
 
     client = TestClient(app)
     payload = {
@@ -171,3 +290,206 @@ def test_architecture_vision_agent_handles_empty_diagram() -> None:
     assert analysis["analysis_confidence"]["overall_confidence"] == "low"
     assert analysis["format"] == "unknown"
     assert analysis["architecture_extraction"]["error"]["code"] == "image_unreadable"
+
+
+def test_metrics_reports_rate_limits() -> None:
+    """Metrics endpoint should expose every OCI limiter with its queue depth."""
+    client = TestClient(app)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    names = {item["name"] for item in response.json()["rate_limits"]}
+    assert names == {"inference", "multimodal", "agent_runtime"}
+    assert all("queued" in item and "limit" in item for item in response.json()["rate_limits"])
+
+
+@pytest.mark.usefixtures("offline_rag")
+def test_generate_sow_stream_emits_sections_in_canonical_order(monkeypatch) -> None:
+    """Streaming endpoint should relay phases, ordered sections and final file names."""
+    import asyncio
+    import json
+
+    from app.agents.structure_controller import CANONICAL_STRUCTURE
+
+    async def mock_write(system_prompt, user_prompt, **_kwargs):
+        # Later sections finish first, so ordering must come from the buffer.
+        await asyncio.sleep(0.001 * (len(user_prompt) % 7))
+        return "Generated section content."
+
+    async def mock_review(*_args, **_kwargs):
+        return "Reviewed full document."
+
+    monkeypatch.setattr("app.agents.writer.acall_llm", mock_write)
+    monkeypatch.setattr("app.agents.qa.acall_llm", mock_review)
+    monkeypatch.setattr("app.agents.metadata_inference.acall_llm", mock_review)
+
+    client = TestClient(app)
+    payload = {
+        "client": "Cegid",
+        "project_name": "xrp Modernization",
+        "cloud": "OCI",
+        "scope": "Refactor monolith to microservices",
+        "duration": "4 months",
+    }
+    response = client.post("/generate-sow/stream", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for frame in response.text.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines() if not line.startswith(":"))
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+
+    sections = [data["section"] for name, data in events if name == "section"]
+    assert sections == [s for s in CANONICAL_STRUCTURE if s in set(sections)]
+    assert ("phase", {"phase": "qa", "status": "complete"}) in events
+    final_name, final = events[-1]
+    assert final_name == "complete"
+    store = get_artifact_store(Path("app").resolve())
+    assert store.get(final["file"]) is not None
+    assert store.get(final["markdown_file"]) is not None
+
+
+@pytest.mark.usefixtures("offline_rag")
+def test_jobs_api_runs_pipeline_in_background(monkeypatch, tmp_path) -> None:
+    """Jobs API should queue generation, report progress and expose the result."""
+    import time
+
+    import app.main as main_module
+    from app.services.job_store import JobRunner, JobStore
+
+    async def mock_call(*_args, **_kwargs):
+        return "Generated section content."
+
+    monkeypatch.setattr("app.agents.writer.acall_llm", mock_call)
+    monkeypatch.setattr("app.agents.qa.acall_llm", mock_call)
+    monkeypatch.setattr("app.agents.metadata_inference.acall_llm", mock_call)
+    runner = JobRunner(JobStore(tmp_path / "jobs.sqlite3"), main_module._execute_job, workers=1)
+    monkeypatch.setattr(main_module, "_job_runner_instance", runner)
+
+    client = TestClient(app)
+    payload = {
+        "client": "Cegid",
+        "project_name": "xrp Modernization",
+        "cloud": "OCI",
+        "scope": "Refactor monolith to microservices",
+        "duration": "4 months",
+    }
+    submitted = client.post("/jobs", json=payload)
+    assert submitted.status_code == 202
+    job_id = submitted.json()["job_id"]
+
+    deadline = time.monotonic() + 30
+    status = client.get(f"/jobs/{job_id}").json()
+    while status["status"] not in ("succeeded", "failed") and time.monotonic() < deadline:
+        time.sleep(0.05)
+        status = client.get(f"/jobs/{job_id}").json()
+
+    assert status["status"] == "succeeded", status
+    assert status["progress"]["sections_done"] == status["progress"]["sections_total"] > 0
+    assert {"metadata", "rag_map", "reviewed"} <= set(status["completed_phases"])
+    result = client.get(f"/jobs/{job_id}/result").json()
+    assert get_artifact_store(Path("app").resolve()).get(result["file"]) is not None
+    assert client.get("/jobs/missing").status_code == 404
+
+
+@pytest.mark.usefixtures("offline_rag")
+def test_bulk_generation_shares_work_across_variants(monkeypatch) -> None:
+    """Bulk endpoint should zip one DOCX per variant, drafting each section once per services list."""
+    import io
+    import zipfile
+
+    from app.agents.structure_controller import StructureController
+
+    calls = {"writer": 0, "qa": 0, "metadata": 0, "rag": 0}
+
+    def _counting(kind):
+        async def mock_call(*_args, **_kwargs):
+            calls[kind] += 1
+            return "Generated section content."
+        return mock_call
+
+    monkeypatch.setattr("app.agents.writer.acall_llm", _counting("writer"))
+    monkeypatch.setattr("app.agents.qa.acall_llm", _counting("qa"))
+    monkeypatch.setattr("app.agents.metadata_inference.acall_llm", _counting("metadata"))
+    real_retrieve = main_module._retrieve_rag_map
+
+    async def counting_retrieve(*args, **kwargs):
+        calls["rag"] += 1
+        return await real_retrieve(*args, **kwargs)
+
+    monkeypatch.setattr(main_module, "_retrieve_rag_map", counting_retrieve)
+    monkeypatch.setattr(main_module, "_bulk_build_slots", lambda _max_pending: 1)
+
+    client = TestClient(app)
+    payload = {
+        "project": {
+            "client": "Cegid",
+            "project_name": "xrp Modernization",
+            "cloud": "OCI",
+            "scope": "Refactor monolith to microservices",
+            "duration": "4 months",
+            "use_cache": False,
+        },
+        "variants": [
+            {"name": "full"},
+            {"name": "no dr", "excluded_sections": ["Disaster Recovery"]},
+            {"name": "oke-only", "services": ["OKE"], "excluded_sections": ["DISASTER RECOVERY"]},
+        ],
+    }
+    response = client.post("/generate-sow/bulk", json=payload)
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.namelist() == ["full.docx", "no-dr.docx", "oke-only.docx"]
+        assert all(Document(archive.open(name)).paragraphs for name in archive.namelist())
+
+    structure = StructureController(template_root=Path("app/templates"))
+    dynamic = [s for s in structure.sections() if not structure.is_static(s)]
+    # "no dr" reuses the metadata, retrieval and drafts of "full"; "oke-only"
+    # infers, retrieves and drafts for its own services list once.
+    assert calls == {"writer": 2 * len(dynamic) - 1, "qa": 3, "metadata": 2, "rag": 2}
+
+    duplicate = dict(payload, variants=[{"name": "a/b"}, {"name": "a b"}])
+    assert client.post("/generate-sow/bulk", json=duplicate).status_code == 400
+    too_many = dict(payload, variants=[{"name": f"v{i}"} for i in range(main_module._BULK_MAX_VARIANTS + 1)])
+    assert client.post("/generate-sow/bulk", json=too_many).status_code == 422
+
+
+@pytest.mark.usefixtures("offline_rag")
+def test_bulk_followers_share_sections_their_leader_excluded(monkeypatch) -> None:
+    """Concurrent variants needing a section their services list's leader skipped should draft it once."""
+    from app.agents.structure_controller import StructureController
+
+    structure = StructureController(template_root=Path("app/templates"))
+    dynamic = [s for s in structure.sections() if not structure.is_static(s)]
+    calls = {"writer": 0, "qa": 0}
+
+    def _counting(kind):
+        async def mock_call(*_args, **_kwargs):
+            calls[kind] += 1
+            # Yield so the two followers' drafts interleave.
+            await asyncio.sleep(0)
+            return "Generated section content."
+        return mock_call
+
+    monkeypatch.setattr("app.agents.writer.acall_llm", _counting("writer"))
+    monkeypatch.setattr("app.agents.qa.acall_llm", _counting("qa"))
+    monkeypatch.setattr("app.agents.metadata_inference.acall_llm", _counting("qa"))
+
+    client = TestClient(app)
+    payload = {
+        "project": {"client": "Cegid", "project_name": "xrp", "cloud": "OCI", "scope": "Refactor",
+            "duration": "4 months", "use_cache": False,
+        },
+        "variants": [
+            {"name": "lead", "excluded_sections": [dynamic[0]]},
+            {"name": "a", "excluded_sections": [dynamic[1], dynamic[2]]},
+            {"name": "b", "excluded_sections": [dynamic[1], dynamic[3]]},
+        ],
+    }
+    response = client.post("/generate-sow/bulk", json=payload)
+
+    assert response.status_code == 200, response.text
+    assert calls["writer"] == len(dynamic)
@@ -0,0 +1,67 @@
+"""Tests for the process-wide adaptive OCI rate limiter."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.rate_limiter import AdaptiveLimiter
+
+
+def test_limiter_shrinks_on_throttle_and_grows_on_success() -> None:
+    limiter = AdaptiveLimiter("test", 8, max_limit=10, cooldown_s=60)
+
+    class _Throttled(Exception):
+        status = 429
+
+    async def _run() -> None:
+        with pytest.raises(_Throttled):
+            async with limiter.slot():
+                raise _Throttled()
+        # A second rejection inside the cooldown window must not shrink again.
+        with pytest.raises(_Throttled):
+            async with limiter.slot():
+                raise _Throttled()
+        assert limiter.limit == 4
+        for _ in range(8):
+            async with limiter.slot():
+                pass
+
+    asyncio.run(_run())
+
+    snapshot = limiter.snapshot()
+    assert snapshot["limit"] == 5
+    assert snapshot["throttles"] == 2
+    assert snapshot["successes"] == 8
+    assert snapshot["in_flight"] == 0
+
+
+def test_limiter_queues_callers_across_event_loops() -> None:
+    limiter = AdaptiveLimiter("test", 1, max_limit=1)
+    state = SimpleNamespace(active=0, peak=0)
+
+    async def _call() -> None:
+        async with limiter.slot():
+            state.active += 1
+            state.peak = max(state.peak, state.active)
+            await asyncio.sleep(0.01)
+            state.active -= 1
+
+    async def _burst() -> None:
+        await asyncio.gather(*[_call() for _ in range(5)])
+
+    async def _cancelled_waiter() -> None:
+        await limiter.acquire()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire(), timeout=0.01)
+        limiter.release()
+
+    asyncio.run(_burst())
+    asyncio.run(_cancelled_waiter())
+    asyncio.run(_burst())
+
+    assert state.peak == 1
+    assert limiter.snapshot()["in_flight"] == 0
+    assert limiter.snapshot()["queued"] == 0
@@ -0,0 +1,78 @@
+"""Tests for out-of-process DOCX rendering."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import io
+import threading
+
+import pytest
+from docx import Document
+
+from app.services import render_pool as render_pool_module
+from app.services.render_pool import RenderJob, RenderPool, RenderQueueFull, RenderResult
+
+
+def _job(tmp_path) -> RenderJob:
+    return RenderJob(
+        template_path=str(tmp_path / "missing_template.docx"),
+        output_dir=str(tmp_path),
+        sections=[("PROJECT OVERVIEW", "Overview body.")],
+        markdown="# SoW",
+        customer_name="Acme",
+    )
+
+
+def test_render_pool_builds_documents_in_worker_processes(tmp_path) -> None:
+    pool = RenderPool(tmp_path / "missing_template.docx", workers=1)
+    try:
+        result = asyncio.run(pool.render(_job(tmp_path)))
+    finally:
+        pool.shutdown()
+
+    assert (tmp_path / result.file_name).stat().st_size > 0
+    assert (tmp_path / result.markdown_name).read_text(encoding="utf-8") == "# SoW"
+    assert pool.stats()["completed"] == 1
+
+
+def test_render_pool_in_memory_job_returns_docx_without_writing_files(tmp_path) -> None:
+    pool = RenderPool(tmp_path / "missing_template.docx", workers=0)
+    try:
+        job = dataclasses.replace(_job(tmp_path), in_memory=True)
+        result = asyncio.run(pool.render(job))
+    finally:
+        pool.shutdown()
+
+    assert result.file_name is None and result.markdown_name is None
+    assert result.docx[:2] == b"PK"
+    assert Document(io.BytesIO(result.docx)).paragraphs
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_render_pool_rejects_builds_beyond_max_pending(monkeypatch, tmp_path) -> None:
+    release = threading.Event()
+
+    def slow_render(job: RenderJob) -> RenderResult:
+        release.wait(5)
+        return RenderResult(file_name="out.docx", markdown_name="out.md")
+
+    monkeypatch.setattr(render_pool_module, "render_job", slow_render)
+    pool = RenderPool(tmp_path, workers=0, max_pending=1)
+
+    async def _run() -> None:
+        first = asyncio.ensure_future(pool.render(_job(tmp_path)))
+        await asyncio.sleep(0)
+        with pytest.raises(RenderQueueFull):
+            await pool.render(_job(tmp_path))
+        # A cancelled request keeps its slot until the build really finishes.
+        first.cancel()
+        await asyncio.sleep(0.05)
+        assert pool.stats()["pending"] == 1
+        release.set()
+        while pool.stats()["pending"]:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(_run())
+    pool.shutdown()
+    assert pool.stats()["rejected"] == 1
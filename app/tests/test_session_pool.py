@@ -0,0 +1,96 @@
+"""Tests for pooled Agent Runtime sessions."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.services import session_pool as session_pool_module
+from app.services.session_pool import AgentSessionPool
+
+
+def test_session_pool_reuses_and_recycles_sessions(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(session_pool_module.time, "time", lambda: now[0])
+    pool = AgentSessionPool("ocid1.endpoint", max_sessions=2, max_uses=3, idle_seconds=60, max_uncited=2)
+    created: list[str] = []
+    deleted: list[str] = []
+
+    async def create() -> str:
+        created.append(f"s{len(created)}")
+        return created[-1]
+
+    async def delete(session_id: str) -> None:
+        deleted.append(session_id)
+
+    async def search(poisoned: str | None = None, cited: bool = True) -> str:
+        async with pool.session(create, delete) as session:
+            session.poisoned = poisoned
+            session.record_reply(cited)
+            return session.id
+
+    async def _run() -> None:
+        assert [await search() for _ in range(4)] == ["s0", "s0", "s0", "s1"]  # s0 retired after 3 uses
+        assert await search(poisoned="no_message") == "s1"  # retired early
+        with pytest.raises(RuntimeError):
+            async with pool.session(create, delete):
+                raise RuntimeError("chat failed")
+        # One knowledge-base miss keeps the session; a second in a row retires it.
+        assert [await search(cited=False), await search(cited=False)] == ["s3", "s3"]
+        assert await search() == "s4"
+        now[0] += 120
+        assert await search() == "s5"  # s4 idled out and was reaped
+        await asyncio.sleep(0)  # let the background deletes run
+
+    asyncio.run(_run())
+
+    assert deleted == ["s0", "s1", "s2", "s3", "s4"]
+    stats = pool.stats()
+    assert stats["recycled"] == {"max_uses": 1, "no_message": 1, "error": 1, "no_citations": 1}
+    assert stats["reaped"] == 1 and stats["reused"] == 4 and stats["idle"] == 1
+
+
+def test_session_pool_maintenance_prewarms_and_reaps(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(session_pool_module.time, "time", lambda: now[0])
+    pool = AgentSessionPool("ocid1.endpoint", max_sessions=4, idle_seconds=60, min_sessions=2)
+    created: list[str] = []
+    deleted: list[str] = []
+
+    def create() -> str:
+        created.append(f"s{len(created)}")
+        return created[-1]
+
+    pool.start(create, deleted.append)
+    pool.stop()  # the first maintenance pass runs before the thread waits
+    assert created == ["s0", "s1"] and pool.stats()["idle"] == 2
+
+    now[0] += 120
+    pool.maintain()
+    assert deleted == ["s0", "s1"] and created == ["s0", "s1", "s2", "s3"]
+    assert pool.stats()["reaped"] == 2 and pool.stats()["warmed"] == 4
+
+
+def test_session_pool_bounds_concurrent_sessions() -> None:
+    pool = AgentSessionPool("ocid1.endpoint", max_sessions=2)
+    created: list[str] = []
+
+    async def create() -> str:
+        created.append(f"s{len(created)}")
+        return created[-1]
+
+    async def delete(_session_id: str) -> None:
+        return None
+
+    async def search() -> None:
+        async with pool.session(create, delete):
+            await asyncio.sleep(0.01)
+
+    async def _run() -> None:
+        await asyncio.gather(*[search() for _ in range(6)])
+
+    asyncio.run(_run())
+
+    assert len(created) == 2
+    assert pool.stats()["waits"] == 4
@@ -101,3 +101,144 @@ def test_rag_diagnose_vector_store_reports_empty_and_non_empty() -> None:
     )
     non_empty_service.count = lambda: 1  # type: ignore[method-assign]
     assert non_empty_service.diagnose_vector_store() is True
+
+
+def test_rag_retrievals_are_cached_across_service_instances(monkeypatch) -> None:
+    from app.services import rag_service
+    from app.services.cache import TieredCache
+
+    docs = [SimpleNamespace(text="OKE cluster", metadata={"section": "FUTURE STATE ARCHITECTURE"})]
+    chats = []
+
+    class _ChatRuntime:
+        def create_session(self, **_kwargs):
+            return SimpleNamespace(data=SimpleNamespace(id="session"))
+
+        def chat(self, **kwargs):
+            chats.append(kwargs)
+            content = SimpleNamespace(citations=docs, text="")
+            return SimpleNamespace(data=SimpleNamespace(message=SimpleNamespace(content=content)))
+
+    monkeypatch.setattr(rag_service, "_retrieval_cache_instance", TieredCache("rag"))
+    monkeypatch.setattr(rag_service, "_section_stats", {})
+    monkeypatch.setattr(rag_service, "_kb_versions", {})
+
+    def _service() -> SectionAwareRAGService:
+        return SectionAwareRAGService(None, "agent", "ocid1.test.kb", runtime_client=_ChatRuntime())
+
+    project = {"client": "A", "industry": "Retail", "services": ["OKE"]}
+    first = _service().retrieve_section_context("FUTURE STATE ARCHITECTURE", project)
+    second = _service().retrieve_section_context("FUTURE STATE ARCHITECTURE", project)
+    assert first == second and first[0].text == "OKE cluster"
+    assert len(chats) == 1
+
+    # A KB sync that changes time_updated invalidates earlier retrievals.
+    service = _service()
+    service._record_kb_version("2026-01-01T00:00:00Z")
+    service.retrieve_section_context("FUTURE STATE ARCHITECTURE", project)
+    assert len(chats) == 2
+
+    stats = rag_service.rag_cache_stats()
+    assert stats["sections"]["FUTURE STATE ARCHITECTURE"] == {"hits": 1, "misses": 2, "hit_rate": 0.333}
+
+
+def test_rag_polls_kb_version_and_keeps_unversioned_entries_off_disk(monkeypatch, tmp_path) -> None:
+    from app.services import rag_service
+    from app.services.cache import TieredCache
+
+    docs = [SimpleNamespace(text="OKE cluster", metadata={"section": "FUTURE STATE ARCHITECTURE"})]
+    chats = []
+    versions = [None, "v1", "v1", "v2"]
+
+    class _ChatRuntime:
+        def create_session(self, **_kwargs):
+            return SimpleNamespace(data=SimpleNamespace(id="session"))
+
+        def chat(self, **kwargs):
+            chats.append(kwargs)
+            content = SimpleNamespace(citations=docs, text="")
+            return SimpleNamespace(data=SimpleNamespace(message=SimpleNamespace(content=content)))
+
+    class _AgentClient:
+        def get_knowledge_base(self, _knowledge_base_id):
+            return SimpleNamespace(data=SimpleNamespace(time_updated=versions.pop(0)))
+
+    cache = TieredCache("rag", db_path=tmp_path / "rag.sqlite3")
+    monkeypatch.setattr(rag_service, "_retrieval_cache_instance", cache)
+    monkeypatch.setattr(rag_service, "_kb_versions", {})
+    monkeypatch.setattr(rag_service, "_kb_checked_at", {})
+    monkeypatch.setenv("RAG_KB_VERSION_POLL_SECONDS", "0")
+    service = SectionAwareRAGService(
+        None, "agent", "ocid1.test.kb", runtime_client=_ChatRuntime(), agent_client=_AgentClient()
+    )
+
+    def _retrieve() -> None:
+        service.retrieve_section_context("FUTURE STATE ARCHITECTURE", {"client": "A"})
+
+    _retrieve()  # version unknown: cached in memory only
+    assert cache.stats()["disk_bytes"] == 0
+    _retrieve()  # v1 observed: new key, fetched and persisted
+    assert cache.stats()["disk_bytes"] > 0
+    _retrieve()  # still v1: served from cache
+    _retrieve()  # a sync moved the KB to v2: fetched again
+    assert len(chats) == 3
+    assert rag_service.rag_cache_stats()["kb_versions"] == {"ocid1.test.kb": "v2"}
+
+
+def test_rag_cache_key_ignores_fields_outside_the_semantic_query() -> None:
+    service = SectionAwareRAGService(None, "agent", "ocid1.test.kb", runtime_client=object())
+    base = {"client": "Acme", "industry": "Retail", "services": ["OKE", "ADB"]}
+    enriched = {
+        "client": " acme ",
+        "industry": "RETAIL",
+        "services": ["ADB", "OKE"],
+        "architecture_analysis": {"components": ["x"] * 500},
+        "inferred_metadata": {"region": "eu-frankfurt-1"},
+    }
+
+    key = service._cache_key("SCOPE", base)
+
+    assert key == service._cache_key("Scope", enriched)
+    assert service._build_semantic_query("SCOPE", base) == service._build_semantic_query("Scope", enriched)
+    assert len(key) == 64
+    assert key != service._cache_key("SCOPE", {**base, "services": ["OKE"]})
+
+
+def test_concurrent_fallback_joins_in_flight_search(monkeypatch) -> None:
+    import asyncio
+
+    from app.services import rag_service
+    from app.services.cache import TieredCache
+
+    queries = []
+
+    class _AsyncRuntime:
+        async def create_session(self, **_kwargs):
+            return SimpleNamespace(data=SimpleNamespace(id="session"))
+
+        async def chat(self, agent_endpoint_id, chat_details):
+            queries.append(chat_details.user_message)
+            if "target architecture" in chat_details.user_message:
+                await asyncio.sleep(0.05)
+                docs = [SimpleNamespace(text="OKE", metadata={"section": "FUTURE STATE ARCHITECTURE"})]
+            else:
+                docs = [SimpleNamespace(text="IAM", metadata={"section": "SECURITY"})]
+            content = SimpleNamespace(citations=docs, text="")
+            return SimpleNamespace(data=SimpleNamespace(message=SimpleNamespace(content=content)))
+
+    monkeypatch.setattr(rag_service, "_retrieval_cache_instance", TieredCache("rag"))
+    service = SectionAwareRAGService(
+        None, "agent", "ocid1.test.kb", runtime_client=object(), async_runtime_client=_AsyncRuntime()
+    )
+
+    async def _fan_out():
+        return await asyncio.gather(
+            service.aretrieve_section_context("HIGH AVAILABILITY", {"client": "A"}),
+            service.aretrieve_section_context("FUTURE STATE ARCHITECTURE", {"client": "A"}),
+        )
+
+    high_availability, future_state = asyncio.run(_fan_out())
+
+    assert [chunk.text for chunk in high_availability] == ["OKE"]
+    assert [chunk.text for chunk in future_state] == ["OKE"]
+    assert len(queries) == 2  # HA's fallback shared the in-flight FUTURE STATE search
@@ -0,0 +1,77 @@
+"""Tests for the shared multimodal-call executor."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.vision_executor import VisionExecutor, VisionQueueFull
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_timed_out_call_is_abandoned_and_its_slot_reused() -> None:
+    executor = VisionExecutor(workers=1, max_pending=4)
+    release = threading.Event()
+
+    with pytest.raises(TimeoutError):
+        executor.call(release.wait, timeout=0.05)
+
+    stats = executor.stats()
+    assert (stats["active"], stats["abandoned"], stats["timed_out"]) == (0, 1, 1)
+    # The stuck call no longer holds the only worker slot.
+    assert executor.call(lambda: "ok", timeout=1) == "ok"
+    assert asyncio.run(executor.acall(lambda: "async ok", timeout=1)) == "async ok"
+
+    release.set()
+    _wait_for(lambda: executor.stats()["abandoned"] == 0)
+    assert executor.stats()["threads"] == 1
+    executor.shutdown()
+
+
+def test_queued_call_is_cancelled_on_timeout_and_queue_is_bounded() -> None:
+    executor = VisionExecutor(workers=1, max_pending=1, max_abandoned=0)
+    release = threading.Event()
+    ran = []
+    blocker = threading.Thread(target=lambda: executor.call(release.wait, timeout=5))
+    blocker.start()
+    _wait_for(lambda: executor.stats()["active"] == 1)
+
+    with pytest.raises(TimeoutError):
+        executor.call(lambda: ran.append(True), timeout=0.05)
+    assert executor.stats()["queued"] == 0
+
+    executor._submit(release.wait)
+    with pytest.raises(VisionQueueFull):
+        executor.call(lambda: None, timeout=1)
+
+    release.set()
+    blocker.join()
+    _wait_for(lambda: executor.stats()["completed"] == 2)
+    assert ran == []
+    assert executor.stats()["rejected"] == 1
+    executor.shutdown()
+
+
+def test_native_async_calls_are_counted_and_timed_out() -> None:
+    executor = VisionExecutor(workers=1, max_pending=1)
+
+    async def _run() -> None:
+        assert await executor.await_call(asyncio.sleep(0, result="ok"), timeout=1) == "ok"
+        with pytest.raises(TimeoutError):
+            await executor.await_call(asyncio.sleep(5), timeout=0.05)
+
+    asyncio.run(_run())
+
+    stats = executor.stats()
+    assert (stats["async_calls"], stats["async_active"], stats["timed_out"]) == (2, 0, 1)
+    # No worker thread was used.
+    assert stats["threads"] == 0
+    executor.shutdown()
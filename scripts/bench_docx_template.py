@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark per-build DOCX template preparation with and without the template cache.
+
+Without the cache every build re-opens the template (zip inflate + lxml parse
+of every part) and normalises it; with the cache the normalised tree is parsed
+once and deep-cloned per build.  Only the template stage (load + normalise +
+name substitution) is timed: section injection dominates the full build and
+its run-to-run noise would hide the difference.
+
+The production template is not part of the repository, so by default a
+synthetic one of similar shape is generated (Heading 1 per SoW section, body
+paragraphs with Customer1/Project1 placeholders, a table per section, an
+image).  Pass a real template to measure it instead.
+
+Usage (run from repo root):
+    python scripts/bench_docx_template.py [path/to/sow_template.docx] [--builds N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from docx import Document  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from app.services.doc_builder import (  # noqa: E402
+    SECTION_HEADING_KEYWORDS,
+    DocumentBuilder,
+    clear_template_cache,
+)
+
+
+def _synthetic_template(path: Path) -> None:
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Customer1 — Project1 Statement of Work"
+    for keyword in SECTION_HEADING_KEYWORDS.values():
+        doc.add_heading(keyword.lstrip("=").title(), level=1)
+        for _ in range(10):
+            doc.add_paragraph("This section is agreed between Oracle and Customer1 for Project1. " * 4)
+        table = doc.add_table(rows=6, cols=4)
+        for cell in table._cells:
+            cell.text = "<add information here>"
+    image = io.BytesIO()
+    Image.new("RGB", (400, 300), "white").save(image, "PNG")
+    image.seek(0)
+    doc.add_picture(image)
+    doc.save(str(path))
+
+
+def _time_template_stage(template: Path, builds: int, cached: bool) -> float:
+    """Per-build cost of getting a normalised, name-substituted template tree."""
+    clear_template_cache()
+    elapsed = 0.0
+    for _ in range(builds):
+        if not cached:
+            clear_template_cache()
+        builder = DocumentBuilder(template, customer_name="Acme Retail", project_name="Core Platform")
+        t0 = time.perf_counter()
+        doc = builder._load_or_create_template()
+        builder._substitute_names(doc)
+        elapsed += time.perf_counter() - t0
+    return elapsed / builds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("template", nargs="?", type=Path)
+    parser.add_argument("--builds", type=int, default=50)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        template = args.template or tmp_dir / "sow_template.docx"
+        if args.template is None:
+            _synthetic_template(template)
+
+        stage_uncached = _time_template_stage(template, args.builds, cached=False)
+        stage_cached = _time_template_stage(template, args.builds, cached=True)
+
+    print(f"template: {args.template or 'synthetic'}")
+    print(f"template stage without cache: {stage_uncached * 1000:7.1f} ms/build")
+    print(f"template stage with cache:    {stage_cached * 1000:7.1f} ms/build ({stage_uncached / stage_cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Benchmark section lookup in a SoW template: linear paragraph scans vs the heading index.
+
+Every section injected into the template has to locate its heading and the
+heading that closes it.  The legacy lookup re-listed ``doc.paragraphs`` and
+resolved each paragraph's style for every section (``Paragraph.style`` walks
+the styles part); ``_HeadingIndex`` classifies each style id once, scans the
+body once and answers lookups from memory.  Both variants locate the same
+sections in a fresh clone of the template per round, so index construction is
+included in its timing.  A full ``build()`` is timed as well for context.
+
+The production template is not part of the repository, so by default a
+synthetic one with a Heading 1 per SoW section (plus Heading 2/3
+sub-sections, body paragraphs and a table each) is generated.  Pass a real
+template to measure it instead.
+
+Usage (run from repo root):
+    python scripts/bench_heading_index.py [path/to/sow_template.docx] [--rounds N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from docx import Document  # noqa: E402
+
+from app.services.doc_builder import (  # noqa: E402
+    SECTION_HEADING_KEYWORDS,
+    DocumentBuilder,
+    _HeadingIndex,
+)
+
+
+def _synthetic_template(path: Path) -> None:
+    doc = Document()
+    for keyword in SECTION_HEADING_KEYWORDS.values():
+        doc.add_heading(keyword.lstrip("=").title(), level=1)
+        for sub in range(3):
+            doc.add_heading(f"Topic {sub + 1}", level=2)
+            doc.add_heading("Details", level=3)
+            for _ in range(4):
+                doc.add_paragraph("This section is agreed between Oracle and Customer1 for Project1. " * 3)
+            doc.add_paragraph("<add information here>")
+        table = doc.add_table(rows=4, cols=3)
+        for cell in table._cells:
+            cell.text = "<add information here>"
+    doc.save(str(path))
+
+
+def _keywords() -> list[tuple[str, bool]]:
+    return [(kw.lstrip("="), kw.startswith("=")) for kw in SECTION_HEADING_KEYWORDS.values()]
+
+
+def _legacy_lookup(doc, keyword: str, exact: bool) -> tuple[int, int] | None:
+    """The per-section scan the injection paths used before the index."""
+    paragraphs = list(doc.paragraphs)
+    for i, para in enumerate(paragraphs):
+        if not DocumentBuilder._is_heading_style(para):
+            continue
+        text = para.text.strip().lower()
+        if (text == keyword) if exact else (keyword in text):
+            level = DocumentBuilder._get_heading_level(para) or 1
+            for j in range(i + 1, len(paragraphs)):
+                lvl = DocumentBuilder._get_heading_level(paragraphs[j])
+                if lvl is not None and lvl <= level:
+                    return i, j
+            return i, len(paragraphs)
+    return None
+
+
+def _index_lookup(doc, keyword: str, exact: bool):
+    index = _HeadingIndex.for_document(doc)
+    heading = index.find(keyword, exact=exact)
+    return None if heading is None else (heading, index.section_end(heading))
+
+
+def _time_lookups(builder: DocumentBuilder, rounds: int, lookup) -> float:
+    keywords = _keywords()
+    elapsed = 0.0
+    for _ in range(rounds):
+        doc = builder._load_or_create_template()
+        t0 = time.perf_counter()
+        for keyword, exact in keywords:
+            lookup(doc, keyword, exact)
+        elapsed += time.perf_counter() - t0
+    return elapsed / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("template", nargs="?", type=Path)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        template = args.template or tmp_dir / "sow_template.docx"
+        if args.template is None:
+            _synthetic_template(template)
+        builder = DocumentBuilder(template, customer_name="Acme Retail", project_name="Core Platform")
+
+        doc = builder._load_or_create_template()
+        headings = len(_HeadingIndex.for_document(doc).headings())
+        print(f"template: {args.template or 'synthetic'} ({len(doc.paragraphs)} paragraphs, {headings} headings)")
+
+        legacy = _time_lookups(builder, args.rounds, _legacy_lookup)
+        indexed = _time_lookups(builder, args.rounds, _index_lookup)
+        print(f"{len(_keywords())} section lookups, linear scans: {legacy * 1000:8.1f} ms/document")
+        print(f"{len(_keywords())} section lookups, heading index: {indexed * 1000:7.1f} ms/document ({legacy / indexed:.0f}x)")
+
+        sections = [(name, f"{name.title()} overview.\n\nSecond paragraph.") for name in SECTION_HEADING_KEYWORDS]
+        t0 = time.perf_counter()
+        for _ in range(args.rounds):
+            builder.build(sections, tmp_dir)
+        print(f"full build ({len(sections)} sections): {(time.perf_counter() - t0) / args.rounds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
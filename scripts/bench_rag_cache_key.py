@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Benchmark RAG cache-key construction with realistic pipeline contexts.
+
+By the time RAG runs, ``project_data`` carries the vision ``architecture_analysis``
+and ``inferred_metadata`` next to the handful of fields the semantic query uses.
+The legacy key serialised that whole dict for every lookup; the current key
+digests only section, client, industry and services.
+
+Usage (run from repo root):
+    python scripts/bench_rag_cache_key.py [--iterations N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.rag_service import SectionAwareRAGService  # noqa: E402
+
+
+def _legacy_cache_key(section: str, project_data: dict) -> str:
+    raw = json.dumps(project_data, sort_keys=True, ensure_ascii=False)
+    return f"{section.casefold()}::{raw}"
+
+
+def _realistic_context() -> dict:
+    components = [
+        {
+            "name": f"component-{index}",
+            "type": "compute" if index % 3 else "database",
+            "description": "Stateless service behind a public load balancer, autoscaled on CPU. " * 3,
+            "connections": [f"component-{(index + step) % 40}" for step in (1, 2, 5)],
+        }
+        for index in range(40)
+    ]
+    analysis = {
+        "current": {"components": components, "summary": "Legacy on-premise estate. " * 40},
+        "target": {"components": components, "summary": "OCI landing zone with OKE. " * 40},
+        "confidence": 0.82,
+        "gaps": ["network segmentation unclear", "backup RPO missing"] * 10,
+    }
+    return {
+        "client": "Acme Retail",
+        "industry": "Retail",
+        "services": ["OKE", "Autonomous Database", "Object Storage", "WAF"],
+        "project_name": "Core platform modernisation",
+        "scope": "Migrate order management and storefront to OCI. " * 10,
+        "architecture_analysis": analysis,
+        "inferred_metadata": {"region": "eu-frankfurt-1", "ha": True, "notes": "Derived from diagrams. " * 30},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    context = _realistic_context()
+    service = SectionAwareRAGService(None, "agent", "ocid1.kb", runtime_client=object())
+    sections = list(SectionAwareRAGService.SECTION_QUERY_MAP)
+
+    def legacy() -> None:
+        for section in sections:
+            _legacy_cache_key(section, context)
+
+    def current() -> None:
+        for section in sections:
+            service._cache_key(section, context)
+
+    context_bytes = len(json.dumps(context, ensure_ascii=False).encode("utf-8"))
+    legacy_s = timeit.timeit(legacy, number=args.iterations)
+    current_s = timeit.timeit(current, number=args.iterations)
+    lookups = args.iterations * len(sections)
+    print(f"context size: {context_bytes / 1024:.1f} KiB, lookups: {lookups}")
+    print(f"legacy  key: {legacy_s / lookups * 1e6:8.1f} us/lookup, {len(_legacy_cache_key(sections[0], context))} chars")
+    print(f"current key: {current_s / lookups * 1e6:8.1f} us/lookup, {len(service._cache_key(sections[0], context))} chars")
+    print(f"speed-up: {legacy_s / current_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark per-section injection dispatch across every canonical SoW section.
+
+For each section the builder has to pick a heading keyword (and whether it
+must match exactly), then a rendering path: scope boxes, full clear,
+components table, labeled / structured, hierarchical bullets, single
+sentence, sibling insertion.  The legacy code re-derived the keyword from
+``SECTION_HEADING_KEYWORDS`` and ran the chain of ``section_name.upper()``
+comparisons and set-membership checks at every decision point; the current
+code resolves a :class:`SectionStrategy` built once at import and reads its
+fields.  Both variants make the same decisions for the same sections; the
+legacy one is reproduced here.
+
+Usage (run from repo root):
+    python scripts/bench_section_dispatch.py [--iterations N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.doc_builder import (  # noqa: E402
+    _FULL_CLEAR_SECTIONS,
+    _HIERARCHICAL_BULLET_SECTIONS,
+    _LABELED_FORMAT_SECTIONS,
+    _SECTION_INSERT_AFTER,
+    _SINGLE_SENTENCE_SECTIONS,
+    _STRUCTURED_OUTPUT_SECTIONS,
+    SECTION_HEADING_KEYWORDS,
+    section_strategy,
+)
+
+
+def _legacy_dispatch(section_name: str) -> tuple:
+    """The decisions one section's injection made before the strategy table."""
+    raw_keyword = SECTION_HEADING_KEYWORDS.get(section_name.upper(), section_name.lower())
+    exact_match = raw_keyword.startswith("=")
+    keyword = raw_keyword[1:] if exact_match else raw_keyword
+    scope = section_name.upper() == "SCOPE"
+    single = section_name.upper() in _SINGLE_SENTENCE_SECTIONS
+    full_clear = section_name.upper() in _FULL_CLEAR_SECTIONS
+    components = section_name.upper() == "ARCHITECTURE COMPONENTS"
+    labeled = section_name.upper() in _LABELED_FORMAT_SECTIONS
+    structured = labeled and section_name.upper() in _STRUCTURED_OUTPUT_SECTIONS
+    hierarchical = section_name.upper() in _HIERARCHICAL_BULLET_SECTIONS
+    after = _SECTION_INSERT_AFTER.get(section_name.upper())
+    return keyword, exact_match, scope, single, full_clear, components, labeled, structured, hierarchical, after
+
+
+def _table_dispatch(section_name: str) -> tuple:
+    strategy = section_strategy(section_name)
+    return (
+        strategy.matcher.keyword,
+        strategy.matcher.exact,
+        strategy.scope_boxes,
+        strategy.single_sentence,
+        strategy.full_clear,
+        strategy.renderer,
+        strategy.labeled,
+        strategy.labeled and strategy.structured,
+        strategy.hierarchical,
+        strategy.insert_after,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Section names arrive in mixed case from the planner.
+    sections = [name.title() for name in SECTION_HEADING_KEYWORDS] + ["Data Gaps"]
+    for name in sections:
+        legacy, table = _legacy_dispatch(name), _table_dispatch(name)
+        # Same keyword, exactness and flags (the renderer / sibling slots differ in type).
+        assert all(legacy[i] == table[i] for i in (0, 1, 2, 3, 4, 6, 7, 8)), name
+
+    def run(dispatch) -> float:
+        return min(timeit.repeat(lambda: [dispatch(name) for name in sections], number=args.iterations, repeat=5))
+
+    legacy = run(_legacy_dispatch)
+    table = run(_table_dispatch)
+    per_doc = 1e6 / args.iterations
+    print(f"{len(sections)} sections per document, best of 5 x {args.iterations} documents")
+    print(f"legacy keyword + membership chain: {legacy * per_doc:6.2f} µs/document")
+    print(f"strategy table lookup:             {table * per_doc:6.2f} µs/document ({legacy / table:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()